@@ -13,6 +13,8 @@ import tkinter as tk
 
 from common import SEGMENTS, create_segment_display, SCALE
 from log_viewer import LogViewer
+from modbus_server import RegisterMirror, analog_registers
+from poll_record import POLL_RECORDER
 
 # 전역 변수로 설정
 GAIN = 2 / 3
@@ -53,6 +55,9 @@ class AnalogUI:
         self.box_frames = []
         self.box_data = []
 
+        # 집계 서버(modbus_server.py)가 SCADA 에 내주는 표시 상태
+        self.register_mirror = RegisterMirror(num_boxes)
+
         # 필터링용 최근 값
         self.adc_values = [deque(maxlen=3) for _ in range(num_boxes)]
 
@@ -137,6 +142,7 @@ class AnalogUI:
 
     def maybe_log_event(self, box_index: int, raw_mA: float, full_scale_value: float,
                         gas_type: str, alarm1: bool, alarm2: bool, pwr_on: bool, event: str = ""):
+        self.register_mirror.set(box_index, analog_registers(raw_mA, full_scale_value, alarm1, alarm2, pwr_on))
         state = self.box_states[box_index]
 
         resolution = self._display_resolution_for_gas(gas_type)
@@ -684,24 +690,7 @@ class AnalogUI:
                 box_index = adc_index * 4 + channel
                 if box_index >= self.num_boxes:
                     continue
-
-                if len(self.adc_values[box_index]) == 0:
-                    filtered_value = milliamp
-                else:
-                    filtered_value = (0.7 * milliamp) + (0.3 * self.adc_values[box_index][-1])
-
-                self.adc_values[box_index].append(filtered_value)
-
-                print(f"Channel {box_index} Current: {filtered_value:.6f} mA")
-
-                previous_value = self.box_states[box_index]["current_value"]
-                current_value = filtered_value
-
-                self.box_states[box_index]["previous_value"] = previous_value
-                self.box_states[box_index]["current_value"] = current_value
-                self.box_states[box_index]["interpolating"] = True
-
-                self.adc_queue.put(box_index)
+                self.feed_sample(box_index, milliamp)
 
         except OSError as e:
             print(f"Error reading ADC data: {e}")
@@ -735,6 +724,29 @@ class AnalogUI:
                     event=f"ADC_ERROR:{e}"
                 )
 
+    def feed_sample(self, box_index, milliamp):
+        """채널 1개의 mA 측정값 (ADC 스레드 또는 poll_record 재생기에서 호출)."""
+        if POLL_RECORDER.enabled:
+            POLL_RECORDER.analog(box_index, milliamp)
+
+        if len(self.adc_values[box_index]) == 0:
+            filtered_value = milliamp
+        else:
+            filtered_value = (0.7 * milliamp) + (0.3 * self.adc_values[box_index][-1])
+
+        self.adc_values[box_index].append(filtered_value)
+
+        print(f"Channel {box_index} Current: {filtered_value:.6f} mA")
+
+        previous_value = self.box_states[box_index]["current_value"]
+        current_value = filtered_value
+
+        self.box_states[box_index]["previous_value"] = previous_value
+        self.box_states[box_index]["current_value"] = current_value
+        self.box_states[box_index]["interpolating"] = True
+
+        self.adc_queue.put(box_index)
+
     def start_adc_thread(self):
         adc_thread = threading.Thread(target=self.run_async_adc, daemon=True)
         adc_thread.start()
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+# coding: utf-8
+#
+# ASGD3000/3200/3210 레지스터 맵을 흉내 내는 가상 검지기 (pymodbus 서버 기반).
+# 한 호스트에서 수백 대를 띄워 modbus_ui.py 의 부하/회귀 테스트용으로 쓴다.
+#
+#   python asgd_simulator.py --count 128 --base-port 15020 --profile mixed
+#   python asgd_simulator.py --count 50 --ip-start 127.0.1.1 --base-port 502
+#   python asgd_simulator.py --count 10 --scenario scenario.json
+#   python asgd_simulator.py --count 4 --units 8     # RS-485 게이트웨이 4대 × 유닛 1~8
+#   python asgd_simulator.py --count 16 --rtu --baud 19200   # pty 로 만든 RTU 버스 1개 × 유닛 1~16
+#   python asgd_simulator.py --count 8 --rtt 300      # VPN/LTE 현장 흉내 (왕복 300ms 지연)
+#
+# scenario.json 예:
+#   {"devices": [{"model": "ASGD3210", "profile": "ramp",
+#                 "events": [{"t": 10, "error": 1}, {"t": 20, "error": 0},
+#                            {"t": 30, "fw_upgrade": 1}, {"t": 90, "reboot": 5}]}]}
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import math
+import os
+import random
+import threading
+import time
+import tty
+
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext, ModbusSlaveContext
+from pymodbus.exceptions import NoSuchSlaveException
+from pymodbus.framer import Framer
+from pymodbus.server import ModbusSerialServer, ModbusTcpServer
+
+
+def off(addr_4xxxx: int) -> int:
+    return addr_4xxxx - 40001
+
+
+REG_STATUS = 40001        # bit6 = AL1, bit7 = AL2
+REG_VALUE = 40005
+REG_ERROR = 40008         # ModbusUI 는 오류 비트를 raw_regs[7] (40001+7) 에서 읽는다
+REG_BAR = 40011
+REG_VERSION = 40022
+REG_FW_STATUS = 40023     # bit0 OK, bit1 FAIL, bit2 진행중, bit4/5/6 롤백, 상위바이트 에러코드
+REG_FW_PROGRESS = 40024   # 하위바이트 진행률(%), 상위바이트 남은 시간(s)
+REG_SENSOR_MODEL = 40030  # 40030~40033 ASCII 8자
+REG_TFTP_IP = 40088       # 40088/40089
+REG_FW_CTRL = 40091
+REG_ZERO = 40092
+REG_RESET = 40093
+REG_MODEL_SELECT = 40094
+
+BLOCK_SIZE = 100
+
+STATUS_AL1 = 1 << 6
+STATUS_AL2 = 1 << 7
+
+FW_OK = 1 << 0
+FW_FAIL = 1 << 1
+FW_RUNNING = 1 << 2
+
+# 모델별 읽기 가능한 레지스터 구간 (40001 기준 오프셋, [start, end))
+MODEL_READABLE = {
+    "ASGD3000": [(off(40001), off(40022) + 1)],
+    "ASGD3200": [(off(40001), off(40024) + 1), (off(REG_TFTP_IP), off(REG_MODEL_SELECT) + 1)],
+    "ASGD3210": [
+        (off(40001), off(40024) + 1),
+        (off(REG_SENSOR_MODEL), off(REG_SENSOR_MODEL) + 4),
+        (off(REG_TFTP_IP), off(REG_MODEL_SELECT) + 1),
+    ],
+}
+MODEL_SELECT_TO_NAME = {0: "ASGD3200", 1: "ASGD3210"}
+
+PROFILES = ("zero", "flat", "sine", "ramp", "alarm", "noisy")
+
+
+def _profile_value(profile, t, full_scale, rnd):
+    if profile == "zero":
+        return 0.0
+    if profile == "flat":
+        return full_scale * 0.1
+    if profile == "sine":
+        return full_scale * (0.25 + 0.2 * math.sin(2 * math.pi * t / 60.0))
+    if profile == "ramp":
+        # 0 → 80% 까지 120초 동안 상승 후 다시 0
+        return full_scale * 0.8 * ((t % 120.0) / 120.0)
+    if profile == "alarm":
+        # 90초 주기로 20초 동안 AL2 이상까지 튄다
+        phase = t % 90.0
+        return full_scale * (0.75 if 30.0 <= phase < 50.0 else 0.05)
+    if profile == "noisy":
+        return max(0.0, full_scale * 0.2 + rnd.gauss(0, full_scale * 0.02))
+    raise ValueError(f"unknown profile: {profile}")
+
+
+class VirtualDetector:
+    def __init__(self, model="ASGD3210", profile="sine", full_scale=9999, al1=0.3, al2=0.6,
+                 version=123, sensor_model="ORG", fw_duration=20.0, reboot_sec=5.0, events=None, seed=None):
+        self.model = model
+        self.profile = profile
+        self.full_scale = full_scale
+        self.al1 = al1
+        self.al2 = al2
+        self.version = version
+        self.sensor_model = sensor_model
+        self.fw_duration = fw_duration
+        self.reboot_sec = reboot_sec
+        self.events = sorted(events or [], key=lambda e: e.get("t", 0))
+        self.rnd = random.Random(seed)
+
+        self.regs = [0] * BLOCK_SIZE
+        self.t0 = time.monotonic()
+        self.zero_offset = 0.0
+        self.error_bits = 0
+        self.fw_started_at = None
+        self.fw_result = 0
+        self.offline_until = 0.0
+        self.on_reboot = None   # 서버 측에서 연결 끊기/재기동 처리용 콜백
+        self._next_event = 0
+
+        self._write_model_block()
+
+    # 상태 -------------------------------------------------------------------
+    def _write_model_block(self):
+        raw = self.sensor_model.encode("ascii", errors="ignore")[:8].ljust(8, b"\x00")
+        for n in range(4):
+            self.regs[off(REG_SENSOR_MODEL) + n] = (raw[2 * n] << 8) | raw[2 * n + 1]
+
+    def readable(self, address, count):
+        end = address + count
+        return any(start <= address and end <= stop for start, stop in MODEL_READABLE[self.model])
+
+    def is_online(self):
+        return time.monotonic() >= self.offline_until
+
+    def _run_events(self, t):
+        while self._next_event < len(self.events) and self.events[self._next_event].get("t", 0) <= t:
+            ev = self.events[self._next_event]
+            self._next_event += 1
+            if "error" in ev:
+                self.error_bits = int(ev["error"]) & 0x0F
+            if "profile" in ev:
+                self.profile = ev["profile"]
+            if ev.get("fw_upgrade"):
+                self.start_fw_upgrade()
+            if "reboot" in ev:
+                self.reboot(float(ev["reboot"]))
+
+    def refresh(self):
+        now = time.monotonic()
+        t = now - self.t0
+        self._run_events(t)
+
+        value = max(0.0, _profile_value(self.profile, t, self.full_scale, self.rnd) - self.zero_offset)
+        value = int(min(value, self.full_scale))
+
+        status = 0
+        if value >= self.full_scale * self.al1:
+            status |= STATUS_AL1
+        if value >= self.full_scale * self.al2:
+            status |= STATUS_AL2
+
+        regs = self.regs
+        regs[off(REG_STATUS)] = status
+        regs[off(REG_VALUE)] = value
+        regs[off(REG_ERROR)] = self.error_bits
+        regs[off(REG_BAR)] = int(100 * value / self.full_scale) if self.full_scale else 0
+        regs[off(REG_VERSION)] = self.version
+
+        if self.fw_started_at is not None:
+            elapsed = now - self.fw_started_at
+            if elapsed >= self.fw_duration:
+                self.fw_started_at = None
+                self.fw_result = FW_OK
+                self.version += 1
+                regs[off(REG_FW_STATUS)] = FW_OK
+                regs[off(REG_FW_PROGRESS)] = 100
+                self.reboot(self.reboot_sec)
+            else:
+                progress = int(100 * elapsed / self.fw_duration)
+                remain = int(self.fw_duration - elapsed)
+                regs[off(REG_FW_STATUS)] = FW_RUNNING
+                regs[off(REG_FW_PROGRESS)] = ((remain & 0xFF) << 8) | (progress & 0xFF)
+        else:
+            regs[off(REG_FW_STATUS)] = self.fw_result
+
+    # 명령 -------------------------------------------------------------------
+    def start_fw_upgrade(self):
+        if self.model == "ASGD3000":
+            return
+        self.fw_started_at = time.monotonic()
+        self.fw_result = 0
+
+    def reboot(self, seconds=None):
+        self.offline_until = time.monotonic() + (self.reboot_sec if seconds is None else seconds)
+        if self.on_reboot is not None:
+            self.on_reboot()
+
+    def on_write(self, address, values):
+        for n, value in enumerate(values):
+            reg = address + n + 40001
+            if reg == REG_FW_CTRL and value == 1:
+                self.start_fw_upgrade()
+            elif reg == REG_ZERO and value == 1:
+                self.zero_offset = _profile_value(self.profile, time.monotonic() - self.t0, self.full_scale, self.rnd)
+            elif reg == REG_RESET and value == 1:
+                self.reboot()
+            elif reg == REG_MODEL_SELECT and value in MODEL_SELECT_TO_NAME:
+                self.model = MODEL_SELECT_TO_NAME[value]
+                self.reboot()
+
+
+class DetectorDataBlock(ModbusSequentialDataBlock):
+    def __init__(self, detector):
+        super().__init__(0, detector.regs)
+        self.detector = detector
+        self.values = detector.regs
+
+    def validate(self, address, count=1):
+        return self.detector.is_online() and self.detector.readable(address, count)
+
+    def getValues(self, address, count=1):
+        self.detector.refresh()
+        return super().getValues(address, count)
+
+    def setValues(self, address, values):
+        if not isinstance(values, list):
+            values = [values]
+        super().setValues(address, values)
+        self.detector.on_write(address, values)
+
+
+class DetectorServer:
+    """가상 검지기 1대 = TCP 서버 1개. 재부팅 중에는 포트를 닫는다."""
+
+    def __init__(self, detector, host, port):
+        self.detector = detector
+        self.host = host
+        self.port = port
+        self.server = None
+        detector.on_reboot = self._on_reboot
+
+    def _make_server(self):
+        block = DetectorDataBlock(self.detector)
+        context = ModbusServerContext(slaves=ModbusSlaveContext(hr=block, zero_mode=True), single=True)
+        return ModbusTcpServer(context, address=(self.host, self.port))
+
+    async def start(self):
+        self.server = self._make_server()
+        await self.server.listen()
+
+    def _on_reboot(self):
+        loop = asyncio.get_running_loop()
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        delay = max(0.0, self.detector.offline_until - time.monotonic())
+        loop.call_later(delay, lambda: loop.create_task(self.start()))
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+
+class BusContext(ModbusServerContext):
+    """유닛 ID 1..N 에 검지기를 붙인 컨텍스트. 재부팅 중인 유닛은 버스에 없는 것으로 처리한다."""
+
+    def __init__(self, detectors):
+        self.detectors = dict(enumerate(detectors, start=1))
+        slaves = {unit: ModbusSlaveContext(hr=DetectorDataBlock(d), zero_mode=True) for unit, d in self.detectors.items()}
+        super().__init__(slaves=slaves, single=False)
+
+    def __getitem__(self, slave):
+        detector = self.detectors.get(slave)
+        if detector is not None and not detector.is_online():
+            raise NoSuchSlaveException(f"slave - {slave} is rebooting")
+        return super().__getitem__(slave)
+
+
+class GatewayServer(DetectorServer):
+    """
+    Modbus TCP ↔ RS-485 게이트웨이 흉내: 한 포트에서 유닛 ID 1..N 으로 여러 검지기가 응답한다.
+    재부팅 중인 유닛은 0x0B(Gateway Target No Response) 로 응답하고 포트는 열린 채로 둔다.
+    """
+
+    def __init__(self, detectors, host, port):
+        self.detectors = detectors
+        self.host = host
+        self.port = port
+        self.server = None
+
+    def _make_server(self):
+        return ModbusTcpServer(BusContext(self.detectors), address=(self.host, self.port))
+
+
+class VirtualRtuLink:
+    """
+    pty 두 개를 null-modem 케이블처럼 잇는다 (socat 없이 RTU 테스트용).
+    pty 자체는 baud 와 상관없이 바로 전달하므로 바이트 수만큼 전송 시간을 흉내 낸다.
+    client_port 는 modbus_ui 쪽, server_port 는 RtuBusServer 쪽이 연다.
+    """
+
+    def __init__(self, baudrate=9600):
+        self.baudrate = baudrate
+        self._client_master, client_slave = os.openpty()
+        self._server_master, server_slave = os.openpty()
+        for fd in (client_slave, server_slave):
+            tty.setraw(fd)
+        self.client_port = os.ttyname(client_slave)
+        self.server_port = os.ttyname(server_slave)
+        # 열어 둔 채로 두어야 상대편이 닫혀도 pty 가 사라지지 않는다
+        self._slaves = (client_slave, server_slave)
+
+    def _pump(self, src, dst):
+        char_time = 10.0 / self.baudrate
+        while True:
+            try:
+                data = os.read(src, 256)
+            except OSError:
+                return
+            time.sleep(len(data) * char_time)
+            os.write(dst, data)
+
+    def start(self):
+        for src, dst in ((self._client_master, self._server_master), (self._server_master, self._client_master)):
+            threading.Thread(target=self._pump, args=(src, dst), daemon=True).start()
+        return self
+
+
+class RtuBusServer:
+    """RS-485 버스 1개: 유닛 ID 1..N 검지기가 RTU 로 응답. 재부팅 중인 유닛은 무응답."""
+
+    def __init__(self, detectors, port, baudrate=9600):
+        self.detectors = detectors
+        self.port = port
+        self.baudrate = baudrate
+        self.server = None
+
+    async def start(self):
+        self.server = ModbusSerialServer(
+            BusContext(self.detectors),
+            framer=Framer.RTU,
+            port=self.port,
+            baudrate=self.baudrate,
+            ignore_missing_slaves=True,
+        )
+        await self.server.listen()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+
+class LatencyProxy:
+    """
+    고지연(VPN/LTE) 링크 흉내: 바이트를 양방향으로 rtt/2 씩 늦춰 전달한다.
+    지연만 더할 뿐 직렬화하지 않으므로 여러 요청이 동시에 떠 있을 수 있다.
+    cut() 하면 연결은 그대로 둔 채 양방향 데이터를 버린다 (케이블 뽑힘/장비 먹통 흉내).
+    """
+
+    def __init__(self, host, port, target_port, rtt):
+        self.host = host
+        self.port = port
+        self.target_port = target_port
+        self.rtt = rtt
+        self.server = None
+        self.is_cut = False
+
+    def cut(self):
+        self.is_cut = True
+
+    def restore(self):
+        self.is_cut = False
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def _handle(self, reader, writer):
+        try:
+            up_reader, up_writer = await asyncio.open_connection(self.host, self.target_port)
+        except OSError:
+            writer.close()
+            return
+        await asyncio.gather(self._pipe(reader, up_writer), self._pipe(up_reader, writer), return_exceptions=True)
+
+    async def _pipe(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        delayed = asyncio.Queue()
+
+        async def _send():
+            while True:
+                deliver_at, data = await delayed.get()
+                await asyncio.sleep(max(0.0, deliver_at - loop.time()))
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        sender = asyncio.create_task(_send())
+        try:
+            while True:
+                data = await reader.read(4096)
+                if data and self.is_cut:
+                    continue
+                await delayed.put((loop.time() + self.rtt / 2, data))
+                if not data:
+                    break
+        except OSError:
+            await delayed.put((loop.time(), b""))
+        await sender
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+
+LATENCY_PORT_OFFSET = 20000   # --rtt 일 때 실제 서버는 port + offset 에서 듣고, 원래 포트는 LatencyProxy
+
+
+def build_detectors(count, model="ASGD3210", profile="mixed", scenario=None, seed=0):
+    specs = (scenario or {}).get("devices", [])
+    detectors = []
+    for n in range(count):
+        spec = dict(specs[n % len(specs)]) if specs else {}
+        spec.setdefault("model", model)
+        if profile == "mixed":
+            spec.setdefault("profile", PROFILES[n % len(PROFILES)])
+        else:
+            spec.setdefault("profile", profile)
+        spec.setdefault("seed", seed + n)
+        detectors.append(VirtualDetector(**spec))
+    return detectors
+
+
+def device_addresses(count, base_port=15020, host="127.0.0.1", ip_start=None):
+    if ip_start:
+        first = ipaddress.ip_address(ip_start)
+        return [(str(first + n), base_port) for n in range(count)]
+    return [(host, base_port + n) for n in range(count)]
+
+
+async def serve(detectors, addresses, ready=None, units=1, rtt=0.0, proxies=None):
+    """proxies 에 리스트를 주면 rtt 가 0 이어도 LatencyProxy 를 앞에 두고 그 목록을 채운다 (cut 시험용)."""
+    use_proxy = rtt > 0 or proxies is not None
+    listen = addresses
+    if use_proxy:
+        listen = [(host, port + LATENCY_PORT_OFFSET) for host, port in addresses]
+    if units > 1:
+        servers = [
+            GatewayServer(detectors[n * units:(n + 1) * units], host, port)
+            for n, (host, port) in enumerate(listen)
+        ]
+    else:
+        servers = [DetectorServer(d, host, port) for d, (host, port) in zip(detectors, listen)]
+    if use_proxy:
+        links = [LatencyProxy(host, port, port + LATENCY_PORT_OFFSET, rtt) for host, port in addresses]
+        if proxies is not None:
+            proxies.extend(links)
+        servers += links
+    await asyncio.gather(*(s.start() for s in servers))
+    if ready is not None:
+        ready.set()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for s in servers:
+            s.close()
+
+
+def serve_in_thread(detectors, addresses, units=1, rtt=0.0, proxies=None):
+    """테스트/벤치마크용: 백그라운드 스레드에서 서버를 띄우고 준비될 때까지 기다린다."""
+    ready = threading.Event()
+    t = threading.Thread(
+        target=lambda: asyncio.run(serve(detectors, addresses, ready, units, rtt, proxies)), daemon=True
+    )
+    t.start()
+    ready.wait(timeout=30)
+    return t
+
+
+async def serve_rtu(detectors, link, ready=None):
+    server = RtuBusServer(detectors, link.server_port, link.baudrate)
+    await server.start()
+    if ready is not None:
+        ready.set()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        server.close()
+
+
+def serve_rtu_in_thread(detectors, baudrate=9600):
+    """pty RTU 버스를 띄우고 클라이언트가 열 장치 경로를 돌려준다."""
+    link = VirtualRtuLink(baudrate).start()
+    ready = threading.Event()
+    threading.Thread(target=lambda: asyncio.run(serve_rtu(detectors, link, ready)), daemon=True).start()
+    ready.wait(timeout=30)
+    return link.client_port
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASGD-3200 register-map simulator")
+    parser.add_argument("--count", type=int, default=4)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=15020)
+    parser.add_argument("--ip-start", default=None, help="장치마다 다른 루프백 IP 사용 (예: 127.0.1.1), 포트는 고정")
+    parser.add_argument("--model", choices=sorted(MODEL_READABLE), default="ASGD3210")
+    parser.add_argument("--profile", choices=PROFILES + ("mixed",), default="mixed")
+    parser.add_argument("--scenario", default=None, help="JSON 시나리오 파일")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--units", type=int, default=1, help="주소(포트)당 유닛 수. 2 이상이면 RS-485 게이트웨이 모드")
+    parser.add_argument("--rtu", action="store_true", help="TCP 대신 pty RTU 버스 1개에 유닛 1..count")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--rtt", type=float, default=0.0, help="왕복 지연(ms). 고지연 링크 흉내")
+    args = parser.parse_args()
+
+    scenario = None
+    if args.scenario:
+        with open(args.scenario, "r") as f:
+            scenario = json.load(f)
+
+    if args.rtu:
+        detectors = build_detectors(args.count, args.model, args.profile, scenario, args.seed)
+        link = VirtualRtuLink(args.baud).start()
+        bus = link.client_port if args.baud == 9600 else f"{link.client_port}:{args.baud}"
+        print(f"[SIM] RTU bus {args.baud}bps, unit 1~{args.count}: {bus}/1 ~ {bus}/{args.count}")
+        try:
+            asyncio.run(serve_rtu(detectors, link))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    detectors = build_detectors(args.count * args.units, args.model, args.profile, scenario, args.seed)
+    addresses = device_addresses(args.count, args.base_port, args.host, args.ip_start)
+    print(f"[SIM] {args.count} devices: {addresses[0][0]}:{addresses[0][1]} ~ {addresses[-1][0]}:{addresses[-1][1]}")
+    if args.units > 1:
+        print(f"[SIM] gateway mode: unit 1~{args.units} per address")
+    if args.rtt > 0:
+        print(f"[SIM] RTT {args.rtt:.0f}ms (실제 서버 포트 +{LATENCY_PORT_OFFSET})")
+    try:
+        asyncio.run(serve(detectors, addresses, units=args.units, rtt=args.rtt / 1000.0))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# coding: utf-8
+#
+# 스레드(장치당 1개) 폴링 vs AsyncModbusEngine 폴링 비교 벤치마크.
+# asgd_simulator 의 가상 검지기를 별도 프로세스로 띄우고, 클라이언트 측 CPU 사용률과
+# 초당 폴링 수를 측정한다.
+#
+#   python bench_modbus_poll.py                 # 4, 32, 128 대
+#   python bench_modbus_poll.py --devices 8 --duration 5 --mode async
+#   python bench_modbus_poll.py --devices 8 16 32 --rtu 19200     # pty RTU 버스 1개에 유닛 N개
+#   python bench_modbus_poll.py --devices 8 --rtt 300 --interval 0.05 --mode thread --pipeline 4
+
+import argparse
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+
+from pymodbus.exceptions import ModbusIOException
+
+from asgd_simulator import build_detectors, device_addresses, serve, serve_rtu_in_thread
+from modbus_async import AsyncModbusEngine
+from modbus_capture import RECORDER, CapturingTcpClient
+from modbus_endpoint import EndpointPool
+from modbus_pipeline import PipelinedTcpClient
+from poll_scheduler import AdaptivePollScheduler, DeadlineScheduler
+from register_schema import SCHEMAS, ReadPlan
+
+HOST = "127.0.0.1"
+BASE_PORT = 15020
+
+
+def _serve_devices(count, base_port, ready, rtt=0.0):
+    detectors = build_detectors(count, profile="mixed")
+    asyncio.run(serve(detectors, device_addresses(count, base_port, HOST), ready, rtt=rtt))
+
+
+class _BenchListener:
+    def __init__(self, interval, budget=None, adaptive=False):
+        self.communication_interval = interval
+        self.polls = 0
+        self.requests = 0
+        self.errors = 0
+        self.plans = {}
+        self.scheduler = None
+        # ModbusUI 와 같이 절대 시각 격자에 맞춰 폴링 (RTT 만큼 주기가 밀리지 않음)
+        self.deadlines = DeadlineScheduler()
+        if adaptive:
+            self.scheduler = AdaptivePollScheduler(base_interval=interval, budget_rps=budget)
+
+    def poll_requests(self, box_index):
+        plan = self.plans.get(box_index)
+        if plan is None:
+            plan = self.plans[box_index] = ReadPlan(SCHEMAS["ASGD3210"])
+        return plan.due_requests()
+
+    def apply_poll_response(self, box_index, request, response):
+        if response.isError():
+            raise ModbusIOException(f"Error reading {request}")
+        return self.plans[box_index].apply(request, response.registers)
+
+    def begin_poll(self, box_index):
+        self.deadlines.started(box_index)
+
+    def process_poll_fields(self, box_index, fresh):
+        self.polls += 1
+
+    def next_poll_delay(self, box_index, request_count):
+        self.requests += request_count
+        if self.scheduler is None:
+            interval = self.communication_interval
+        else:
+            interval = self.scheduler.update(box_index, self.plans[box_index].values, request_count=request_count)
+        return self.deadlines.next_delay(box_index, interval)
+
+    def poll_failed(self, box_index, timeout=False):
+        return self.communication_interval * 2
+
+    def handle_connection_lost(self, box_index):
+        self.errors += 1
+
+    def next_reconnect_delay(self, box_index):
+        return 2.0
+
+    def report_reconnect_attempt(self, box_index):
+        pass
+
+    def restore_after_reconnect(self, ip, box_index):
+        pass
+
+    def show_reconnected(self, box_index):
+        pass
+
+
+def _run_threads(count, interval, duration, budget=None, adaptive=False, depth=1):
+    listener = _BenchListener(interval, budget, adaptive)
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def _finish(box_index, requests, responses):
+        ok = True
+        for request, rr in zip(requests, responses):
+            if rr.isError():
+                ok = False
+                break
+            listener.apply_poll_response(box_index, request, rr)
+        with lock:
+            if ok:
+                listener.polls += 1
+            else:
+                listener.errors += 1
+            return listener.next_poll_delay(box_index, len(requests))
+
+    def _worker(box_index, port):
+        client = CapturingTcpClient(HOST, port=port, timeout=3)
+        client.connect()
+        while not stop.is_set():
+            requests = listener.poll_requests(box_index)
+            responses = [client.read_holding_registers(r.address, r.count) for r in requests]
+            time.sleep(_finish(box_index, requests, responses))
+        client.close()
+
+    def _pipelined_worker(box_index, port):
+        # modbus_ui.read_modbus_data_pipelined 와 같은 방식: 폴링을 depth 개까지 겹쳐 띄움
+        client = PipelinedTcpClient(HOST, port=port, timeout=3, per_unit=depth)
+        client.connect()
+        inflight = deque()
+        while not stop.is_set():
+            requests = listener.poll_requests(box_index)
+            inflight.append((requests, [client.submit_read(r.address, r.count) for r in requests]))
+            delay = 0.0
+            while inflight and (len(inflight) >= depth or all(f.done() for f in inflight[0][1])):
+                sent, futures = inflight.popleft()
+                delay = _finish(box_index, sent, [f.result() for f in futures])
+            time.sleep(delay)
+        client.close()
+
+    worker = _pipelined_worker if depth > 1 else _worker
+
+    threads = [threading.Thread(target=worker, args=(n, BASE_PORT + n), daemon=True) for n in range(count)]
+    for t in threads:
+        t.start()
+    result = _measure(listener, duration)
+    stop.set()
+    for t in threads:
+        t.join(timeout=5)
+    return result
+
+
+def _run_rtu(count, interval, duration, budget=None, adaptive=False, baud=9600):
+    """RTU 버스 1개를 유닛 count 개가 공유 (modbus_ui 스레드 경로와 같은 EndpointPool/RtuBus)."""
+    listener = _BenchListener(interval, budget, adaptive)
+    path = serve_rtu_in_thread(build_detectors(count, profile="mixed"), baud)
+    pool = EndpointPool()
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def _worker(box_index):
+        client = pool.unit_client(path, baud, box_index + 1)
+        client.connect()
+        while not stop.is_set():
+            requests = listener.poll_requests(box_index)
+            ok = True
+            for request in requests:
+                rr = client.read_holding_registers(request.address, request.count)
+                if rr.isError():
+                    ok = False
+                    break
+                listener.apply_poll_response(box_index, request, rr)
+            with lock:
+                if ok:
+                    listener.polls += 1
+                else:
+                    listener.errors += 1
+                delay = listener.next_poll_delay(box_index, len(requests))
+            time.sleep(delay)
+        client.close()
+
+    threads = [threading.Thread(target=_worker, args=(n,), daemon=True) for n in range(count)]
+    for t in threads:
+        t.start()
+    time.sleep(0.5)
+    bus = pool.serial_buses()[0]
+    bus.stats.snapshot(reset=True)
+    result = _measure(listener, duration)
+    result["bus"] = bus.stats.snapshot()
+    stop.set()
+    for t in threads:
+        t.join(timeout=5)
+    return result
+
+
+def _run_async(count, interval, duration, budget=None, adaptive=False):
+    listener = _BenchListener(interval, budget, adaptive)
+    engine = AsyncModbusEngine(listener)
+    engine.start()
+    for n in range(count):
+        if engine.connect_device(n, HOST, BASE_PORT + n).result():
+            engine.start_polling(n).result()
+    result = _measure(listener, duration)
+    engine.stop()
+    return result
+
+
+def _measure(listener, duration):
+    time.sleep(0.5)
+    polls0 = listener.polls
+    requests0 = listener.requests
+    cpu0 = time.process_time()
+    t0 = time.monotonic()
+    time.sleep(duration)
+    elapsed = time.monotonic() - t0
+    cpu = time.process_time() - cpu0
+    return {
+        "polls_per_sec": (listener.polls - polls0) / elapsed,
+        "requests_per_sec": (listener.requests - requests0) / elapsed,
+        "cpu_percent": 100.0 * cpu / elapsed,
+        "errors": listener.errors,
+        "missed_deadlines": sum(s["missed"] for s in listener.deadlines.stats().values()),
+        "threads": threading.active_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modbus polling benchmark")
+    parser.add_argument("--devices", type=int, nargs="*", default=[4, 32, 128])
+    parser.add_argument("--interval", type=float, default=0.2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mode", choices=["thread", "async", "both"], default="both")
+    parser.add_argument("--adaptive", action="store_true", help="AdaptivePollScheduler 로 주기 조절")
+    parser.add_argument("--budget", type=float, default=None, help="패널 전체 초당 요청 수 상한 (--adaptive)")
+    parser.add_argument("--rtu", type=int, default=None, metavar="BAUD", help="TCP 대신 pty RTU 버스 1개로 측정")
+    parser.add_argument("--rtt", type=float, default=0.0, help="가상 검지기 왕복 지연(ms)")
+    parser.add_argument("--pipeline", type=int, default=1, help="thread 모드 파이프라인 깊이 (2 이상이면 PipelinedTcpClient)")
+    parser.add_argument("--no-capture", action="store_true", help="통신 기록기(modbus_capture) 끄고 측정")
+    args = parser.parse_args()
+    RECORDER.enabled = not args.no_capture
+
+    if args.rtu:
+        print(f"{'units':>8} {'baud':>7} {'polls/s':>9} {'req/s':>8} {'avg ms':>7} {'busy':>6} {'eff':>6} {'errors':>7}")
+        for count in args.devices:
+            r = _run_rtu(count, args.interval, args.duration, args.budget, args.adaptive, args.rtu)
+            bus = r["bus"]
+            print(
+                f"{count:>8} {args.rtu:>7} {r['polls_per_sec']:>9.1f} {r['requests_per_sec']:>8.1f} {bus['avg_ms']:>7.1f} "
+                f"{bus['busy']:>6.0%} {bus['efficiency']:>6.0%} {r['errors']:>7}"
+            )
+        return
+
+    modes = ["thread", "async"] if args.mode == "both" else [args.mode]
+    runners = {"thread": lambda *a: _run_threads(*a, depth=args.pipeline), "async": _run_async}
+
+    print(f"{'devices':>8} {'mode':>7} {'polls/s':>9} {'req/s':>8} {'ideal':>7} {'cpu%':>7} {'threads':>8} {'errors':>7} {'missed':>7}")
+    for count in args.devices:
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=_serve_devices, args=(count, BASE_PORT, ready, args.rtt / 1000.0), daemon=True)
+        server.start()
+        ready.wait(timeout=30)
+        try:
+            for mode in modes:
+                r = runners[mode](count, args.interval, args.duration, args.budget, args.adaptive)
+                print(
+                    f"{count:>8} {mode:>7} {r['polls_per_sec']:>9.1f} {r['requests_per_sec']:>8.1f} {count / args.interval:>7.0f} "
+                    f"{r['cpu_percent']:>7.1f} {r['threads']:>8} {r['errors']:>7} {r['missed_deadlines']:>7}"
+                )
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
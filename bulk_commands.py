@@ -0,0 +1,100 @@
+# bulk_commands.py
+#
+# 여러 박스에 같은 명령(ZERO/RST/모델 변경/TFTP IP 쓰기)을 동시에 보내고 결과를 모은다.
+# 명령 자체는 각 박스의 DeviceCommandQueue 로 들어가 그 박스의 폴링 루프가 실행하므로
+# 박스끼리는 병렬, 한 박스 안에서는 폴링과 차례로 실행된다. 동시에 기다리는 박스 수는 concurrency 로 제한.
+#
+#   results = run_bulk([(0, "192.168.0.10"), (1, "192.168.0.11")], send, concurrency=8, retries=1)
+#
+# send(box_index, ip) 는 명령 1회를 보내고 응답을 돌려준다 (박스별 타임아웃은 send 가 지킨다).
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from pymodbus.pdu import ExceptionResponse
+
+STATUS_OK = "ok"
+STATUS_REBOOTING = "rebooting"   # 재부팅되는 명령(RST/모델 변경) 뒤 무응답 → 전송된 것으로 본다
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+# 장비가 명령을 받고 바로 재부팅하면 응답 대신 이런 오류가 난다
+NO_RESPONSE_MARKERS = (
+    "No response received",
+    "No Response received",
+    "Invalid Message",
+    "Unable to decode response",
+    "Connection unexpectedly closed",
+)
+
+BULK_CONCURRENCY = 8
+BULK_TIMEOUT = 3.0
+BULK_RETRIES = 1
+RETRY_DELAY = 0.3
+
+
+class BulkResult(NamedTuple):
+    box_index: int
+    ip: str
+    status: str
+    attempts: int = 0
+    elapsed: float = 0.0
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (STATUS_OK, STATUS_REBOOTING)
+
+
+class _Rejected(Exception):
+    """장비가 예외 응답으로 거부: 다시 보내도 같으므로 재시도하지 않는다."""
+
+
+def _check(response):
+    if isinstance(response, ExceptionResponse):
+        raise _Rejected(str(response))
+    if getattr(response, "isError", lambda: False)():
+        raise IOError(str(response))
+    return response
+
+
+def run_one(box_index, ip, send, retries=BULK_RETRIES, reboots=False) -> BulkResult:
+    started = time.monotonic()
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            _check(send(box_index, ip))
+            return BulkResult(box_index, ip, STATUS_OK, attempts, time.monotonic() - started)
+        except _Rejected as e:
+            return BulkResult(box_index, ip, STATUS_FAILED, attempts, time.monotonic() - started, str(e))
+        except Exception as e:
+            message = str(e) or type(e).__name__
+            if reboots and any(m in message for m in NO_RESPONSE_MARKERS):
+                return BulkResult(box_index, ip, STATUS_REBOOTING, attempts, time.monotonic() - started, message)
+        if attempts > retries:
+            return BulkResult(box_index, ip, STATUS_FAILED, attempts, time.monotonic() - started, message)
+        time.sleep(RETRY_DELAY)
+
+
+def run_bulk(jobs, send, concurrency=BULK_CONCURRENCY, retries=BULK_RETRIES, reboots=False, on_result=None):
+    """
+    jobs: [(box_index, ip)]. 박스마다 끝나는 대로 on_result(BulkResult) 를 부르고(작업 스레드),
+    박스 번호 순서의 결과 목록을 돌려준다.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    def _job(box_index, ip):
+        result = run_one(box_index, ip, send, retries, reboots)
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    workers = max(1, min(int(concurrency), len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk") as pool:
+        futures = [pool.submit(_job, box_index, ip) for box_index, ip in jobs]
+        results = [f.result() for f in futures]
+    return sorted(results)
@@ -0,0 +1,74 @@
+# capability_cache.py
+#
+# IP 별 장비 능력(FW 상태/TFTP/센서 모델 지원, 모델명, 버전)을 디스크에 저장해 두고
+# 연결/재연결 때 별도 probe 없이 바로 폴링을 시작하는 데 쓴다.
+# 캐시 값은 첫 정상 폴링 응답으로 다시 확인한다 (ModbusUI.verify_capabilities).
+
+import json
+import os
+import threading
+
+
+class CapabilityCache:
+    FIELDS = ("fw_status", "tftp", "sensor_model", "model", "version", "sensor_model_name", "fc23")
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+            if isinstance(data, dict):
+                self._entries = {k: v for k, v in data.items() if isinstance(v, dict)}
+        except Exception:
+            # 깨진 캐시는 무시하고 처음부터 다시 확인
+            self._entries = {}
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self._entries, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def get(self, ip):
+        with self._lock:
+            entry = self._entries.get(ip)
+            return dict(entry) if entry is not None else None
+
+    def put(self, ip, caps):
+        entry = {k: caps.get(k) for k in self.FIELDS}
+        with self._lock:
+            if self._entries.get(ip) == entry:
+                return
+            self._entries[ip] = entry
+            try:
+                self._save()
+            except OSError:
+                pass
+
+    def set(self, ip, key, value):
+        """이미 있는 항목의 값 하나만 바꾼다 (연결 중에 알게 된 능력, 예: FC23 지원)."""
+        with self._lock:
+            entry = self._entries.get(ip)
+            if entry is None or entry.get(key) == value:
+                return
+            entry[key] = value
+            try:
+                self._save()
+            except OSError:
+                pass
+
+    def forget(self, ip):
+        with self._lock:
+            if self._entries.pop(ip, None) is None:
+                return
+            try:
+                self._save()
+            except OSError:
+                pass
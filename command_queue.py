@@ -0,0 +1,132 @@
+# command_queue.py
+#
+# 연결(장비)별 요청 큐.
+# ZERO/RST/모델 변경/FW 시작 같은 운전자 명령을 락 경쟁 없이 폴링 루프가 직접 실행한다.
+# 폴링 루프는 읽기 요청 사이와 대기 시간 중에 큐를 비우므로, 명령은 진행 중인 요청 1건(RTT)
+# 이상 기다리지 않고 버려지지도 않는다. 결과는 concurrent.futures.Future 로 돌려준다.
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from pymodbus.exceptions import ConnectionException
+
+PRIORITY_COMMAND = 0     # 운전자 쓰기 명령
+PRIORITY_READ = 10       # 부가 읽기 (TFTP IP 등)
+
+
+class DeviceCommand:
+    __slots__ = ("priority", "seq", "method", "args", "kwargs", "future")
+
+    def __init__(self, priority, seq, method, args, kwargs):
+        self.priority = priority
+        self.seq = seq
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def run(self, client):
+        """동기 클라이언트로 실행하고 결과/예외를 future 에 넣는다."""
+        try:
+            result = getattr(client, self.method)(*self.args, **self.kwargs)
+        except Exception as e:
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(result)
+
+
+class DeviceCommandQueue:
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed_reason = None
+        self._waker = None
+        self._interrupted = False
+
+    def set_waker(self, waker):
+        # asyncio 엔진용: 다른 스레드에서 명령이 들어오면 루프 쪽 대기를 깨운다.
+        self._waker = waker
+
+    def submit(self, method, *args, priority=PRIORITY_COMMAND, **kwargs) -> Future:
+        cmd = DeviceCommand(priority, next(self._seq), method, args, kwargs)
+        with self._cond:
+            if self._closed_reason is not None:
+                cmd.future.set_exception(ConnectionException(self._closed_reason))
+                return cmd.future
+            heapq.heappush(self._heap, cmd)
+            self._cond.notify_all()
+        waker = self._waker
+        if waker is not None:
+            waker()
+        return cmd.future
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap)
+
+    def pop(self):
+        """다음 실행할 명령 (취소된 것은 건너뜀). 없으면 None."""
+        with self._cond:
+            while self._heap:
+                cmd = heapq.heappop(self._heap)
+                if cmd.future.set_running_or_notify_cancel():
+                    return cmd
+            return None
+
+    def wait(self, timeout) -> bool:
+        with self._cond:
+            if not self._heap and not self._interrupted:
+                self._cond.wait(timeout)
+            return bool(self._heap)
+
+    def interrupt(self):
+        """진행 중인 idle() 을 명령 없이 깨운다 (파이프라인 응답 도착 등)."""
+        with self._cond:
+            self._interrupted = True
+            self._cond.notify_all()
+
+    def _take_interrupt(self) -> bool:
+        with self._cond:
+            interrupted, self._interrupted = self._interrupted, False
+            return interrupted
+
+    def run_pending(self, client) -> int:
+        count = 0
+        while True:
+            cmd = self.pop()
+            if cmd is None:
+                return count
+            cmd.run(client)
+            count += 1
+
+    def idle(self, client, delay, stop_flag=None):
+        """delay 초 동안 대기하면서 그 사이 들어온 명령을 바로 실행한다 (폴링 루프의 sleep 대체)."""
+        deadline = time.monotonic() + delay
+        while stop_flag is None or not stop_flag.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self.wait(remaining):
+                self.run_pending(client)
+            if self._take_interrupt():
+                return
+
+    def fail_pending(self, reason: str):
+        with self._cond:
+            pending, self._heap = self._heap, []
+        for cmd in pending:
+            if cmd.future.set_running_or_notify_cancel():
+                cmd.future.set_exception(ConnectionException(reason))
+
+    def close(self, reason: str = "Socket is closed"):
+        with self._cond:
+            self._closed_reason = reason
+            self._cond.notify_all()
+        self.fail_pending(reason)
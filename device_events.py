@@ -0,0 +1,141 @@
+# device_events.py
+#
+# 폴링 결과 → 변경 이벤트.
+# 폴링마다 읽은 값을 불변 스냅샷(DeviceSnapshot)으로 만들고 직전 스냅샷과 비교해
+# 바뀐 항목만 타입별 이벤트로 구독자에게 보낸다. 값이 그대로인 박스는 이벤트가 없으므로
+# UI 는 아무 일도 하지 않는다. 같은 스트림을 로그/외부 내보내기에서도 구독할 수 있다.
+#
+#   bus.subscribe(callback)                       # 모든 이벤트
+#   bus.subscribe(callback, (AlarmChanged,))      # 알람만
+#
+# 콜백은 폴링 스레드에서 호출되므로 Tk 작업은 큐를 거쳐야 한다.
+
+import threading
+from typing import NamedTuple, Optional
+
+
+class DeviceSnapshot(NamedTuple):
+    value: int
+    bar: int
+    alarm1: bool
+    alarm2: bool
+    error: int
+    version: Optional[int] = None
+    sensor_model: Optional[str] = None
+    fw_status: Optional[int] = None
+    fw_progress: Optional[int] = None
+
+    @classmethod
+    def from_values(cls, values: dict, fw_status_supported: bool = True) -> "DeviceSnapshot":
+        """ReadPlan.values → 스냅샷. 아직 읽지 않은 선택 항목은 None."""
+        return cls(
+            value=values["value"],
+            bar=values["bar"],
+            alarm1=bool(values["alarm1"]),
+            alarm2=bool(values["alarm2"]),
+            error=values["error"],
+            version=values.get("version"),
+            sensor_model=(values.get("sensor_model") or "").strip() or None,
+            fw_status=values.get("fw_status") if fw_status_supported else None,
+            fw_progress=values.get("fw_progress") if fw_status_supported else None,
+        )
+
+
+class DeviceEvent(NamedTuple):
+    box_index: int
+    previous: Optional[DeviceSnapshot]   # 연결 후 첫 폴링이면 None
+    snapshot: DeviceSnapshot
+
+
+class ValueChanged(DeviceEvent):
+    __slots__ = ()
+    FIELDS = ("value", "bar")
+
+
+class AlarmChanged(DeviceEvent):
+    __slots__ = ()
+    FIELDS = ("alarm1", "alarm2")
+
+
+class ErrorChanged(DeviceEvent):
+    __slots__ = ()
+    FIELDS = ("error",)
+
+
+class VersionChanged(DeviceEvent):
+    __slots__ = ()
+    FIELDS = ("version",)
+
+
+class SensorModelChanged(DeviceEvent):
+    __slots__ = ()
+    FIELDS = ("sensor_model",)
+
+
+class FwProgressChanged(DeviceEvent):
+    __slots__ = ()
+    FIELDS = ("fw_status", "fw_progress")
+
+
+# 이벤트 발행 순서 (UI 는 에러 → 알람 순으로 처리해야 알람 램프가 에러 표시를 덮지 않는다)
+EVENT_TYPES = (VersionChanged, SensorModelChanged, ErrorChanged, AlarmChanged, ValueChanged, FwProgressChanged)
+
+
+def diff(box_index: int, previous: Optional[DeviceSnapshot], snapshot: DeviceSnapshot) -> list:
+    events = []
+    for event_type in EVENT_TYPES:
+        new = [getattr(snapshot, f) for f in event_type.FIELDS]
+        if all(v is None for v in new):
+            continue
+        if previous is not None and [getattr(previous, f) for f in event_type.FIELDS] == new:
+            continue
+        events.append(event_type(box_index, previous, snapshot))
+    return events
+
+
+class DeviceEventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def subscribe(self, callback, types=None):
+        """types 를 주면 해당 이벤트 타입만 받는다. 해지용으로 callback 을 그대로 돌려준다."""
+        types = tuple(types) if types else None
+        with self._lock:
+            self._subscribers = self._subscribers + [(callback, types)]
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[0] is not callback]
+
+    def publish(self, events, on_error=None):
+        subscribers = self._subscribers
+        for event in events:
+            for callback, types in subscribers:
+                if types is not None and not isinstance(event, types):
+                    continue
+                try:
+                    callback(event)
+                except Exception as e:
+                    # 구독자 하나의 오류가 폴링 스레드를 멈추게 하지 않는다
+                    if on_error is not None:
+                        on_error(callback, event, e)
+
+
+class SnapshotTracker:
+    """박스별 직전 스냅샷. 연결/재연결/업그레이드 종료 때 reset 하면 다음 폴링에서 전체를 다시 보낸다."""
+
+    def __init__(self, num_boxes: int):
+        self._last = [None] * num_boxes
+
+    def update(self, box_index: int, snapshot: DeviceSnapshot) -> list:
+        previous = self._last[box_index]
+        self._last[box_index] = snapshot
+        return diff(box_index, previous, snapshot)
+
+    def reset(self, box_index: int):
+        self._last[box_index] = None
+
+    def last(self, box_index: int) -> Optional[DeviceSnapshot]:
+        return self._last[box_index]
@@ -0,0 +1,230 @@
+# device_health.py
+#
+# 박스별 통신 건강도와 회로 차단기(circuit breaker).
+#  - 최근 폴링 성공률, 응답 시간 백분위(p50/p95/p99), 응답 기한 초과, 최근 끊김 횟수 → 0~100 점수
+#  - 끊김이 잦거나 성공률이 낮은 박스는 "점검 대기(open)"로 돌려 느린 주기로만 확인(probe)한다.
+#    점검이 성공하면 half-open(정상 주기 시험 폴링) → 연속 close_after 회 성공하면 정상(closed).
+#    점검 대기 중인 박스는 폴링 슬롯, 버스/게이트웨이 락, 화면 갱신을 거의 쓰지 않는다.
+#
+#   health.record_poll(box, True, rtt=0.012)
+#   health.record_poll(box, False, timeout=True)   # 무응답/통신 이상 뒤 늦게 온 응답 (연결은 그대로 - 끊김 아님)
+#   health.record_disconnect(box)                  # 연결이 실제로 닫혔을 때만
+#   delay = health.probe_delay(box, delay)    # 점검 대기 중이면 다음 점검 시각까지로 늘어난다
+#   health.stats()                            # {box: {...}} (JSON 내보내기용)
+
+import math
+import threading
+import time
+from collections import deque
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_OK = 0
+_ERROR = 1
+_TIMEOUT = 2
+
+
+def _percentile(ordered, pct):
+    """정렬된 목록의 nearest-rank 백분위."""
+    if not ordered:
+        return None
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[max(0, min(len(ordered) - 1, rank - 1))]
+
+
+class _BoxHealth:
+    def __init__(self, window):
+        self.results = deque(maxlen=window)   # _OK / _ERROR / _TIMEOUT
+        self.rtts = deque(maxlen=window)      # 성공한 폴링의 응답 시간(초)
+        self.disconnects = deque()            # 끊김 시각 (disconnect_window 안의 것만)
+        self.trips = deque()                  # 점검 대기로 바뀐 시각 (점검 간격 늘리기용)
+        self.state = CLOSED
+        self.probe_at = 0.0
+        self.ok_streak = 0
+        self.polls = 0
+        self.timeouts = 0
+        self.disconnect_total = 0
+        self.trip_total = 0
+
+
+class DeviceHealth:
+    def __init__(self, window=50, disconnect_window=300.0, open_after_disconnects=3, min_success_ratio=0.5,
+                 min_samples=10, probe_interval=10.0, max_probe_interval=60.0, close_after=5, slow_rtt=0.5):
+        self.window = window
+        self.disconnect_window = disconnect_window
+        self.open_after_disconnects = open_after_disconnects
+        self.min_success_ratio = min_success_ratio
+        self.min_samples = min_samples
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self.close_after = close_after
+        # p95 응답 시간이 이보다 길면 점수를 깎는다
+        self.slow_rtt = slow_rtt
+
+        self._lock = threading.Lock()
+        self._boxes = {}
+
+    def _box(self, box_index) -> _BoxHealth:
+        health = self._boxes.get(box_index)
+        if health is None:
+            health = self._boxes[box_index] = _BoxHealth(self.window)
+        return health
+
+    def _prune(self, health, now):
+        horizon = now - self.disconnect_window
+        for times in (health.disconnects, health.trips):
+            while times and times[0] < horizon:
+                times.popleft()
+
+    def _interval(self, health) -> float:
+        """최근 점검 대기 횟수만큼 점검 간격을 두 배씩 (상한 max_probe_interval)."""
+        level = max(0, len(health.trips) - 1)
+        return min(self.max_probe_interval, self.probe_interval * (2 ** level))
+
+    def _trip(self, health, now):
+        health.state = OPEN
+        health.ok_streak = 0
+        health.trips.append(now)
+        health.trip_total += 1
+        health.probe_at = now + self._interval(health)
+        return OPEN
+
+    def _should_trip(self, health) -> bool:
+        if len(health.disconnects) >= self.open_after_disconnects:
+            return True
+        results = health.results
+        return len(results) >= self.min_samples and results.count(_OK) / len(results) < self.min_success_ratio
+
+    def record_poll(self, box_index, ok, rtt=None, timeout=False, now=None):
+        """폴링 1회 결과. 차단기 상태가 바뀌면 새 상태, 아니면 None."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            health = self._box(box_index)
+            self._prune(health, now)
+            health.polls += 1
+            if ok:
+                health.results.append(_OK)
+                if rtt is not None:
+                    health.rtts.append(rtt)
+                health.ok_streak += 1
+                if health.state == OPEN:
+                    # 점검 응답 정상 → 정상 주기로 시험 폴링 (성공률은 새로 잰다)
+                    health.state = HALF_OPEN
+                    health.ok_streak = 1
+                    health.results.clear()
+                    health.results.append(_OK)
+                    return HALF_OPEN
+                if health.state == HALF_OPEN and health.ok_streak >= self.close_after:
+                    health.state = CLOSED
+                    return CLOSED
+                return None
+
+            health.results.append(_TIMEOUT if timeout else _ERROR)
+            if timeout:
+                health.timeouts += 1
+            health.ok_streak = 0
+            if health.state != CLOSED or self._should_trip(health):
+                return self._trip(health, now)
+            return None
+
+    def record_disconnect(self, box_index, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            health = self._box(box_index)
+            self._prune(health, now)
+            health.disconnects.append(now)
+            health.disconnect_total += 1
+            health.ok_streak = 0
+            if health.state == OPEN:
+                # 점검 중 끊김: 상태는 그대로, 다음 점검은 간격만큼 뒤로
+                health.probe_at = max(health.probe_at, now + self._interval(health))
+                return None
+            if health.state == HALF_OPEN or self._should_trip(health):
+                return self._trip(health, now)
+            return None
+
+    def probe_delay(self, box_index, delay, now=None) -> float:
+        """
+        다음 폴링/재연결 시도까지 기다릴 시간. 점검 대기 중이면 다음 점검 시각까지로 늘리고
+        그 다음 점검 시각을 한 간격 뒤로 잡는다.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            health = self._boxes.get(box_index)
+            if health is None or health.state != OPEN:
+                return delay
+            wait = max(delay, health.probe_at - now)
+            health.probe_at = now + wait + self._interval(health)
+            return wait
+
+    def state(self, box_index) -> str:
+        with self._lock:
+            health = self._boxes.get(box_index)
+            return health.state if health is not None else CLOSED
+
+    def interval(self, box_index) -> float:
+        with self._lock:
+            health = self._boxes.get(box_index)
+            return self._interval(health) if health is not None else self.probe_interval
+
+    def forget(self, box_index):
+        """수동 해제: 다음 연결은 기록 없이 시작."""
+        with self._lock:
+            self._boxes.pop(box_index, None)
+
+    def _score(self, health):
+        if not health.results and not health.disconnects:
+            return None
+        ratio = health.results.count(_OK) / len(health.results) if health.results else 1.0
+        score = 100.0 * ratio
+        score -= min(40.0, 10.0 * len(health.disconnects))
+        p95 = _percentile(sorted(health.rtts), 95)
+        if p95 is not None and p95 > self.slow_rtt:
+            score -= min(20.0, 20.0 * (p95 - self.slow_rtt) / self.slow_rtt)
+        return int(max(0.0, min(100.0, score)))
+
+    def score(self, box_index, now=None):
+        """0~100. 기록이 없으면 None."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            health = self._boxes.get(box_index)
+            if health is None:
+                return None
+            self._prune(health, now)
+            return self._score(health)
+
+    def _stats(self, health, now):
+        self._prune(health, now)
+        results = health.results
+        ordered = sorted(health.rtts)
+
+        def _ms(pct):
+            value = _percentile(ordered, pct)
+            return None if value is None else round(value * 1000.0, 1)
+
+        return {
+            "state": health.state,
+            "score": self._score(health),
+            "success_ratio": round(results.count(_OK) / len(results), 3) if results else None,
+            "rtt_p50_ms": _ms(50),
+            "rtt_p95_ms": _ms(95),
+            "rtt_p99_ms": _ms(99),
+            "polls": health.polls,
+            "timeouts": health.timeouts,
+            "recent_timeouts": results.count(_TIMEOUT),
+            "disconnects": health.disconnect_total,
+            "recent_disconnects": len(health.disconnects),
+            "trips": health.trip_total,
+            "probe_in": round(max(0.0, health.probe_at - now), 1) if health.state == OPEN else None,
+        }
+
+    def stats(self, box_index=None, now=None) -> dict:
+        """box_index 를 주면 그 박스의 dict, 아니면 {box_index: dict}."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if box_index is not None:
+                health = self._boxes.get(box_index)
+                return self._stats(health, now) if health is not None else {}
+            return {i: self._stats(h, now) for i, h in sorted(self._boxes.items())}
@@ -0,0 +1,218 @@
+# device_table.py
+#
+# 박스별 최신 상태를 열(column) 단위 NumPy 배열로 보관하는 표.
+# 폴링 스레드는 원시 레지스터 값만 기록하고(record), 상태 비트(AL1/AL2)는 읽을 때
+# 전체 박스를 한 번에 벡터 연산으로 풀어낸다. 다른 스레드(집계 서버, 건강도 내보내기)는
+# snapshot() 으로 일관된 복사본을 받아 락 없이 훑으면 된다.
+# 알람 상태/끊김 횟수/장비 능력(FW 상태, TFTP, 센서 모델 레지스터 지원)은 이 표에만 둔다 (ModbusUI 에 따로 두지 않음).
+# 쓰기는 모두 메서드로 락 안에서 하고, 원소 1개 읽기(table.tftp_supported[i] 등)는 락 없이 해도 된다.
+#
+#   snap = ui.device_table.snapshot()
+#   snap.alarm2.nonzero()[0]          # AL2 상태인 박스 번호들
+#   snap.value[snap.online()]
+
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+STATUS_AL1_BIT = 6
+STATUS_AL2_BIT = 7
+ERROR_MASK = 0x0F          # 세그먼트에 표시하는 에러 비트 (E-10/E-22/E-12/E-23)
+
+CONN_OFFLINE = 0           # 연결 안 함 (해제됨)
+CONN_ONLINE = 1
+CONN_LOST = 2              # 통신 끊김 → 재연결 중
+CONN_STALE = 3             # 연결은 살아 있으나 폴링 응답이 기한 안에 오지 않음 (통신 이상)
+
+NO_VERSION = -1
+
+
+class TableSnapshot(NamedTuple):
+    taken_at: float
+    value: np.ndarray
+    status: np.ndarray
+    alarm1: np.ndarray
+    alarm2: np.ndarray
+    error: np.ndarray
+    bar: np.ndarray
+    version: np.ndarray
+    updated: np.ndarray        # time.monotonic() 기준 마지막 폴링 시각 (없으면 nan)
+    waiting_since: np.ndarray  # 응답을 기다리는 폴링을 보낸 시각 (없으면 nan)
+    connection: np.ndarray
+    disconnects: np.ndarray
+
+    def online(self) -> np.ndarray:
+        return self.connection == CONN_ONLINE
+
+    def in_alarm(self) -> np.ndarray:
+        return self.online() & (self.alarm1 | self.alarm2)
+
+    def in_error(self) -> np.ndarray:
+        return self.online() & ((self.error & ERROR_MASK) != 0)
+
+    def age(self) -> np.ndarray:
+        """마지막 갱신 후 지난 시간(초). 한 번도 갱신되지 않았으면 inf."""
+        age = self.taken_at - self.updated
+        return np.where(np.isnan(age), np.inf, age)
+
+    def summary(self) -> dict:
+        online = self.online()
+        return {
+            "boxes": len(self.value),
+            "online": int(online.sum()),
+            "lost": int((self.connection == CONN_LOST).sum()),
+            "stale": int((self.connection == CONN_STALE).sum()),
+            "al1": int((online & self.alarm1 & ~self.alarm2).sum()),
+            "al2": int((online & self.alarm2).sum()),
+            "error": int(self.in_error().sum()),
+        }
+
+
+class DeviceStateTable:
+    def __init__(self, num_boxes: int):
+        self._lock = threading.Lock()
+        self.value = np.zeros(num_boxes, dtype=np.int32)
+        self.status = np.zeros(num_boxes, dtype=np.uint16)
+        self.alarm1 = np.zeros(num_boxes, dtype=bool)
+        self.alarm2 = np.zeros(num_boxes, dtype=bool)
+        self.error = np.zeros(num_boxes, dtype=np.uint16)
+        self.bar = np.zeros(num_boxes, dtype=np.int16)
+        self.version = np.full(num_boxes, NO_VERSION, dtype=np.int32)
+        self.updated = np.full(num_boxes, np.nan, dtype=np.float64)
+        self.waiting_since = np.full(num_boxes, np.nan, dtype=np.float64)
+        self.connection = np.zeros(num_boxes, dtype=np.int8)
+        self.disconnects = np.zeros(num_boxes, dtype=np.int32)
+        # 장비 능력 (연결 때 능력 캐시/첫 폴링으로 정해진다)
+        self.fw_status_supported = np.ones(num_boxes, dtype=bool)
+        self.tftp_supported = np.ones(num_boxes, dtype=bool)
+        self.sensor_model_supported = np.zeros(num_boxes, dtype=bool)
+        self._status_dirty = False
+
+    def __len__(self):
+        return len(self.value)
+
+    def begin_poll(self, box_index: int, now=None):
+        """폴링 요청을 보냄. 이미 응답을 기다리는 폴링이 있으면 그 시각을 유지한다."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if np.isnan(self.waiting_since[box_index]):
+                self.waiting_since[box_index] = now
+
+    def waited(self, box_index: int, now=None):
+        """응답을 기다리는 폴링을 보낸 후 지난 시간(초). 기다리는 폴링이 없으면 None."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            since = self.waiting_since[box_index]
+        return None if np.isnan(since) else now - float(since)
+
+    def record(self, box_index: int, values: dict, now=None) -> int:
+        """
+        폴링 1회 결과(ReadPlan.values)를 기록하고 이전 연결 상태를 돌려준다.
+        상태 비트는 decode_status() 에서 한꺼번에 푼다.
+        """
+        now = time.monotonic() if now is None else now
+        version = values.get("version")
+        with self._lock:
+            previous = int(self.connection[box_index])
+            self.status[box_index] = values["status"]
+            self.value[box_index] = values["value"]
+            self.error[box_index] = values["error"]
+            self.bar[box_index] = values["bar"]
+            self.version[box_index] = NO_VERSION if version is None else version
+            self.updated[box_index] = now
+            self.waiting_since[box_index] = np.nan
+            self.connection[box_index] = CONN_ONLINE
+            self._status_dirty = True
+        return previous
+
+    def set_connection(self, box_index: int, state: int):
+        with self._lock:
+            self.connection[box_index] = state
+
+    def clear(self, box_index: int, state: int = CONN_OFFLINE):
+        """연결 해제/끊김: 마지막 값은 더 이상 유효하지 않다."""
+        with self._lock:
+            self.status[box_index] = 0
+            self.value[box_index] = 0
+            self.error[box_index] = 0
+            self.bar[box_index] = 0
+            self.alarm1[box_index] = False
+            self.alarm2[box_index] = False
+            self.updated[box_index] = np.nan
+            self.waiting_since[box_index] = np.nan
+            self.connection[box_index] = state
+
+    def note_disconnect(self, box_index: int) -> int:
+        """끊김 1회 → 누적 횟수."""
+        with self._lock:
+            self.disconnects[box_index] += 1
+            return int(self.disconnects[box_index])
+
+    def reset_disconnects(self, box_index: int):
+        with self._lock:
+            self.disconnects[box_index] = 0
+
+    def set_capabilities(self, box_index: int, fw_status=None, tftp=None, sensor_model=None):
+        """None 인 항목은 그대로 둔다."""
+        with self._lock:
+            for column, value in (
+                (self.fw_status_supported, fw_status),
+                (self.tftp_supported, tftp),
+                (self.sensor_model_supported, sensor_model),
+            ):
+                if value is not None:
+                    column[box_index] = bool(value)
+
+    def capabilities(self, box_index: int) -> dict:
+        """능력 캐시(CapabilityCache)에 저장하는 형태."""
+        with self._lock:
+            return {
+                "fw_status": bool(self.fw_status_supported[box_index]),
+                "tftp": bool(self.tftp_supported[box_index]),
+                "sensor_model": bool(self.sensor_model_supported[box_index]),
+            }
+
+    def mark_stale(self, bound: float, now=None) -> np.ndarray:
+        """
+        응답을 bound 초(박스별 목록도 됨) 넘게 기다리는 연결 박스를 통신 이상으로 바꾸고,
+        새로 바뀐 박스 번호들을 돌려준다.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            waiting = now - self.waiting_since          # 대기 중이 아니면 nan → 비교 결과 False
+            stale = (self.connection == CONN_ONLINE) & (waiting > np.asarray(bound))
+            self.connection[stale] = CONN_STALE
+        return stale.nonzero()[0]
+
+    def alarm_state(self, box_index: int):
+        """(AL1, AL2). 풀리지 않은 상태 비트가 있으면 전체 박스를 먼저 푼다 (벡터 연산 1회)."""
+        with self._lock:
+            self._decode_status_locked()
+            return bool(self.alarm1[box_index]), bool(self.alarm2[box_index])
+
+    def _decode_status_locked(self):
+        if not self._status_dirty:
+            return
+        np.not_equal(self.status & (1 << STATUS_AL1_BIT), 0, out=self.alarm1)
+        np.not_equal(self.status & (1 << STATUS_AL2_BIT), 0, out=self.alarm2)
+        self._status_dirty = False
+
+    def snapshot(self) -> TableSnapshot:
+        with self._lock:
+            self._decode_status_locked()
+            return TableSnapshot(
+                taken_at=time.monotonic(),
+                value=self.value.copy(),
+                status=self.status.copy(),
+                alarm1=self.alarm1.copy(),
+                alarm2=self.alarm2.copy(),
+                error=self.error.copy(),
+                bar=self.bar.copy(),
+                version=self.version.copy(),
+                updated=self.updated.copy(),
+                waiting_since=self.waiting_since.copy(),
+                connection=self.connection.copy(),
+                disconnects=self.disconnects.copy(),
+            )
@@ -5,6 +5,9 @@ from tkinter import Tk, Frame, Button, Label, Entry, messagebox, StringVar, Topl
 from tkinter import ttk
 from modbus_ui import ModbusUI
 from analog_ui import AnalogUI
+from modbus_proxy import DEFAULT_PROXY_HOST, ModbusToolProxy
+from modbus_server import DEFAULT_SERVER_HOST, AggregationServer
+from poll_record import POLL_RECORDER
 from ups_monitor_ui import UPSMonitorUI
 import threading
 import psutil
@@ -309,11 +312,22 @@ if __name__ == "__main__":
     main_frame = tk.Frame(root)
     main_frame.grid(row=0, column=0, sticky="nsew")
 
+    if settings.get("poll_record"):
+        POLL_RECORDER.start(settings["poll_record"], int(settings.get("poll_record_max_mb", 200)) * 1024 * 1024)
+
     modbus_ui = ModbusUI(
         main_frame,
         len(modbus_boxes),
         settings.get("modbus_gas_types", {}),
-        lambda active, idx: set_alarm_status(active, f"modbus_{idx}")
+        lambda active, idx: set_alarm_status(active, f"modbus_{idx}"),
+        use_async_engine=settings.get("modbus_async_engine", False),
+        poll_budget_rps=settings.get("modbus_poll_budget_rps"),
+        pipeline_depth=settings.get("modbus_pipeline_depth"),
+        stale_after=settings.get("modbus_stale_after"),
+        health_export=settings.get("modbus_health_export"),
+        bulk_concurrency=settings.get("modbus_bulk_concurrency"),
+        bulk_timeout=settings.get("modbus_bulk_timeout"),
+        bulk_retries=settings.get("modbus_bulk_retries"),
     )
     analog_ui = AnalogUI(
         main_frame,
@@ -322,6 +336,24 @@ if __name__ == "__main__":
         lambda active, idx: set_alarm_status(active, f"analog_{idx}")
     )
 
+    if settings.get("modbus_server_port"):
+        host = settings.get("modbus_server_host", DEFAULT_SERVER_HOST)
+        port = int(settings["modbus_server_port"])
+        try:
+            AggregationServer(modbus_ui, analog_ui, host, port).start()
+            print(f"[SERVER] Modbus 집계 서버 시작: {host}:{port}")
+        except OSError as e:
+            print(f"[SERVER] Modbus 집계 서버 시작 실패: {e}")
+
+    if settings.get("modbus_proxy_port"):
+        host = settings.get("modbus_proxy_host", DEFAULT_PROXY_HOST)
+        port = int(settings["modbus_proxy_port"])
+        try:
+            ModbusToolProxy(modbus_ui, host, port).start()
+            print(f"[PROXY] Modbus 도구 프록시 시작: {host}:{port}")
+        except OSError as e:
+            print(f"[PROXY] Modbus 도구 프록시 시작 실패: {e}")
+
     ups_ui = None
     if settings.get("battery_box_enabled", 0):
         ups_ui = UPSMonitorUI(main_frame, 1)
@@ -378,8 +410,25 @@ if __name__ == "__main__":
         except Exception as e:
             settings_ui.toast(f"실패: {e}", bg="#7a1f1f")
 
+    def _discover():
+        def _done(found, filled):
+            settings_ui.toast(f"검지기 {len(found)}대 발견, 빈 박스 {len(filled)}개 추가", bg="#1f4f1f")
+
+        try:
+            modbus_ui.discover_and_fill(
+                settings.get("modbus_discovery_subnets"),
+                concurrency=settings.get("modbus_discovery_concurrency", 64),
+                on_done=_done,
+            )
+            settings_ui.toast("검지기 검색 중...", bg="#1f4f7a")
+        except Exception as e:
+            settings_ui.toast(f"실패: {e}", bg="#7a1f1f")
+
     settings_ui.on_fw_file_all = _fw_file_all
     settings_ui.on_fw_upgrade_all = _fw_upgrade_all
+    settings_ui.on_discover = _discover
+    settings_ui.on_bulk_commands = modbus_ui.open_bulk_commands
+    settings_ui.on_traffic_dump = modbus_ui.save_traffic_capture
 
     def _open_settings():
         cur = settings_ui.load_settings()
@@ -450,6 +499,9 @@ if __name__ == "__main__":
     threading.Thread(target=system_info_thread, daemon=True).start()
     threading.Thread(target=utils.check_for_updates, args=(root,), daemon=True).start()
 
+    if settings.get("modbus_auto_connect", False):
+        root.after(0, lambda: modbus_ui.auto_connect_all(settings.get("modbus_auto_connect_timeout", 1.0)))
+
     root.mainloop()
 
     for _, client in modbus_ui.clients.items():
@@ -457,3 +509,5 @@ if __name__ == "__main__":
             client.close()
         except Exception:
             pass
+    if modbus_ui.async_engine is not None:
+        modbus_ui.async_engine.stop()
@@ -0,0 +1,82 @@
+# modbus_address.py
+#
+# 박스 주소 표기: ip[:port][/unit]
+#   192.168.0.10            → 502 포트, 유닛 ID 지정 안 함(기존과 동일하게 0)
+#   192.168.0.200/3         → RS-485 게이트웨이 뒤 3번 검지기
+#   192.168.0.200:5020/12
+#   /dev/ttyUSB0/3          → RS-485 직결(Modbus RTU) 3번 검지기, 9600bps
+#   /dev/ttyUSB0:19200/3    → RTU 19200bps (시리얼은 ':' 뒤가 포트 대신 baud, 유닛 ID 필수)
+# 같은 (ip, port) 를 쓰는 박스들은 TCP 연결 하나를, 같은 시리얼 포트의 박스들은 버스 하나를 공유한다.
+
+from typing import NamedTuple
+
+DEFAULT_PORT = 502
+DEFAULT_UNIT = 0
+DEFAULT_BAUD = 9600
+SERIAL_PREFIX = "/dev/"
+
+
+class BoxAddress(NamedTuple):
+    host: str
+    port: int = DEFAULT_PORT
+    unit: int = DEFAULT_UNIT
+
+    @property
+    def endpoint(self):
+        return (self.host, self.port)
+
+    @property
+    def is_serial(self) -> bool:
+        return self.host.startswith(SERIAL_PREFIX)
+
+    def __str__(self):
+        text = self.host
+        if self.port != (DEFAULT_BAUD if self.is_serial else DEFAULT_PORT):
+            text += f":{self.port}"
+        if self.is_serial or self.unit != DEFAULT_UNIT:
+            text += f"/{self.unit}"
+        return text
+
+
+def parse_box_address(text: str) -> BoxAddress:
+    text = (text or "").strip()
+    if not text:
+        raise ValueError("empty address")
+    if text.startswith(SERIAL_PREFIX):
+        return _parse_serial_address(text)
+
+    unit = DEFAULT_UNIT
+    if "/" in text:
+        text, unit_text = text.rsplit("/", 1)
+        unit = int(unit_text)
+        if not 0 <= unit <= 247:
+            raise ValueError(f"unit id out of range: {unit}")
+
+    port = DEFAULT_PORT
+    if ":" in text:
+        text, port_text = text.rsplit(":", 1)
+        port = int(port_text)
+        if not 0 < port < 65536:
+            raise ValueError(f"port out of range: {port}")
+
+    if not text:
+        raise ValueError("empty host")
+    return BoxAddress(text, port, unit)
+
+
+def _parse_serial_address(text: str) -> BoxAddress:
+    # 장치 경로 자체에 '/' 가 있으므로 유닛 ID 는 반드시 붙여야 한다 (/dev/pts/3 과 구분)
+    path, sep, unit_text = text.rpartition("/")
+    if not sep or not unit_text.isdigit() or path.rstrip("/") + "/" == SERIAL_PREFIX:
+        raise ValueError("serial address needs a unit id: /dev/ttyUSB0[:baud]/unit")
+    unit = int(unit_text)
+    if not 1 <= unit <= 247:
+        raise ValueError(f"unit id out of range: {unit}")
+
+    baud = DEFAULT_BAUD
+    head, sep, baud_text = path.rpartition(":")
+    if sep and baud_text.isdigit():
+        path, baud = head, int(baud_text)
+        if baud < 300:
+            raise ValueError(f"baud rate out of range: {baud}")
+    return BoxAddress(path, baud, unit)
@@ -0,0 +1,354 @@
+# modbus_async.py
+#
+# 장치마다 스레드 + 블로킹 ModbusTcpClient 를 쓰는 대신, 하나의 asyncio 이벤트 루프에서
+# 장치별 태스크로 모든 박스를 폴링하는 엔진.
+# 읽기 계획/디코딩/UI 메시지는 ModbusUI 의 poll_requests(), process_poll_fields() 등을 그대로 사용한다.
+# 같은 (ip, port) 의 장치들(RS-485 게이트웨이 뒤 유닛들)은 소켓 하나를 공유하고,
+# 요청은 엔드포인트별 FIFO 락으로 직렬화되어 유닛 사이를 라운드로빈으로 돈다.
+
+import asyncio
+import threading
+
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from command_queue import DeviceCommandQueue
+from modbus_address import DEFAULT_PORT, DEFAULT_UNIT, BoxAddress
+from modbus_capture import CapturingAsyncTcpClient
+from modbus_liveness import RttTracker, tune_keepalive
+
+
+class _Endpoint:
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.rtt = RttTracker(max_deadline=timeout)
+        self.client = None
+        self.users = set()
+        self.connect_lock = asyncio.Lock()
+        self.gate = asyncio.Lock()
+
+
+class _Device:
+    def __init__(self, box_index, host, port, unit):
+        self.box_index = box_index
+        self.host = host
+        self.port = port
+        self.unit = unit
+        self.address = str(BoxAddress(host, port, unit))
+        self.endpoint = None
+        self.client = None
+        self.task = None
+        self.commands = DeviceCommandQueue()
+        self.wakeup = None
+
+
+class AsyncModbusEngine:
+    CONNECT_RETRIES = 5
+    CONNECT_RETRY_DELAY = 2.0
+
+    def __init__(self, listener, timeout=3.0):
+        # listener: ModbusUI (poll_requests, process_poll_fields, handle_connection_lost, ... 를 제공)
+        self.listener = listener
+        self.timeout = timeout
+        self.loop = None
+        self._thread = None
+        self._devices = {}
+        self._endpoints = {}
+
+    # -------------------------------------------------------------------------
+    # 루프 스레드
+    # -------------------------------------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+
+        def _run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            ready.set()
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self):
+        if self.loop is None:
+            return
+        fut = asyncio.run_coroutine_threadsafe(self._remove_all(), self.loop)
+        try:
+            fut.result(timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    # -------------------------------------------------------------------------
+    # 다른 스레드에서 호출하는 API (concurrent.futures.Future 반환)
+    # -------------------------------------------------------------------------
+    def connect_device(self, box_index, host, port=DEFAULT_PORT, unit=DEFAULT_UNIT):
+        return self._submit(self._connect_device(box_index, host, port, unit))
+
+    def add_device(self, box_index, host, port=DEFAULT_PORT, unit=DEFAULT_UNIT):
+        # 연결하지 않은 채 등록 → start_polling 후 재연결 경로에서 연결
+        return self._submit(self._add_device(box_index, host, port, unit))
+
+    def start_polling(self, box_index):
+        return self._submit(self._start_polling(box_index))
+
+    def remove_device(self, box_index):
+        return self._submit(self._remove_device(box_index))
+
+    def command_queue(self, box_index):
+        # 운전자 명령은 이 큐에 넣으면 폴링 태스크가 다음 요청 전에 실행한다.
+        dev = self._devices.get(box_index)
+        return dev.commands if dev is not None else None
+
+    def response_deadline(self, box_index):
+        """관측한 RTT 로 정한 응답 기한 (통신 이상 판정용). 장치가 없으면 None."""
+        dev = self._devices.get(box_index)
+        if dev is None or dev.endpoint is None:
+            return None
+        return dev.endpoint.rtt.deadline()
+
+    def is_connected(self, box_index):
+        dev = self._devices.get(box_index)
+        return dev is not None and dev.client is not None and dev.client.connected
+
+    # -------------------------------------------------------------------------
+    # 루프 내부
+    # -------------------------------------------------------------------------
+    def _new_client(self, ep):
+        # 재연결은 엔진이 직접 관리하므로 pymodbus 자동 재연결은 끈다.
+        # pymodbus 는 응답 타임아웃이면 연결을 닫으므로 그보다 먼저 _read 의 기한(self.timeout)이 끝나게 한다.
+        return CapturingAsyncTcpClient(
+            ep.host,
+            port=ep.port,
+            timeout=self.timeout + 1,
+            retries=0,
+            reconnect_delay=0,
+        )
+
+    async def _open(self, dev):
+        # 같은 엔드포인트의 다른 장치가 이미 연결해 두었으면 그 소켓을 쓴다.
+        ep = dev.endpoint
+        async with ep.connect_lock:
+            if ep.client is None or not ep.client.connected:
+                if ep.client is not None:
+                    ep.client.close()
+                    ep.client = None
+                client = self._new_client(ep)
+                try:
+                    ok = await asyncio.wait_for(client.connect(), timeout=self.timeout + 1)
+                except (asyncio.TimeoutError, OSError):
+                    ok = False
+                if not (ok and client.connected):
+                    client.close()
+                    return False
+                transport = getattr(client, "transport", None)
+                if transport is not None:
+                    tune_keepalive(transport.get_extra_info("socket"))
+                ep.client = client
+        dev.client = ep.client
+        return True
+
+    def _invalidate(self, dev):
+        # 실패한 소켓이 아직 엔드포인트의 현재 소켓이면 닫는다 (다른 유닛이 이미 재연결했을 수 있음)
+        ep = dev.endpoint
+        if dev.client is not None and ep.client is dev.client:
+            ep.client.close()
+            ep.client = None
+        dev.client = None
+
+    def _new_device(self, box_index, host, port, unit):
+        dev = _Device(box_index, host, port, unit)
+        dev.wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        dev.commands.set_waker(lambda: loop.call_soon_threadsafe(dev.wakeup.set))
+
+        ep = self._endpoints.get((host, port))
+        if ep is None:
+            ep = self._endpoints[(host, port)] = _Endpoint(host, port, self.timeout)
+        ep.users.add(box_index)
+        dev.endpoint = ep
+        return dev
+
+    def _release(self, dev):
+        ep = dev.endpoint
+        ep.users.discard(dev.box_index)
+        dev.client = None
+        if ep.users:
+            return
+        if self._endpoints.get((ep.host, ep.port)) is ep:
+            del self._endpoints[(ep.host, ep.port)]
+        if ep.client is not None:
+            ep.client.close()
+            ep.client = None
+
+    async def _add_device(self, box_index, host, port, unit):
+        await self._remove_device(box_index)
+        self._devices[box_index] = self._new_device(box_index, host, port, unit)
+
+    async def _connect_device(self, box_index, host, port, unit):
+        await self._remove_device(box_index)
+        dev = self._new_device(box_index, host, port, unit)
+        for attempt in range(self.CONNECT_RETRIES):
+            if await self._open(dev):
+                self._devices[box_index] = dev
+                return True
+            if attempt + 1 < self.CONNECT_RETRIES:
+                await asyncio.sleep(self.CONNECT_RETRY_DELAY)
+        self._release(dev)
+        return False
+
+    async def _start_polling(self, box_index):
+        dev = self._devices.get(box_index)
+        if dev is None:
+            return None
+        if dev.task is None or dev.task.done():
+            dev.task = asyncio.create_task(self._poll_loop(dev))
+        return box_index
+
+    async def _remove_device(self, box_index):
+        dev = self._devices.pop(box_index, None)
+        if dev is None:
+            return
+        dev.commands.close()
+        task = dev.task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._release(dev)
+
+    async def _remove_all(self):
+        for box_index in list(self._devices):
+            await self._remove_device(box_index)
+
+    async def _run_commands(self, dev):
+        while True:
+            cmd = dev.commands.pop()
+            if cmd is None:
+                return
+            kwargs = dict(cmd.kwargs)
+            if cmd.method == "execute":
+                # 임의 요청 (modbus_proxy): 유닛 ID 는 요청 객체에
+                cmd.args[0].slave_id = dev.unit
+            else:
+                kwargs.setdefault("slave", dev.unit)
+            try:
+                async with dev.endpoint.gate:
+                    result = await asyncio.wait_for(
+                        getattr(dev.client, cmd.method)(*cmd.args, **kwargs),
+                        timeout=self.timeout + 1,
+                    )
+            except asyncio.CancelledError:
+                cmd.future.set_exception(ConnectionException("Socket is closed"))
+                raise
+            except Exception as e:
+                cmd.future.set_exception(e)
+            else:
+                cmd.future.set_result(result)
+
+    async def _idle(self, dev, delay):
+        # 다음 폴링까지 대기하면서 그 사이 들어온 명령은 바로 실행
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + delay
+        while True:
+            await self._run_commands(dev)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            dev.wakeup.clear()
+            if len(dev.commands):
+                continue
+            try:
+                await asyncio.wait_for(dev.wakeup.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+
+    async def _read(self, dev, address, count):
+        ep = dev.endpoint
+        async with ep.gate:
+            # 기한 초과 → asyncio.TimeoutError (그 유닛의 폴링 실패일 뿐, 연결은 유지)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            response = await asyncio.wait_for(
+                dev.client.read_holding_registers(address, count, slave=dev.unit),
+                timeout=self.timeout,
+            )
+            if not isinstance(response, ModbusIOException):
+                ep.rtt.record(loop.time() - start)
+            return response
+
+    async def _poll_loop(self, dev):
+        ui = self.listener
+        box_index = dev.box_index
+
+        if dev.client is None:
+            # add_device 로 등록만 된 장비: 처음부터 재연결 경로로
+            await self._reconnect(dev)
+
+        while True:
+            try:
+                if dev.client is None or not dev.client.connected:
+                    raise ConnectionException("Socket is closed")
+
+                fresh = {}
+                sent = 0
+                requests = ui.poll_requests(box_index)
+                while requests:
+                    for request in requests:
+                        await self._run_commands(dev)
+                        ui.begin_poll(box_index)
+                        response = await self._read(dev, request.address, request.count)
+                        sent += 1
+                        applied = ui.apply_poll_response(box_index, request, response)
+                        if applied is None:
+                            # 선택 그룹 거부 → 줄어든 계획으로 이번 사이클을 다시 읽는다 (ModbusUI.read_poll_cycle 과 같음)
+                            requests = ui.poll_requests(box_index)
+                            break
+                        fresh.update(applied)
+                    else:
+                        requests = None
+
+                ui.process_poll_fields(box_index, fresh)
+
+                await self._idle(dev, ui.next_poll_delay(box_index, sent))
+
+            except asyncio.CancelledError:
+                raise
+
+            except (ModbusIOException, asyncio.TimeoutError) as e:
+                # 유닛의 무응답/예외 응답은 폴링 실패로만 센다. 연결이 실제로 닫혔을 때만 끊김 처리
+                # (같은 게이트웨이 뒤의 다른 박스, 느린 장비를 끊김으로 만들지 않도록)
+                timeout = isinstance(e, asyncio.TimeoutError) or "No response received" in str(e)
+                delay = ui.poll_failed(box_index, timeout)
+                if dev.client is not None and dev.client.connected:
+                    await asyncio.sleep(delay)
+                    continue
+                ui.handle_connection_lost(box_index)
+                await self._reconnect(dev)
+
+            except Exception:
+                ui.handle_connection_lost(box_index)
+                await self._reconnect(dev)
+
+    async def _reconnect(self, dev):
+        # 같은 폴링 태스크 안에서 복구될 때까지 재시도 (간격은 listener 의 재연결 감독자가 결정)
+        ui = self.listener
+        loop = asyncio.get_running_loop()
+        self._invalidate(dev)
+
+        while True:
+            await asyncio.sleep(ui.next_reconnect_delay(dev.box_index))
+            ui.report_reconnect_attempt(dev.box_index)
+            if await self._open(dev):
+                await loop.run_in_executor(None, ui.restore_after_reconnect, dev.address, dev.box_index)
+                ui.show_reconnected(dev.box_index)
+                return
@@ -0,0 +1,258 @@
+# modbus_capture.py
+#
+# 상시 켜져 있는 Modbus TCP 통신 기록기 (링 버퍼).
+# 주고받은 ADU(MBAP 헤더 + PDU) 원본을 단조 시각/방향/박스 번호와 함께 미리 잡아 둔 버퍼에 덮어쓰며 보관한다.
+# 프레임마다 파이썬 객체를 남기지 않도록 바이트는 bytearray 하나에, 메타데이터는 array 에 넣는다.
+# 장비가 이상할 때 dump_pcap() 으로 Wireshark 에서 열 수 있는 pcap 파일로 저장한다
+# (IPv4/TCP 헤더를 만들어 붙이므로 Modbus/TCP 로 바로 해석된다. 502 가 아닌 포트는 "Decode As").
+#
+#   RECORDER.dump_pcap("modbus.pcap")               # 전체
+#   RECORDER.dump_pcap("box3.pcap", box_index=3)    # 박스 하나
+#
+# 스레드 경로(ModbusTcpClient), 파이프라인, 비동기 엔진의 TCP 클라이언트가 모두 같은 RECORDER 에 기록한다.
+# RS-485(RTU) 버스는 Modbus TCP 가 아니므로 기록하지 않는다.
+
+import socket
+import struct
+import threading
+import time
+from array import array
+
+from pymodbus.client import AsyncModbusTcpClient, ModbusTcpClient
+
+TX = 0                  # 패널 → 장비
+RX = 1                  # 장비 → 패널
+
+DEFAULT_BUFFER_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_FRAMES = 131072
+MAX_PEERS = 1024
+MAX_ADU = 260           # MBAP 7 + PDU 253
+NO_BOX = -1
+
+PANEL_ADDR = "10.0.0.1"  # pcap 에 쓰는 패널 쪽 주소 (실제 주소는 기록하지 않는다)
+PANEL_PORT_BASE = 40000  # 패널 쪽 포트 = PANEL_PORT_BASE + peer id
+
+_PCAP_HEADER = struct.Struct("<IHHiIII")
+_PCAP_RECORD = struct.Struct("<IIII")
+_IPV4 = struct.Struct(">BBHHHBBH4s4s")
+_TCP = struct.Struct(">HHIIBBHHH")
+LINKTYPE_RAW = 101
+
+
+def _ip_bytes(host):
+    try:
+        return socket.inet_aton(host)
+    except OSError:
+        return b"\x00\x00\x00\x00"
+
+
+def _ip_checksum(header):
+    total = sum(struct.unpack(">10H", header))
+    while total > 0xFFFF:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+class TrafficRecorder:
+    def __init__(self, buffer_bytes=DEFAULT_BUFFER_BYTES, max_frames=DEFAULT_MAX_FRAMES):
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._cap = buffer_bytes
+        self._data = bytearray(buffer_bytes)
+        self._max_frames = max_frames
+        # 프레임 메타데이터 (슬롯 = 누적 프레임 번호 % max_frames)
+        self._start = array("q", bytes(8 * max_frames))     # 누적 바이트 위치 (링 위치 = start % cap)
+        self._length = array("H", bytes(2 * max_frames))
+        self._ts = array("d", bytes(8 * max_frames))
+        self._peer = array("h", bytes(2 * max_frames))
+        self._box = array("h", bytes(2 * max_frames))
+        self._dir = array("b", bytes(max_frames))
+        self._frames = 0
+        self._written = 0
+
+        self._peers = {}
+        self._peer_addr = []
+        # (peer id, unit) → 박스 번호
+        self._box_of = array("h", [NO_BOX]) * (MAX_PEERS * 256)
+
+    # 연결/박스 등록 -----------------------------------------------------------
+    def peer_id(self, host, port) -> int:
+        """(host, port) 마다 고정 번호. 너무 많으면 -1 (기록 안 함)."""
+        key = (host, int(port))
+        with self._lock:
+            peer = self._peers.get(key)
+            if peer is None:
+                if len(self._peer_addr) >= MAX_PEERS:
+                    return -1
+                peer = self._peers[key] = len(self._peer_addr)
+                self._peer_addr.append(key)
+            return peer
+
+    def bind(self, host, port, unit, box_index):
+        """이 연결/유닛의 프레임을 box_index 로 기록한다."""
+        peer = self.peer_id(host, port)
+        if peer >= 0:
+            self._box_of[peer * 256 + (unit & 0xFF)] = box_index
+
+    # 기록 (폴링 경로) ----------------------------------------------------------
+    def record(self, peer, direction, data):
+        """data: ADU 하나 (bytes/bytearray/memoryview)."""
+        n = len(data)
+        if not self.enabled or peer < 0 or n < 7 or n > MAX_ADU:
+            return
+        now = time.monotonic()
+        box = self._box_of[peer * 256 + data[6]]
+        with self._lock:
+            start = self._written
+            pos = start % self._cap
+            if pos + n > self._cap:
+                # 링 끝에 다 안 들어가면 처음부터 (프레임을 나눠 쓰지 않는다)
+                start += self._cap - pos
+                pos = 0
+            self._data[pos:pos + n] = data
+            self._written = start + n
+            slot = self._frames % self._max_frames
+            self._frames += 1
+            self._start[slot] = start
+            self._length[slot] = n
+            self._ts[slot] = now
+            self._peer[slot] = peer
+            self._box[slot] = box
+            self._dir[slot] = direction
+
+    def record_stream(self, peer, direction, buf: bytearray):
+        """
+        TCP 로 조각나 들어온 바이트(buf)에서 완성된 ADU 를 기록하고 buf 에서 뺀다.
+        MBAP 헤더가 이상하면(프로토콜 ID ≠ 0, 길이 범위 밖) 버퍼를 비워 다시 맞춘다.
+        """
+        while len(buf) >= 7:
+            length = (buf[4] << 8) | buf[5]
+            if buf[2] or buf[3] or not 2 <= length <= MAX_ADU - 6:
+                buf.clear()
+                return
+            end = 6 + length
+            if len(buf) < end:
+                return
+            if len(buf) == end:
+                # 대부분: 버퍼에 응답 하나만
+                self.record(peer, direction, buf)
+                buf.clear()
+                return
+            self.record(peer, direction, memoryview(buf)[:end])
+            del buf[:end]
+
+    # 조회/저장 ----------------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "frames": self._frames,
+                "bytes": self._written,
+                "retained": len(self._retained_slots()),
+                "peers": len(self._peer_addr),
+            }
+
+    def _retained_slots(self):
+        # 아직 덮어쓰이지 않은 프레임의 슬롯들 (오래된 것부터)
+        first = max(0, self._frames - self._max_frames)
+        oldest = self._written - self._cap
+        slots = []
+        for k in range(first, self._frames):
+            slot = k % self._max_frames
+            if self._start[slot] >= oldest:
+                slots.append(slot)
+        return slots
+
+    def frames(self, box_index=None):
+        """[(monotonic 시각, 방향, 박스, (host, port), ADU bytes)] 오래된 것부터."""
+        out = []
+        with self._lock:
+            for slot in self._retained_slots():
+                if box_index is not None and self._box[slot] != box_index:
+                    continue
+                pos = self._start[slot] % self._cap
+                adu = bytes(self._data[pos:pos + self._length[slot]])
+                out.append((self._ts[slot], self._dir[slot], self._box[slot], self._peer_addr[self._peer[slot]], adu))
+        return out
+
+    def dump_pcap(self, path, box_index=None) -> int:
+        """링 버퍼 내용을 pcap(LINKTYPE_RAW, IPv4/TCP) 으로 저장하고 프레임 수를 돌려준다."""
+        frames = self.frames(box_index)
+        with self._lock:
+            peers = dict(self._peers)     # 저장 중에도 폴링 스레드가 새 연결을 등록한다
+        wall_offset = time.time() - time.monotonic()
+        panel_ip = _ip_bytes(PANEL_ADDR)
+        seq = {}
+        ident = 0
+        with open(path, "wb") as file:
+            file.write(_PCAP_HEADER.pack(0xA1B2C3D4, 2, 4, 0, 0, 65535, LINKTYPE_RAW))
+            for ts, direction, _, (host, port), adu in frames:
+                peer_ip = _ip_bytes(host)
+                panel_port = PANEL_PORT_BASE + peers.get((host, port), 0)
+                tx_seq = seq.get((host, port, TX), 1)
+                rx_seq = seq.get((host, port, RX), 1)
+                if direction == TX:
+                    src, dst, sport, dport, number, ack = panel_ip, peer_ip, panel_port, port, tx_seq, rx_seq
+                    seq[(host, port, TX)] = tx_seq + len(adu)
+                else:
+                    src, dst, sport, dport, number, ack = peer_ip, panel_ip, port, panel_port, rx_seq, tx_seq
+                    seq[(host, port, RX)] = rx_seq + len(adu)
+
+                ident = (ident + 1) & 0xFFFF
+                total = _IPV4.size + _TCP.size + len(adu)
+                ip = _IPV4.pack(0x45, 0, total, ident, 0x4000, 64, socket.IPPROTO_TCP, 0, src, dst)
+                ip = ip[:10] + struct.pack(">H", _ip_checksum(ip)) + ip[12:]
+                tcp = _TCP.pack(sport, dport, number & 0xFFFFFFFF, ack & 0xFFFFFFFF, 5 << 4, 0x18, 65535, 0, 0)
+
+                wall = ts + wall_offset
+                sec = int(wall)
+                file.write(_PCAP_RECORD.pack(sec, int((wall - sec) * 1e6), total, total))
+                file.write(ip)
+                file.write(tcp)
+                file.write(adu)
+        return len(frames)
+
+
+RECORDER = TrafficRecorder()
+
+
+class CapturingTcpClient(ModbusTcpClient):
+    """송수신 ADU 를 RECORDER 에 남기는 ModbusTcpClient (스레드 경로)."""
+
+    def __init__(self, host, port=502, recorder=None, **kwargs):
+        super().__init__(host, port=port, **kwargs)
+        self.recorder = recorder or RECORDER
+        self.capture_peer = self.recorder.peer_id(host, port)
+        self._capture_rx = bytearray()
+
+    def send(self, request):
+        if request:
+            # 이전 요청의 남은 응답 조각(타임아웃 등)은 버린다
+            self._capture_rx.clear()
+            self.recorder.record(self.capture_peer, TX, request)
+        return super().send(request)
+
+    def recv(self, size):
+        data = super().recv(size)
+        if data:
+            self._capture_rx += data
+            self.recorder.record_stream(self.capture_peer, RX, self._capture_rx)
+        return data
+
+
+class CapturingAsyncTcpClient(AsyncModbusTcpClient):
+    """송수신 ADU 를 RECORDER 에 남기는 AsyncModbusTcpClient (비동기 엔진)."""
+
+    def __init__(self, host, port=502, recorder=None, **kwargs):
+        super().__init__(host, port=port, **kwargs)
+        self.recorder = recorder or RECORDER
+        self.capture_peer = self.recorder.peer_id(host, port)
+        self._capture_rx = bytearray()
+
+    def send(self, data, addr=None):
+        self.recorder.record(self.capture_peer, TX, data)
+        return super().send(data, addr)
+
+    def callback_data(self, data, addr=None):
+        self._capture_rx += data
+        self.recorder.record_stream(self.capture_peer, RX, self._capture_rx)
+        return super().callback_data(data, addr)
@@ -0,0 +1,175 @@
+# modbus_discovery.py
+#
+# 서브넷 검색으로 ASGD 검지기 찾기 (현장 시운전용).
+#  1) TCP/502 연결 시도 — 동시 연결 수를 제한해 공장망에 부담을 주지 않는다
+#  2) 연결된 호스트는 같은 연결로 40001 을 읽어 Modbus 장비인지 확인
+#     (검지기는 동시 연결 수가 적으므로 연결을 새로 열지 않는다)
+#  3) 40022 버전, 40030~40033 ASCII(센서 모델), 40023/40088 응답 여부로 모델 판별
+# 결과는 CapabilityCache 항목과 같은 필드를 가지므로 캐시에 넣으면 첫 폴링이 바로 시작된다.
+#
+#   python modbus_discovery.py 192.168.0.0/24 192.168.1.0/24
+
+import argparse
+import asyncio
+import ipaddress
+import time
+from typing import NamedTuple, Optional
+
+from pymodbus.factory import ClientDecoder
+from pymodbus.register_read_message import ReadHoldingRegistersRequest
+
+from modbus_pipeline import MBAP
+from register_schema import (
+    REG_FW_STATUS,
+    REG_SENSOR_MODEL,
+    REG_STATUS,
+    REG_TFTP_IP,
+    REG_VERSION,
+    reg_addr,
+    regs_to_ascii,
+    schema_for_capabilities,
+)
+
+DEFAULT_CONCURRENCY = 64
+CONNECT_TIMEOUT = 0.5
+READ_TIMEOUT = 1.0
+MAX_HOSTS = 4096          # 실수로 /16 을 넣어도 공장망 전체를 훑지 않도록
+
+
+class DiscoveredDevice(NamedTuple):
+    host: str
+    port: int
+    model: str
+    version: Optional[int]
+    sensor_model_name: Optional[str]
+    fw_status: bool
+    tftp: bool
+    sensor_model: bool
+
+    def capabilities(self):
+        """CapabilityCache.put 에 그대로 넣을 수 있는 dict."""
+        return {
+            "fw_status": self.fw_status,
+            "tftp": self.tftp,
+            "sensor_model": self.sensor_model,
+            "model": self.model,
+            "version": self.version,
+            "sensor_model_name": self.sensor_model_name,
+        }
+
+
+def expand_targets(subnets, max_hosts=MAX_HOSTS):
+    """'192.168.0.0/24', '192.168.0.15' 같은 목록 → 중복 없는 호스트 IP 목록."""
+    hosts = []
+    seen = set()
+    for text in subnets:
+        net = ipaddress.ip_network(text.strip(), strict=False)
+        for ip in (net.hosts() if net.num_addresses > 1 else [net.network_address]):
+            host = str(ip)
+            if host in seen:
+                continue
+            seen.add(host)
+            hosts.append(host)
+            if len(hosts) > max_hosts:
+                raise ValueError(f"too many hosts to scan (> {max_hosts})")
+    return hosts
+
+
+class _Session:
+    """검색용 최소 Modbus TCP 세션 (이미 열린 스트림 위에서 순차 읽기)."""
+
+    def __init__(self, reader, writer, timeout):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.tid = 0
+        self.decoder = ClientDecoder()
+
+    async def read(self, reg, count):
+        """성공하면 레지스터 목록, 예외 응답이면 None. 통신 오류는 그대로 올린다."""
+        self.tid += 1
+        request = ReadHoldingRegistersRequest(reg_addr(reg), count, slave=0)
+        pdu = bytes([request.function_code]) + request.encode()
+        self.writer.write(MBAP.pack(self.tid, 0, len(pdu) + 1, 0) + pdu)
+        await self.writer.drain()
+        while True:
+            header = await asyncio.wait_for(self.reader.readexactly(MBAP.size), self.timeout)
+            tid, _, length, _ = MBAP.unpack(header)
+            body = await asyncio.wait_for(self.reader.readexactly(length - 1), self.timeout)
+            if tid == self.tid:
+                break
+        response = self.decoder.decode(body)
+        if response is None or response.isError():
+            return None
+        return response.registers
+
+
+async def _identify(host, port, reader, writer, read_timeout):
+    session = _Session(reader, writer, read_timeout)
+    if await session.read(REG_STATUS, 1) is None:
+        return None
+    version_regs = await session.read(REG_VERSION, 1)
+    fw_status = await session.read(REG_FW_STATUS, 2) is not None
+    model_regs = await session.read(REG_SENSOR_MODEL, 4)
+    tftp = await session.read(REG_TFTP_IP, 2) is not None
+    return DiscoveredDevice(
+        host=host,
+        port=port,
+        model=schema_for_capabilities(fw_status, model_regs is not None).name,
+        version=version_regs[0] if version_regs else None,
+        sensor_model_name=regs_to_ascii(model_regs) if model_regs else None,
+        fw_status=fw_status,
+        tftp=tftp,
+        sensor_model=model_regs is not None,
+    )
+
+
+async def _probe(host, port, limiter, connect_timeout, read_timeout):
+    async with limiter:
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), connect_timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        try:
+            return await _identify(host, port, reader, writer, read_timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return None
+        finally:
+            writer.close()
+
+
+async def discover_async(subnets, port=502, concurrency=DEFAULT_CONCURRENCY,
+                         connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, exclude=()):
+    exclude = set(exclude)
+    hosts = [h for h in expand_targets(subnets) if h not in exclude]
+    limiter = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(_probe(h, port, limiter, connect_timeout, read_timeout) for h in hosts))
+    found = [r for r in results if r is not None]
+    found.sort(key=lambda d: ipaddress.ip_address(d.host))
+    return found
+
+
+def discover(subnets, port=502, concurrency=DEFAULT_CONCURRENCY,
+             connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, exclude=()):
+    """동기 버전 (UI 작업 스레드에서 호출)."""
+    return asyncio.run(discover_async(subnets, port, concurrency, connect_timeout, read_timeout, exclude))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASGD detector subnet discovery")
+    parser.add_argument("subnets", nargs="+", help="예: 192.168.0.0/24")
+    parser.add_argument("--port", type=int, default=502)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=CONNECT_TIMEOUT, help="연결 타임아웃(초)")
+    args = parser.parse_args()
+
+    t0 = time.monotonic()
+    found = discover(args.subnets, args.port, args.concurrency, args.timeout)
+    for d in found:
+        version = "-" if d.version is None else d.version
+        print(f"{d.host:<16} {d.model:<9} v{version:<6} {d.sensor_model_name or ''}")
+    print(f"[DISCOVER] {len(found)}대 발견 ({time.monotonic() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
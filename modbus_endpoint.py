@@ -0,0 +1,375 @@
+# modbus_endpoint.py
+#
+# 스레드 폴링용 TCP 연결 공유.
+# RS-485 게이트웨이처럼 한 (ip, port) 뒤에 여러 유닛이 있으면 박스마다 소켓을 여는 대신
+# ModbusEndpoint 하나를 공유하고, 요청은 FIFO 게이트로 직렬화한다.
+# 각 박스의 폴링 스레드가 요청마다 줄을 서므로 유닛들은 라운드로빈으로 돌아가며 처리된다.
+# RS-485 직결(/dev/ttyUSB0/3 같은 주소)은 시리얼 포트 하나가 RtuBus 하나다.
+# pipeline_depth 를 주면 TCP 연결은 게이트 없이 여러 요청을 동시에 띄운다 (PipelinedEndpoint).
+# 유닛 하나가 timeout 안에 응답하지 않아도 연결(소켓/시리얼 포트)은 닫지 않는다 - 같은 연결 뒤의 다른 박스까지
+# 끊김 처리되지 않도록. 연결은 송수신 오류가 났을 때만 닫는다 (죽은 링크는 TCP keepalive 가 드러낸다).
+# 관측한 RTT(modbus_liveness.RttTracker)는 응답 대기 시간 기한이 아니라 박스의 "통신 이상" 판정 기한에만 쓴다.
+
+import threading
+import time
+
+from pymodbus.client import ModbusSerialClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from modbus_address import SERIAL_PREFIX
+from modbus_capture import CapturingTcpClient
+from modbus_liveness import MIN_DEADLINE, RttTracker, tune_keepalive
+from modbus_pipeline import PipelinedTcpClient
+from modbus_rtu import RTU_TIMEOUT, BusStats, frame_gap
+
+
+class FairLock:
+    """도착 순서대로 넘겨주는 락 (threading.Lock 은 순서를 보장하지 않음)."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+
+    def acquire(self):
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while self._serving != ticket:
+                self._cond.wait()
+
+    def release(self):
+        with self._cond:
+            self._serving += 1
+            self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class _KeepOpenOnTimeout:
+    """
+    pymodbus 는 응답이 없으면 연결을 닫는다. 트랜잭션 중(hold_close)에는 닫지 않고 송수신 오류만 기록해 두고,
+    닫을지는 ModbusEndpoint 가 정한다.
+    """
+
+    hold_close = False
+    io_failed = False
+
+    def send(self, request):
+        try:
+            return super().send(request)
+        except (OSError, ConnectionException):
+            self.io_failed = True
+            raise
+
+    def recv(self, size):
+        try:
+            return super().recv(size)
+        except (OSError, ConnectionException):
+            self.io_failed = True
+            raise
+
+    def close(self):
+        if not self.hold_close:
+            super().close()
+
+
+class _SharedTcpClient(_KeepOpenOnTimeout, CapturingTcpClient):
+    def discard_input(self):
+        """기한이 지난 요청의 늦은 응답을 버린다. 상대가 연결을 닫았으면 닫는다."""
+        sock = self.socket
+        if sock is None:
+            return
+        sock.setblocking(False)
+        try:
+            while sock.recv(4096):
+                pass
+            self.close()
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self.close()
+        self.framer.resetFrame()
+
+
+class _SharedSerialClient(_KeepOpenOnTimeout, ModbusSerialClient):
+    def discard_input(self):
+        if self.socket is not None:
+            self.socket.reset_input_buffer()
+        self.framer.resetFrame()
+
+
+class ModbusEndpoint:
+    pipelined = False
+
+    def __init__(self, host, port, timeout=3, min_deadline=MIN_DEADLINE):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.rtt = RttTracker(max_deadline=timeout, min_deadline=min_deadline)
+        self.client = None
+        self.users = 0
+        self.gate = FairLock()
+        self._connect_lock = threading.Lock()
+        self._discard = False
+
+    def connect(self) -> bool:
+        """이미 다른 유닛이 연결해 두었으면 그대로 쓴다."""
+        with self._connect_lock:
+            if self.client is not None and self.client.is_socket_open():
+                return True
+            if self.client is not None:
+                self.client.close()
+                self.client = None
+            client = self._new_client()
+            if client.connect():
+                self._tune(client)
+                self.client = client
+                self._discard = False
+                return True
+            client.close()
+            return False
+
+    def _new_client(self):
+        return _SharedTcpClient(self.host, port=self.port, timeout=self.timeout)
+
+    def _tune(self, client):
+        tune_keepalive(getattr(client, "socket", None))
+
+    def execute(self, client, method, args, kwargs):
+        with self.gate:
+            return self._transact(client, method, args, kwargs)
+
+    def _transact(self, client, method, args, kwargs):
+        """게이트 안에서 요청 1개. 무응답은 그 유닛의 실패일 뿐이므로 송수신 오류가 없으면 연결을 유지한다."""
+        if self._discard:
+            client.discard_input()
+            self._discard = False
+        client.io_failed = False
+        client.hold_close = True
+        start = time.monotonic()
+        try:
+            response = getattr(client, method)(*args, **kwargs)
+        finally:
+            client.hold_close = False
+        if isinstance(response, ModbusIOException):
+            if client.io_failed:
+                client.close()          # 연결 자체의 오류 → 모든 유닛 끊김 처리
+            else:
+                self._discard = True    # 이 유닛만 무응답: 늦게 오는 응답은 다음 요청 전에 버린다
+        elif method == "read_holding_registers":
+            self.rtt.record(time.monotonic() - start)
+        return response
+
+    def response_deadline(self) -> float:
+        """관측한 RTT 로 정한 응답 기한 (통신 이상 판정용)."""
+        return self.rtt.deadline()
+
+    def invalidate(self, client):
+        # 실패한 소켓이 아직 현재 소켓일 때만 닫는다 (다른 유닛이 이미 재연결했을 수 있음)
+        with self._connect_lock:
+            if client is not None and self.client is client:
+                client.close()
+                self.client = None
+
+    def is_open(self) -> bool:
+        client = self.client
+        return client is not None and client.is_socket_open()
+
+    def close(self):
+        with self._connect_lock:
+            if self.client is not None:
+                self.client.close()
+                self.client = None
+
+
+class RtuBus(ModbusEndpoint):
+    """
+    RS-485 직결 버스 1개 (시리얼 포트 1개에 유닛 여러 개).
+    게이트에 줄 선 폴링 요청을 프레임 간 최소 간격만 두고 연달아 내보낸다.
+    host = 장치 경로, port = baud.
+    """
+
+    def __init__(self, path, baudrate, timeout=RTU_TIMEOUT):
+        super().__init__(path, baudrate, timeout)
+        self.baudrate = baudrate
+        self.frame_gap = frame_gap(baudrate)
+        self.stats = BusStats(path, baudrate)
+        self._free_at = 0.0
+
+    def _tune(self, client):
+        pass
+
+    def _new_client(self):
+        client = _SharedSerialClient(self.host, baudrate=self.baudrate, timeout=self.timeout, retries=0)
+        # pymodbus 는 직전 프레임 뒤 최대 7 문자까지 쉬므로, 간격은 execute 에서 정확히 맞춘다
+        client.silent_interval = 0
+        return client
+
+    def execute(self, client, method, args, kwargs):
+        with self.gate:
+            wait = self._free_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            start = time.monotonic()
+            try:
+                # 유닛 하나의 무응답으로는 포트를 닫지 않는다 (USB 어댑터 분리 같은 포트 오류만 닫힘 → is_open False)
+                response = self._transact(client, method, args, kwargs)
+            except Exception:
+                self.stats.record(time.monotonic() - start, False)
+                raise
+            finally:
+                self._free_at = time.monotonic() + self.frame_gap
+            ok = not isinstance(response, ModbusIOException)
+            self.stats.record(time.monotonic() - start, ok, len(getattr(response, "registers", None) or ()))
+            return response
+
+
+class PipelinedEndpoint(ModbusEndpoint):
+    """
+    고지연 링크용: 요청을 게이트로 직렬화하지 않고 트랜잭션 ID 로 여러 개를 동시에 띄운다.
+    유닛(박스)당 동시 요청은 depth 개까지.
+    """
+
+    pipelined = True
+
+    def __init__(self, host, port, timeout=3, depth=4):
+        super().__init__(host, port, timeout)
+        self.depth = depth
+
+    def _new_client(self):
+        return PipelinedTcpClient(self.host, port=self.port, timeout=self.timeout, per_unit=self.depth)
+
+    def response_deadline(self) -> float:
+        client = self.client
+        return client.rtt.deadline() if client is not None else self.timeout
+
+    def _tune(self, client):
+        pass   # PipelinedTcpClient.connect 에서 직접 설정
+
+    def execute(self, client, method, args, kwargs):
+        return getattr(client, method)(*args, **kwargs)
+
+
+class UnitClient:
+    """
+    박스 1개(유닛 ID) 관점의 동기 클라이언트.
+    read_modbus_data / DeviceCommandQueue 가 쓰던 ModbusTcpClient 인터페이스를 그대로 제공한다.
+    """
+
+    def __init__(self, pool, endpoint, unit):
+        self._pool = pool
+        self.endpoint = endpoint
+        self.unit = unit
+        self._last_client = None
+        self._closed = False
+
+    @property
+    def shared(self) -> bool:
+        return self.endpoint.users > 1
+
+    @property
+    def pipelined(self) -> bool:
+        return self.endpoint.pipelined
+
+    @property
+    def pipeline_depth(self) -> int:
+        return self.endpoint.depth if self.endpoint.pipelined else 1
+
+    def _execute(self, method, *args, **kwargs):
+        client = self.endpoint.client
+        if client is None:
+            raise ConnectionException("Socket is closed")
+        self._last_client = client
+        kwargs.setdefault("slave", self.unit)
+        return self.endpoint.execute(client, method, args, kwargs)
+
+    def read_holding_registers(self, address, count=1, **kwargs):
+        return self._execute("read_holding_registers", address, count, **kwargs)
+
+    def write_register(self, address, value, **kwargs):
+        return self._execute("write_register", address, value, **kwargs)
+
+    def write_registers(self, address, values, **kwargs):
+        return self._execute("write_registers", address, values, **kwargs)
+
+    def readwrite_registers(self, read_address, read_count, write_address, values, **kwargs):
+        return self._execute("readwrite_registers", read_address, read_count, write_address, values, **kwargs)
+
+    def execute(self, request):
+        """임의 요청 PDU (modbus_proxy 가 전달한 도구 요청). 유닛 ID 는 이 박스의 것으로 바꾼다."""
+        client = self.endpoint.client
+        if client is None:
+            raise ConnectionException("Socket is closed")
+        self._last_client = client
+        request.slave_id = self.unit
+        return self.endpoint.execute(client, "execute", (request,), {})
+
+    def submit_read(self, address, count=1):
+        """PipelinedEndpoint 전용: 응답을 기다리지 않고 Future 를 돌려준다."""
+        client = self.endpoint.client
+        if client is None:
+            raise ConnectionException("Socket is closed")
+        self._last_client = client
+        return client.submit_read(address, count, slave=self.unit)
+
+    def connect(self) -> bool:
+        ok = self.endpoint.connect()
+        if ok:
+            self._last_client = self.endpoint.client
+        return ok
+
+    def invalidate(self):
+        self.endpoint.invalidate(self._last_client)
+
+    def is_socket_open(self) -> bool:
+        return self.endpoint.is_open()
+
+    def response_deadline(self) -> float:
+        return self.endpoint.response_deadline()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._pool.release(self.endpoint)
+
+
+class EndpointPool:
+    def __init__(self, timeout=3, pipeline_depth=0):
+        self.timeout = timeout
+        self.pipeline_depth = pipeline_depth
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def unit_client(self, host, port, unit) -> UnitClient:
+        with self._lock:
+            endpoint = self._endpoints.get((host, port))
+            if endpoint is None:
+                if host.startswith(SERIAL_PREFIX):
+                    endpoint = RtuBus(host, port)
+                elif self.pipeline_depth > 1:
+                    endpoint = PipelinedEndpoint(host, port, self.timeout, self.pipeline_depth)
+                else:
+                    endpoint = ModbusEndpoint(host, port, self.timeout)
+                self._endpoints[(host, port)] = endpoint
+            endpoint.users += 1
+        return UnitClient(self, endpoint, unit)
+
+    def serial_buses(self):
+        with self._lock:
+            return [e for e in self._endpoints.values() if isinstance(e, RtuBus)]
+
+    def release(self, endpoint):
+        with self._lock:
+            endpoint.users -= 1
+            if endpoint.users > 0:
+                return
+            if self._endpoints.get((endpoint.host, endpoint.port)) is endpoint:
+                del self._endpoints[(endpoint.host, endpoint.port)]
+        endpoint.close()
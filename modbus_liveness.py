@@ -0,0 +1,75 @@
+# modbus_liveness.py
+#
+# 죽은 검지기/빠진 케이블을 빨리 알아채기 위한 도구.
+#  - tune_keepalive: TCP keepalive 와 TCP_USER_TIMEOUT 으로 응답 없는 연결을 커널이 몇 초 안에 끊게 한다
+#    (폴링이 뜸한 박스, 명령만 오가는 연결도 끊김이 드러나도록)
+#  - RttTracker: 관측한 응답 시간 분포(평균 + 4×편차, RFC 6298 방식)로 응답 기한을 정한다.
+#    이 기한은 박스의 "통신 이상(stale)" 판정에만 쓴다 - 요청 자체는 timeout 까지 기다리고 연결도 닫지 않는다.
+# 통신 이상 표시는 ModbusUI 가 DeviceStateTable 의 응답 대기 시각으로 판정한다 (기한 = max(STALE_AFTER, RTT 기한)).
+
+import socket
+import threading
+
+KEEPALIVE_IDLE = 1           # 마지막 송수신 후 첫 keepalive 까지(초)
+KEEPALIVE_INTERVAL = 1       # keepalive 간격(초)
+KEEPALIVE_COUNT = 2          # 이만큼 연속 무응답이면 연결 끊김
+USER_TIMEOUT = 1.5           # 보낸 데이터가 이 시간(초) 동안 ACK 되지 않으면 연결 끊김
+
+MIN_DEADLINE = 0.25          # 응답 기한 하한 (장비 처리 시간 + 스케줄링 지터)
+STALE_AFTER = 0.8            # 폴링 응답을 이만큼(초) 못 받으면 박스를 통신 이상으로 표시
+
+
+def tune_keepalive(sock, idle=KEEPALIVE_IDLE, interval=KEEPALIVE_INTERVAL, count=KEEPALIVE_COUNT,
+                   user_timeout=USER_TIMEOUT):
+    """플랫폼에 없는 옵션은 건너뛴다 (TCP_USER_TIMEOUT 은 Linux 전용)."""
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    except OSError:
+        return
+    options = [("TCP_KEEPIDLE", idle), ("TCP_KEEPINTVL", interval), ("TCP_KEEPCNT", count)]
+    if user_timeout:
+        options.append(("TCP_USER_TIMEOUT", int(user_timeout * 1000)))
+    for name, value in options:
+        opt = getattr(socket, name, None)
+        if opt is None:
+            continue
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, opt, max(1, int(value)))
+        except OSError:
+            pass
+
+
+class RttTracker:
+    """연결 1개의 응답 시간 추정 (스레드 안전). 첫 응답 전에는 max_deadline 을 쓴다."""
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(self, max_deadline=3.0, min_deadline=MIN_DEADLINE):
+        self.max_deadline = max_deadline
+        self.min_deadline = min(min_deadline, max_deadline)
+        self._lock = threading.Lock()
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+
+    def record(self, rtt: float):
+        with self._lock:
+            if self.srtt is None:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+            else:
+                self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+                self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+            self.samples += 1
+
+    def deadline(self) -> float:
+        with self._lock:
+            if self.srtt is None:
+                return self.max_deadline
+            rto = self.srtt + self.K * self.rttvar
+        return min(self.max_deadline, max(self.min_deadline, rto))
+
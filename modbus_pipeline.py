@@ -0,0 +1,237 @@
+# modbus_pipeline.py
+#
+# 고지연(VPN/LTE) 현장용 파이프라인 Modbus TCP 클라이언트.
+# 요청을 보내고 응답을 기다리지 않고 돌아오므로(submit) 한 연결에 여러 트랜잭션이 동시에 떠 있고,
+# 수신 스레드가 MBAP 트랜잭션 ID 로 응답을 짝지어 Future 에 넣는다.
+# 처리량이 RTT 가 아니라 대역폭에 묶이도록 하는 것이 목적이다.
+#  - 연결당 동시 요청 상한(max_outstanding), 유닛(장비)당 상한(per_unit)
+#  - 응답 기한은 timeout. 기한이 지나면 해당 요청만 ModbusIOException 이고 연결은 유지한다
+#    (게이트웨이 뒤 유닛 하나의 무응답으로 다른 박스까지 끊기지 않도록 - 죽은 링크는 TCP keepalive 가 끊는다).
+#    관측한 RTT(RttTracker)는 박스의 통신 이상 판정 기한에 쓴다 (ModbusEndpoint.response_deadline).
+
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from pymodbus.factory import ClientDecoder
+from pymodbus.register_read_message import ReadHoldingRegistersRequest, ReadWriteMultipleRegistersRequest
+from pymodbus.register_write_message import WriteMultipleRegistersRequest, WriteSingleRegisterRequest
+
+from modbus_capture import RECORDER, RX, TX
+from modbus_liveness import MIN_DEADLINE, RttTracker, tune_keepalive
+
+MBAP = struct.Struct(">HHHB")   # transaction id, protocol id(0), length, unit id
+DEFAULT_MAX_OUTSTANDING = 16
+RX_POLL_SEC = 0.1               # 타임아웃 검사 주기
+
+
+class _Pending:
+    __slots__ = ("future", "sent", "deadline", "unit", "timed")
+
+    def __init__(self, future, sent, deadline, unit, timed):
+        self.future = future
+        self.sent = sent
+        self.deadline = deadline
+        self.unit = unit
+        self.timed = timed     # RTT 표본으로 쓸지 (읽기만)
+
+
+class PipelinedTcpClient:
+    """
+    ModbusTcpClient 와 같은 동기 메서드(read_holding_registers 등)도 제공하므로
+    ModbusEndpoint/UnitClient/DeviceCommandQueue 에서 그대로 쓸 수 있다.
+    """
+
+    def __init__(self, host, port=502, timeout=3, per_unit=4, max_outstanding=DEFAULT_MAX_OUTSTANDING,
+                 min_deadline=MIN_DEADLINE):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.rtt = RttTracker(max_deadline=timeout, min_deadline=min_deadline)
+        self.per_unit = per_unit
+        self.max_outstanding = max_outstanding
+
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._lock = threading.Condition()
+        self._pending = {}
+        self._unit_counts = {}
+        self._next_tid = 1
+        self._decoder = ClientDecoder()
+        self.capture_peer = RECORDER.peer_id(host, port)
+
+    # 연결 -------------------------------------------------------------------
+    def connect(self) -> bool:
+        if self._sock is not None:
+            return True
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError:
+            return False
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        tune_keepalive(sock)
+        sock.settimeout(RX_POLL_SEC)
+        with self._lock:
+            self._sock = sock
+        threading.Thread(target=self._reader, args=(sock,), daemon=True).start()
+        return True
+
+    def is_socket_open(self) -> bool:
+        return self._sock is not None
+
+    def close(self):
+        self._drop(None, "Socket is closed")
+
+    def _drop(self, sock, reason):
+        """sock 이 현재 소켓일 때만(None 이면 무조건) 닫고, 떠 있던 요청을 모두 실패 처리."""
+        with self._lock:
+            if self._sock is None or (sock is not None and self._sock is not sock):
+                return
+            sock, self._sock = self._sock, None
+            pending, self._pending = self._pending, {}
+            self._unit_counts = {}
+            self._lock.notify_all()
+        try:
+            sock.close()
+        except OSError:
+            pass
+        for p in pending.values():
+            if not p.future.done():
+                p.future.set_exception(ConnectionException(reason))
+
+    # 송신 -------------------------------------------------------------------
+    def submit(self, request) -> Future:
+        """요청 PDU 를 보내고 바로 Future 를 돌려준다. 창(window)이 차 있으면 빌 때까지 기다린다."""
+        unit = request.slave_id
+        future = Future()
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            while self._sock is not None and (
+                len(self._pending) >= self.max_outstanding or self._unit_counts.get(unit, 0) >= self.per_unit
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    future.set_result(ModbusIOException("No response received (pipeline window full)", request.function_code))
+                    return future
+                self._lock.wait(remaining)
+            sock = self._sock
+            if sock is None:
+                future.set_exception(ConnectionException("Socket is closed"))
+                return future
+            tid = self._allocate_tid()
+            timed = request.function_code == ReadHoldingRegistersRequest.function_code
+            sent = time.monotonic()
+            self._pending[tid] = _Pending(future, sent, sent + self.timeout, unit, timed)
+            self._unit_counts[unit] = self._unit_counts.get(unit, 0) + 1
+
+        pdu = bytes([request.function_code]) + request.encode()
+        frame = MBAP.pack(tid, 0, len(pdu) + 1, unit) + pdu
+        try:
+            with self._send_lock:
+                sock.sendall(frame)
+            RECORDER.record(self.capture_peer, TX, frame)
+        except OSError as e:
+            self._drop(sock, str(e))
+        return future
+
+    def _allocate_tid(self):
+        while True:
+            tid = self._next_tid
+            self._next_tid = tid % 0xFFFF + 1
+            if tid not in self._pending:
+                return tid
+
+    def _finish(self, tid):
+        p = self._pending.pop(tid, None)
+        if p is not None:
+            left = self._unit_counts.get(p.unit, 1) - 1
+            if left > 0:
+                self._unit_counts[p.unit] = left
+            else:
+                self._unit_counts.pop(p.unit, None)
+            self._lock.notify_all()
+        return p
+
+    # 수신 -------------------------------------------------------------------
+    def _reader(self, sock):
+        buf = b""
+        while True:
+            try:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    self._drop(sock, "Connection closed by peer")
+                    return
+            except socket.timeout:
+                chunk = b""
+            except OSError as e:
+                self._drop(sock, str(e))
+                return
+            if self._sock is not sock:
+                return
+
+            if chunk:
+                buf += chunk
+                while len(buf) >= MBAP.size:
+                    tid, _, length, unit = MBAP.unpack_from(buf)
+                    end = MBAP.size - 1 + length
+                    if len(buf) < end:
+                        break
+                    RECORDER.record(self.capture_peer, RX, memoryview(buf)[:end])
+                    pdu, buf = buf[MBAP.size:end], buf[end:]
+                    self._deliver(tid, unit, pdu)
+            self._expire()
+
+    def _deliver(self, tid, unit, pdu):
+        with self._lock:
+            p = self._finish(tid)
+        if p is None:
+            return   # 이미 타임아웃 처리된 늦은 응답
+        if p.timed:
+            self.rtt.record(time.monotonic() - p.sent)
+        try:
+            response = self._decoder.decode(pdu)
+        except Exception:
+            response = None
+        if response is None:
+            p.future.set_result(ModbusIOException(f"Unable to decode response: {pdu.hex()}"))
+            return
+        response.transaction_id = tid
+        response.slave_id = unit
+        p.future.set_result(response)
+
+    def _expire(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [self._finish(tid) for tid, p in list(self._pending.items()) if p.deadline <= now]
+        for p in expired:
+            if p is not None and not p.future.done():
+                p.future.set_result(ModbusIOException("No response received from unit"))
+
+    # ModbusTcpClient 호환 동기 메서드 --------------------------------------
+    def _wait(self, future):
+        return future.result(timeout=self.timeout + 1.0)
+
+    def submit_read(self, address, count=1, slave=0) -> Future:
+        return self.submit(ReadHoldingRegistersRequest(address, count, slave=slave))
+
+    def read_holding_registers(self, address, count=1, slave=0):
+        return self._wait(self.submit_read(address, count, slave))
+
+    def write_register(self, address, value, slave=0):
+        return self._wait(self.submit(WriteSingleRegisterRequest(address, value, slave=slave)))
+
+    def write_registers(self, address, values, slave=0):
+        return self._wait(self.submit(WriteMultipleRegistersRequest(address, values, slave=slave)))
+
+    def readwrite_registers(self, read_address, read_count, write_address, values, slave=0):
+        return self._wait(self.submit(ReadWriteMultipleRegistersRequest(
+            read_address=read_address, read_count=read_count, write_address=write_address,
+            write_registers=values, slave=slave,
+        )))
+
+    def execute(self, request):
+        """임의 요청 (modbus_proxy). request.slave_id 로 보낸다."""
+        return self._wait(self.submit(request))
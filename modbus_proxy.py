@@ -0,0 +1,132 @@
+# modbus_proxy.py
+#
+# 엔지니어링 도구(test1.py 같은 스크립트, 설정 프로그램)용 Modbus TCP 프록시.
+# 도구가 검지기에 따로 연결하면 GMS 폴링과 연결을 다투다 "No response received" 가 나므로,
+# 도구는 GMS 의 프록시 포트로 보내고 GMS 는 받은 요청을 그 박스의 명령 큐(DeviceCommandQueue)에 넣는다.
+# 요청은 폴링 사이에 GMS 가 이미 열어 둔 연결로 실행되므로 장비 세션이 늘지 않고 폴링도 끊기지 않는다.
+#
+#   유닛 ID = 박스 번호 + 1 (집계 서버와 같은 번호). 요청 PDU 는 해석만 하고 그대로 전달한다 (FC 제한 없음).
+#   박스가 연결되어 있지 않으면 0x0A(Gateway Path Unavailable), 응답이 없으면 0x0B(Gateway Target No Response).
+#
+#   python test1.py 로 직접 붙는 대신: ModbusTcpClient(GMS, port=proxy_port).read_holding_registers(21, 1, slave=box + 1)
+
+import asyncio
+import struct
+import threading
+
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from pymodbus.factory import ServerDecoder
+from pymodbus.pdu import IllegalFunctionRequest, ModbusExceptions
+
+DEFAULT_PROXY_HOST = "127.0.0.1"     # 다른 PC 의 도구를 받으려면 modbus_proxy_host 를 명시 (예: "0.0.0.0")
+PROXY_TIMEOUT = 5.0         # 큐 대기 + 장비 응답 (폴링 1사이클 + 명령 timeout 여유)
+
+_MBAP = struct.Struct(">HHHB")
+
+
+def _exception_pdu(function_code, code) -> bytes:
+    return bytes(((function_code | 0x80) & 0xFF, code))
+
+
+class ModbusToolProxy:
+    def __init__(self, ui, host=DEFAULT_PROXY_HOST, port=502, timeout=PROXY_TIMEOUT):
+        # ui: ModbusUI (submit_proxy_request, box_states 를 제공)
+        self.ui = ui
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.loop = None
+        self.server = None
+        self._thread = None
+        self._decoder = ServerDecoder()
+        self.requests = 0
+        self.failures = 0
+        self.clients = 0
+
+    def start(self):
+        """프록시 스레드를 띄우고 포트가 열릴 때까지 기다린다. 실패하면 예외."""
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        errors = []
+
+        def _run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+            except Exception as e:
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, daemon=True, name="modbus-proxy")
+        self._thread.start()
+        ready.wait()
+        if errors:
+            self._thread = None
+            raise errors[0]
+
+    def stop(self):
+        if self.loop is None:
+            return
+
+        def _close():
+            if self.server is not None:
+                self.server.close()
+                self.server = None
+            self.loop.stop()
+
+        self.loop.call_soon_threadsafe(_close)
+
+    async def _handle(self, reader, writer):
+        self.clients += 1
+        try:
+            while True:
+                tid, protocol, length, unit = _MBAP.unpack(await reader.readexactly(_MBAP.size))
+                if protocol != 0 or not 2 <= length <= 254:
+                    return   # Modbus TCP 가 아님 → 연결 종료
+                pdu = await reader.readexactly(length - 1)
+                response = await self._forward(unit, pdu)
+                writer.write(_MBAP.pack(tid, 0, len(response) + 1, unit) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def _forward(self, unit, pdu) -> bytes:
+        """요청 PDU → 응답 PDU (기능 코드 포함)."""
+        function_code = pdu[0]
+        self.requests += 1
+        try:
+            request = self._decoder.decode(pdu)
+        except Exception:
+            return _exception_pdu(function_code, ModbusExceptions.IllegalValue)
+        if request is None or isinstance(request, IllegalFunctionRequest):
+            return _exception_pdu(function_code, ModbusExceptions.IllegalFunction)
+
+        box_index = unit - 1
+        if not 0 <= box_index < len(self.ui.box_states):
+            return _exception_pdu(function_code, ModbusExceptions.GatewayPathUnavailable)
+        try:
+            future = self.ui.submit_proxy_request(box_index, request)
+        except ConnectionException:
+            return _exception_pdu(function_code, ModbusExceptions.GatewayPathUnavailable)
+
+        try:
+            response = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except ConnectionException:
+            self.failures += 1
+            return _exception_pdu(function_code, ModbusExceptions.GatewayPathUnavailable)
+        except Exception:
+            # 기한 초과(큐에서 취소됨), 무응답, 디코딩 실패
+            self.failures += 1
+            return _exception_pdu(function_code, ModbusExceptions.GatewayNoResponse)
+        if response is None or isinstance(response, ModbusIOException):
+            self.failures += 1
+            return _exception_pdu(function_code, ModbusExceptions.GatewayNoResponse)
+        return bytes((response.function_code,)) + response.encode()
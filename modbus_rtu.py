@@ -0,0 +1,95 @@
+# modbus_rtu.py
+#
+# RS-485 직결(Modbus RTU) 버스 계산/통계.
+#  - 프레임 전송 시간, 프레임 간 최소 간격(3.5 문자, 19200bps 초과는 1.75ms)
+#  - 버스별 처리량/지연 통계 (EndpointPool 의 RtuBus 가 기록, ModbusUI 가 주기적으로 출력)
+
+import threading
+import time
+
+BITS_PER_CHAR = 10       # start + 8 data + stop (parity 없음)
+RTU_TIMEOUT = 0.3        # 응답 대기. 버스를 공유하므로 TCP(3초)보다 훨씬 짧게
+
+# FC03 읽기: 요청 = unit + fc + addr(2) + count(2) + crc(2)
+READ_REQUEST_BYTES = 8
+# 응답 = unit + fc + byte count + data(2n) + crc(2)
+READ_RESPONSE_OVERHEAD = 5
+
+
+def char_time(baudrate: int) -> float:
+    return BITS_PER_CHAR / float(baudrate)
+
+
+def frame_gap(baudrate: int) -> float:
+    """프레임 사이에 비워야 하는 최소 시간 (Modbus over serial line 규격)."""
+    if baudrate > 19200:
+        return 0.00175
+    return 3.5 * char_time(baudrate)
+
+
+def read_wire_time(baudrate: int, count: int) -> float:
+    """레지스터 count 개 읽기 1회가 버스를 차지하는 이론상 최소 시간 (응답 지연 0 가정)."""
+    frames = READ_REQUEST_BYTES + READ_RESPONSE_OVERHEAD + 2 * count
+    return frames * char_time(baudrate) + 2 * frame_gap(baudrate)
+
+
+class BusStats:
+    """버스 1개의 요청 수/지연/점유율. report() 할 때마다 구간을 새로 시작한다."""
+
+    def __init__(self, name, baudrate):
+        self.name = name
+        self.baudrate = baudrate
+        self._lock = threading.Lock()
+        self._reset(time.monotonic())
+
+    def _reset(self, now):
+        self._since = now
+        self._requests = 0
+        self._timeouts = 0
+        self._registers = 0
+        self._busy = 0.0
+        self._wire = 0.0
+        self._latency_max = 0.0
+
+    def record(self, latency, ok, registers=0):
+        with self._lock:
+            self._requests += 1
+            self._busy += latency
+            self._latency_max = max(self._latency_max, latency)
+            if ok:
+                self._registers += registers
+                self._wire += read_wire_time(self.baudrate, registers) if registers else 0.0
+            else:
+                self._timeouts += 1
+
+    def snapshot(self, reset=False, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            elapsed = max(now - self._since, 1e-6)
+            requests = self._requests
+            ok = requests - self._timeouts
+            stats = {
+                "bus": self.name,
+                "baudrate": self.baudrate,
+                "elapsed": elapsed,
+                "requests": requests,
+                "timeouts": self._timeouts,
+                "rps": requests / elapsed,
+                "registers_per_sec": self._registers / elapsed,
+                "avg_ms": 1000.0 * self._busy / requests if requests else 0.0,
+                "max_ms": 1000.0 * self._latency_max,
+                "busy": min(1.0, self._busy / elapsed),
+                # 실제 걸린 시간 대비 이론상 최소 시간 (1.0 에 가까울수록 버스를 빈틈없이 씀)
+                "efficiency": self._wire / self._busy if ok and self._busy else 0.0,
+            }
+            if reset:
+                self._reset(now)
+        return stats
+
+    def report(self, reset=True) -> str:
+        s = self.snapshot(reset=reset)
+        return (
+            f"{s['bus']} {s['baudrate']}bps: {s['rps']:.1f} req/s, 레지스터 {s['registers_per_sec']:.0f}/s, "
+            f"평균 {s['avg_ms']:.1f}ms, 최대 {s['max_ms']:.1f}ms, 무응답 {s['timeouts']}, "
+            f"점유 {s['busy']:.0%}, 효율 {s['efficiency']:.0%}"
+        )
@@ -0,0 +1,215 @@
+# modbus_server.py
+#
+# SCADA 용 Modbus TCP 집계 서버.
+# 검지기는 TCP 연결을 몇 개만 받고 두 곳에서 폴링하면 느려지므로, SCADA 는 검지기 대신 GMS 를 읽게 한다.
+# 폴링 루프가 받은 레지스터 블록을 RegisterMirror 에 복사해 두고, 서버는 메모리에서만 응답한다
+# (장비 왕복 없음, 폴링 스레드/장비 명령 큐와 무관). 서버는 자체 asyncio 스레드에서 여러 SCADA 연결을 받는다.
+#
+# 유닛 ID 와 레지스터 (FC03/FC04, 읽기 전용 - 쓰기는 IllegalAddress):
+#   유닛 1..N (Modbus 박스 i → 유닛 i+1): 검지기와 같은 주소 40001~40100 (마지막으로 읽은 값)
+#       40101 연결 상태 (0 해제, 1 정상, 2 끊김, 3 통신 이상)  40102 마지막 갱신 후 경과(0.1초)  40103 끊김 횟수
+#       연결 해제/끊김 박스와 아직 값이 없는 박스는 0x0B(Gateway Target No Response) 로 응답한다.
+#   유닛 101.. (아날로그 박스 i → 유닛 101+i): 40001 상태(bit6 AL1, bit7 AL2), 40005 값, 40006 mA×100,
+#       40101 연결 상태(PWR OFF/ADC 오류 = 2), 40102 경과(0.1초)
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+from pymodbus.datastore import ModbusServerContext
+from pymodbus.datastore.context import ModbusBaseSlaveContext
+from pymodbus.exceptions import NoSuchSlaveException
+from pymodbus.server import ModbusTcpServer
+
+from device_table import CONN_LOST, CONN_OFFLINE, CONN_ONLINE
+from register_schema import BASE_ADDR, REG_ERROR, REG_STATUS, REG_VALUE
+
+MIRROR_REGS = 128           # 40001 ~ 40128
+DEVICE_REGS = 100           # 40001 ~ 40100: 검지기 레지스터 그대로
+REG_CONNECTION = 40101
+REG_AGE = 40102
+REG_DISCONNECTS = 40103
+REG_ANALOG_MA = 40006
+
+ANALOG_UNIT_BASE = 101
+MAX_UNIT = 247
+
+DEFAULT_SERVER_HOST = "0.0.0.0"
+
+_READ_FUNCTIONS = (3, 4)
+_STATUS_AL1 = 1 << 6
+_STATUS_AL2 = 1 << 7
+
+
+class RegisterMirror:
+    """박스별 레지스터 사본 (폴링 스레드가 쓰고 서버 스레드가 읽는다)."""
+
+    def __init__(self, num_boxes: int):
+        self._lock = threading.Lock()
+        self.regs = np.zeros((num_boxes, MIRROR_REGS), dtype=np.uint16)
+        self.updated = np.full(num_boxes, np.nan, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.regs)
+
+    def update(self, box_index: int, start: int, regs, now=None):
+        """start(4xxxx) 부터의 레지스터 블록 반영."""
+        offset = start - BASE_ADDR
+        count = min(len(regs), DEVICE_REGS - offset)
+        if offset < 0 or count <= 0:
+            return
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.regs[box_index, offset:offset + count] = regs[:count]
+            self.updated[box_index] = now
+
+    def set(self, box_index: int, values: dict, now=None):
+        """{4xxxx: 값} 여러 개를 한 번에 (아날로그 박스)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            row = self.regs[box_index]
+            for reg, value in values.items():
+                row[reg - BASE_ADDR] = max(0, min(0xFFFF, int(value)))
+            self.updated[box_index] = now
+
+    def has_data(self, box_index: int) -> bool:
+        return not np.isnan(self.updated[box_index])
+
+    def read(self, box_index: int, address: int, count: int, now=None) -> list:
+        """address: 0 기준 (40001 = 0). 40102(경과)는 읽을 때 채운다."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            values = self.regs[box_index, address:address + count].tolist()
+            updated = self.updated[box_index]
+        age = REG_AGE - BASE_ADDR - address
+        if 0 <= age < count:
+            values[age] = 0xFFFF if np.isnan(updated) else min(0xFFFF, int((now - updated) * 10))
+        return values
+
+
+class _MirrorSlave(ModbusBaseSlaveContext):
+    """유닛 1개 = 미러의 박스 1개 (읽기 전용)."""
+
+    def __init__(self, mirror, box_index, device_table=None):
+        self.mirror = mirror
+        self.box_index = box_index
+        self.device_table = device_table
+
+    def reset(self):
+        pass
+
+    def validate(self, fc_as_hex, address, count=1):
+        return fc_as_hex in _READ_FUNCTIONS and address >= 0 and address + count <= MIRROR_REGS
+
+    def getValues(self, fc_as_hex, address, count=1):
+        values = self.mirror.read(self.box_index, address, count)
+        table = self.device_table
+        if table is not None:
+            # 연결 상태/끊김 횟수는 DeviceStateTable 에서 (원소 1개 읽기라 락 없이)
+            for reg, value in (
+                (REG_CONNECTION, table.connection[self.box_index]),
+                (REG_DISCONNECTS, table.disconnects[self.box_index]),
+            ):
+                index = reg - BASE_ADDR - address
+                if 0 <= index < count:
+                    values[index] = min(0xFFFF, int(value))
+        return values
+
+    def setValues(self, fc_as_hex, address, values):
+        pass
+
+
+class AggregationContext(ModbusServerContext):
+    """유닛 ID → 박스. 값이 없거나 연결이 끊긴 박스는 NoSuchSlaveException (0x0B 응답)."""
+
+    def __init__(self, modbus_mirror=None, device_table=None, analog_mirror=None):
+        slaves = {}
+        if modbus_mirror is not None:
+            for box_index in range(min(len(modbus_mirror), ANALOG_UNIT_BASE - 1)):
+                slaves[box_index + 1] = _MirrorSlave(modbus_mirror, box_index, device_table)
+        if analog_mirror is not None:
+            for box_index in range(min(len(analog_mirror), MAX_UNIT - ANALOG_UNIT_BASE + 1)):
+                slaves[ANALOG_UNIT_BASE + box_index] = _MirrorSlave(analog_mirror, box_index)
+        super().__init__(slaves=slaves, single=False)
+
+    def __getitem__(self, slave):
+        context = self._slaves.get(slave)
+        if context is None or not context.mirror.has_data(context.box_index):
+            raise NoSuchSlaveException(f"slave - {slave} has no data")
+        table = context.device_table
+        if table is not None and table.connection[context.box_index] in (CONN_OFFLINE, CONN_LOST):
+            raise NoSuchSlaveException(f"slave - {slave} is disconnected")
+        return context
+
+
+def analog_registers(milliamp, value, alarm1, alarm2, pwr_on) -> dict:
+    """아날로그 박스 1개의 표시 상태 → 집계 서버 레지스터."""
+    return {
+        REG_STATUS: (_STATUS_AL1 if alarm1 else 0) | (_STATUS_AL2 if alarm2 else 0),
+        REG_VALUE: round(value),
+        REG_ERROR: 0,
+        REG_ANALOG_MA: round(max(0.0, milliamp) * 100),
+        REG_CONNECTION: CONN_ONLINE if pwr_on else CONN_LOST,
+    }
+
+
+class AggregationServer:
+    def __init__(self, modbus_ui=None, analog_ui=None, host=DEFAULT_SERVER_HOST, port=502):
+        self.host = host
+        self.port = port
+        self.context = AggregationContext(
+            modbus_ui.register_mirror if modbus_ui is not None else None,
+            modbus_ui.device_table if modbus_ui is not None else None,
+            analog_ui.register_mirror if analog_ui is not None else None,
+        )
+        self.loop = None
+        self.server = None
+        self._thread = None
+        self.requests = 0
+
+    def _trace(self, request, *addr):
+        self.requests += 1
+
+    def start(self):
+        """서버 스레드를 띄우고 포트가 열릴 때까지 기다린다. 실패하면 예외."""
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        errors = []
+
+        async def _serve():
+            self.server = ModbusTcpServer(self.context, address=(self.host, self.port), request_tracer=self._trace)
+            if not await self.server.listen():
+                raise OSError(f"{self.host}:{self.port} 에서 연결을 받을 수 없습니다")
+
+        def _run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.loop.run_until_complete(_serve())
+            except Exception as e:
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, daemon=True, name="modbus-server")
+        self._thread.start()
+        ready.wait()
+        if errors:
+            self._thread = None
+            raise errors[0]
+
+    def stop(self):
+        if self.loop is None:
+            return
+
+        def _close():
+            if self.server is not None:
+                self.server.close()
+                self.server = None
+            self.loop.stop()
+
+        self.loop.call_soon_threadsafe(_close)
@@ -0,0 +1,146 @@
+# modbus_transaction.py
+#
+# 레지스터 쓰기 묶음(트랜잭션) 빌더.
+# 쓰기를 모아 두었다가 연속된 레지스터는 FC16 한 번으로 합치고(사이가 비어 있으면 known 에 현재 값이 있을 때만
+# 그 값으로 채워 합친다), 쓴 뒤 확인할 구간이 있으면 마지막 쓰기를 FC23(read/write multiple) 으로 보내
+# 같은 왕복에서 읽어 온다. FC23 지원 여부는 박스마다 처음 한 번 시험하고 기억한다 (fc23: None 모름/True/False).
+# 시험에서 IllegalFunction 예외 응답이 올 때만 미지원으로 보고 FC16(FC06) + FC03 으로 다시 보낸다.
+# 무응답(ModbusIOException/None)은 장비가 쓰기를 받았을 수 있으므로 다시 보내지 않고 ModbusIOException 으로 올린다
+# (지원 여부는 모르는 채로 둔다 - 호출 쪽의 무응답 처리가 그대로 돈다).
+#
+#   tx = WriteTransaction()
+#   tx.write(40088, [hi, lo])        # TFTP IP
+#   tx.write(40091, 1)               # FW 시작
+#   tx.confirm(40088, 2)
+#   result = tx.execute(run, fc23)   # run(method, *args) → 응답 (ModbusUI._run_command)
+#
+# 쓰기는 주소 순으로 보낸다 (이 장비는 제어 레지스터가 설정 레지스터보다 뒤에 있다).
+
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse, ModbusExceptions
+
+from register_schema import BASE_ADDR
+
+DEFAULT_MAX_GAP = 4
+
+
+def _is_error(response) -> bool:
+    return response is None or getattr(response, "isError", lambda: True)()
+
+
+class TransactionResult:
+    def __init__(self):
+        self.responses = []     # 보낸 요청의 응답 (순서대로, FC23 시험 실패 포함)
+        self.written = []       # 성공한 쓰기 [(시작 4xxxx, 값 목록)]
+        self.confirmed = None   # 확인 구간 레지스터 (읽지 못했으면 None)
+        self.fc23 = None        # 이번에 알게 된(또는 그대로인) FC23 지원 여부
+        self.error = None       # 첫 실패 응답
+        self.ok = True
+
+    def wrote(self, reg: int) -> bool:
+        return any(start <= reg < start + len(values) for start, values in self.written)
+
+    @property
+    def round_trips(self) -> int:
+        return len(self.responses)
+
+    @property
+    def last(self):
+        return self.responses[-1] if self.responses else None
+
+
+class WriteTransaction:
+    def __init__(self, max_gap=DEFAULT_MAX_GAP):
+        self.max_gap = max_gap
+        self._values = {}           # 4xxxx → 값 (같은 레지스터는 나중 쓰기)
+        self.confirm_range = None   # (시작 4xxxx, 개수)
+        self.fallback_read = True
+
+    def write(self, reg: int, values):
+        if isinstance(values, int):
+            values = [values]
+        for n, value in enumerate(values):
+            self._values[reg + n] = int(value) & 0xFFFF
+        return self
+
+    def confirm(self, start: int, count: int, fallback_read=True):
+        """
+        쓰기 뒤에 이 구간을 읽어 확인한다 (FC23 이면 같은 왕복).
+        fallback_read=False 면 FC23 미지원 장비에서는 왕복을 늘리지 않도록 확인을 건너뛴다.
+        """
+        self.confirm_range = (start, count)
+        self.fallback_read = fallback_read
+        return self
+
+    def span(self):
+        """쓰기 대상 [첫 레지스터, 마지막 + 1) - known 을 구할 범위."""
+        if not self._values:
+            return None
+        return min(self._values), max(self._values) + 1
+
+    def runs(self, known=None) -> list:
+        """보낼 쓰기 [(시작 4xxxx, 값 목록)]. max_gap 이하의 빈 곳은 known 에 값이 다 있을 때만 메운다."""
+        known = known or {}
+        runs = []
+        for reg in sorted(self._values):
+            if runs:
+                start, values = runs[-1]
+                gap = range(start + len(values), reg)
+                if len(gap) <= self.max_gap and all(r in known for r in gap):
+                    values.extend(known[r] for r in gap)
+                    values.append(self._values[reg])
+                    continue
+            runs.append((reg, [self._values[reg]]))
+        return runs
+
+    def execute(self, run, fc23=None, known=None, stop_on_error=True) -> TransactionResult:
+        """
+        run(method, *args) 로 보낸다. stop_on_error=False 면 실패한 쓰기 뒤에도 남은 쓰기를 보낸다.
+        확인 구간이 있고 fc23 이 False 가 아니면 마지막 쓰기를 FC23 으로 보낸다.
+        """
+        result = TransactionResult()
+        result.fc23 = fc23
+        runs = self.runs(known)
+        for n, (start, values) in enumerate(runs):
+            if n == len(runs) - 1 and self.confirm_range is not None and result.fc23 is not False:
+                read_start, read_count = self.confirm_range
+                # run 이 던지는 예외(타임아웃 등)도 다시 보내지 않고 그대로 올린다
+                rr = run("readwrite_registers", read_start - BASE_ADDR, read_count, start - BASE_ADDR, values)
+                result.responses.append(rr)
+                if not _is_error(rr):
+                    result.fc23 = True
+                    result.written.append((start, values))
+                    result.confirmed = list(rr.registers)
+                    return result
+                if not isinstance(rr, ExceptionResponse):
+                    # 무응답: 쓰였는지 모른다 → 다시 보내지 않는다
+                    raise rr if isinstance(rr, ModbusIOException) else ModbusIOException("No response received")
+                if result.fc23 or rr.exception_code != ModbusExceptions.IllegalFunction:
+                    # 지원하는 장비(또는 기능은 있는 장비)의 오류 응답 → 쓰기 실패
+                    result.ok = False
+                    result.error = rr
+                    return result
+                # IllegalFunction (FC23 은 한꺼번에 처리되므로 쓰이지 않음): 미지원으로 보고 아래에서 FC16/FC06 + FC03 으로
+                result.fc23 = False
+
+            if len(values) == 1:
+                rr = run("write_register", start - BASE_ADDR, values[0])
+            else:
+                rr = run("write_registers", start - BASE_ADDR, values)
+            result.responses.append(rr)
+            if _is_error(rr):
+                result.ok = False
+                if result.error is None:
+                    result.error = rr
+                if stop_on_error:
+                    return result
+            else:
+                result.written.append((start, values))
+
+        if self.confirm_range is not None and self.fallback_read and result.confirmed is None:
+            read_start, read_count = self.confirm_range
+            rr = run("read_holding_registers", read_start - BASE_ADDR, read_count)
+            result.responses.append(rr)
+            if not _is_error(rr):
+                result.confirmed = list(rr.registers)
+        return result
@@ -1,14 +1,20 @@
+import ipaddress
 import json
 import os
 import time
 import shutil
 import threading
-import queue
 import socket
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional
 from tkinter import (
     Frame,
     Canvas,
     StringVar,
+    BooleanVar,
+    Checkbutton,
+    Radiobutton,
     Entry,
     Button,
     Tk,
@@ -19,15 +25,66 @@ from tkinter import (
 )
 from tkinter import ttk
 
-from pymodbus.client import ModbusTcpClient
 from pymodbus.exceptions import ConnectionException, ModbusIOException
-from pymodbus.pdu import ExceptionResponse
+from pymodbus.pdu import ExceptionResponse, ModbusExceptions
 from rich.console import Console
 from PIL import Image, ImageTk
 
 from common import SEGMENTS, BIT_TO_SEGMENT, create_segment_display, create_gradient_bar
+from bulk_commands import (
+    BULK_CONCURRENCY,
+    BULK_RETRIES,
+    BULK_TIMEOUT,
+    STATUS_FAILED,
+    STATUS_OK,
+    STATUS_REBOOTING,
+    STATUS_SKIPPED,
+    BulkResult,
+    run_bulk,
+)
+from device_events import (
+    AlarmChanged,
+    DeviceEventBus,
+    DeviceSnapshot,
+    ErrorChanged,
+    FwProgressChanged,
+    SensorModelChanged,
+    SnapshotTracker,
+    ValueChanged,
+    VersionChanged,
+)
+from device_health import CLOSED, HALF_OPEN, OPEN, DeviceHealth
+from device_table import CONN_LOST, CONN_OFFLINE, CONN_STALE, DeviceStateTable
 from virtual_keyboard import VirtualKeyboard
 from log_viewer import LogViewer
+from capability_cache import CapabilityCache
+from command_queue import PRIORITY_COMMAND, PRIORITY_READ, DeviceCommandQueue
+from modbus_address import BoxAddress, parse_box_address
+from modbus_async import AsyncModbusEngine
+from modbus_capture import RECORDER
+from modbus_discovery import DEFAULT_CONCURRENCY, discover
+from modbus_endpoint import EndpointPool
+from modbus_liveness import STALE_AFTER
+from modbus_transaction import WriteTransaction
+from modbus_server import RegisterMirror
+from register_cache import RegisterCache, RegisterReadError
+from poll_record import CAP_FW_STATUS, CAP_SENSOR_MODEL, POLL_RECORDER
+from poll_scheduler import AdaptivePollScheduler, DeadlineScheduler
+from reconnect_supervisor import ReconnectSupervisor
+from register_schema import (
+    BASE_ADDR,
+    GROUP_TFTP_IP,
+    REG_FW_CTRL,
+    REG_MODEL_SELECT,
+    REG_RESET,
+    REG_ZERO,
+    ReadPlan,
+    ReadRequest,
+    decode_ip,
+    regs_to_ascii,
+    schema_for_capabilities,
+)
+from ui_mailbox import UiMailbox
 
 
 def get_local_ip() -> str:
@@ -72,6 +129,9 @@ def encode_ip_to_words(ip: str):
 
 class ModbusUI:
     SETTINGS_FILE = "modbus_settings.json"
+    CAPABILITY_CACHE_FILE = "modbus_capabilities.json"
+    RTU_REPORT_INTERVAL_MS = 60000
+    HEALTH_EXPORT_INTERVAL_MS = 60000
     GAS_FULL_SCALE = {"ORG": 9999, "ARF-T": 5000, "HMDS": 3000, "HC-100": 5000}
     GAS_TYPE_POSITIONS = {
         "ORG": (sx(115), sy(100)),
@@ -88,16 +148,29 @@ class ModbusUI:
     }
 
     LOG_MAX_ENTRIES = 1000
-    MODEL_SELECT_REG = 40094
-    SENSOR_MODEL_REG = 40030
-    SENSOR_MODEL_REG_COUNT = 4
-    SENSOR_MODEL_POLL_SEC = 2.0
+    MODEL_SELECT_REG = REG_MODEL_SELECT
+
+    # 일괄 명령: key → (표시 이름, 레지스터, 명령 후 재부팅 여부)
+    BULK_ACTIONS = {
+        "zero": ("ZERO", REG_ZERO, False),
+        "reset": ("RST", REG_RESET, True),
+        "model": ("모델 변경", REG_MODEL_SELECT, True),
+        "tftp_ip": ("TFTP IP", GROUP_TFTP_IP.start, False),
+    }
+    BULK_STATUS_TEXT = {
+        STATUS_OK: "성공",
+        STATUS_REBOOTING: "성공(재부팅)",
+        STATUS_FAILED: "실패",
+        STATUS_SKIPPED: "건너뜀",
+    }
 
     @staticmethod
     def reg_addr(addr_4xxxx: int) -> int:
         return addr_4xxxx - 40001
 
-    def __init__(self, parent, num_boxes, gas_types, alarm_callback):
+    def __init__(self, parent, num_boxes, gas_types, alarm_callback, use_async_engine=False, poll_budget_rps=None,
+                 pipeline_depth=None, stale_after=None, health_export=None, bulk_concurrency=None, bulk_timeout=None,
+                 bulk_retries=None):
         self.parent = parent
         self.alarm_callback = alarm_callback
         self.virtual_keyboard = VirtualKeyboard(parent)
@@ -111,9 +184,12 @@ class ModbusUI:
         self.clients = {}
         self.connected_clients = {}
         self.stop_flags = {}
-        self.modbus_locks = {}
-        self.data_queue = queue.Queue()
-        self.ui_update_queue = queue.Queue()
+        self.command_queues = {}
+        self.ui_mailbox = UiMailbox()
+        self.device_events = DeviceEventBus()
+        self.snapshots = SnapshotTracker(num_boxes)
+        self.device_events.subscribe(self.on_device_event)
+        self.device_events.subscribe(self.log_device_event, (ValueChanged, AlarmChanged, ErrorChanged))
         self.console = Console()
         self.box_states = []
         self.box_frames = []
@@ -121,23 +197,35 @@ class ModbusUI:
         self.gradient_bar = create_gradient_bar(sx(120), sy(5))
         self.gas_types = gas_types
 
-        self.disconnection_counts = [0] * num_boxes
+        # 박스별 최신 상태 + 알람/끊김 횟수/장비 능력 (device_table.py)
+        self.device_table = DeviceStateTable(num_boxes)
+        # 집계 서버(modbus_server.py)가 SCADA 에 그대로 내주는 마지막 응답 레지스터
+        self.register_mirror = RegisterMirror(num_boxes)
+        # 설정 창/FW 업그레이드의 수시 읽기용 (폴링이 채우고, TTL 안이면 장비에 묻지 않는다)
+        self.register_cache = RegisterCache(num_boxes)
         self.disconnection_labels = [None] * num_boxes
         self.auto_reconnect_failed = [False] * num_boxes
         self.reconnect_attempt_labels = [None] * num_boxes
 
-        self.last_fw_status = [None] * num_boxes
         self.settings_popups = [None] * num_boxes
 
         self.box_logs = [[] for _ in range(num_boxes)]
         self.last_viewed_log_len = [0] * num_boxes
         self.log_viewers = [None] * num_boxes
 
-        self.tftp_supported = [True] * num_boxes
-        self.fw_status_supported = [True] * num_boxes
-        self.sensor_model_supported = [False] * num_boxes
+        # FC23(read/write multiple) 지원: None = 아직 모름 (첫 확인 쓰기에서 시험)
+        self.fc23_supported = [None] * num_boxes
+        self.read_plans = [None] * num_boxes
+        self.capability_cache = CapabilityCache(self.CAPABILITY_CACHE_FILE)
+        # 캐시/기본값으로 시작한 박스는 첫 정상 폴링 후 verify_capabilities() 로 확인
+        self.caps_pending_verify = [None] * num_boxes
 
-        self._cmd_lock_timeout_sec = 1.0
+        self._cmd_timeout_sec = 10.0
+        # 일괄 명령: 동시에 기다리는 박스 수, 박스별 응답 대기(초), 실패 시 재시도 횟수
+        self.bulk_concurrency = bulk_concurrency or BULK_CONCURRENCY
+        self.bulk_timeout = bulk_timeout or BULK_TIMEOUT
+        self.bulk_retries = BULK_RETRIES if bulk_retries is None else bulk_retries
+        self.bulk_window = None
 
         self.load_ip_settings(num_boxes)
 
@@ -153,8 +241,45 @@ class ModbusUI:
         self.communication_interval = 0.2
         self.blink_interval = int(self.communication_interval * 1000)
         self.alarm_blink_interval = 1000
-        self.start_data_processing_thread()
+
+        # 보낸 폴링의 응답을 이 시간(초) 넘게 못 받으면 연결이 끊기기 전이라도 "통신 이상" 표시.
+        # 폴링 주기와는 무관하다 (보낸 요청 기준, 쉬는 동안 죽은 연결은 TCP keepalive 가 잡는다).
+        self.stale_after = stale_after or STALE_AFTER
+
+        # 경보/상승/FW 중인 박스는 빠르게, 안정된 박스는 느리게. 패널 전체 초당 요청 수 상한(poll_budget_rps)
+        self.poll_scheduler = AdaptivePollScheduler(
+            base_interval=self.communication_interval,
+            fast_interval=0.1,
+            max_interval=2.0,
+            budget_rps=poll_budget_rps,
+        )
+        # 그 주기를 절대 시각에 맞춰 지킨다 (RTT 만큼 밀리지 않고, 박스마다 주기 안의 위치를 나눠 가짐)
+        self.poll_deadlines = DeadlineScheduler()
+
+        self.reconnect_supervisor = ReconnectSupervisor()
+        # 끊김이 잦거나 응답이 나쁜 박스는 느린 점검 주기로 (폴링 슬롯/락/화면 갱신 절약)
+        self.device_health = DeviceHealth()
+        self.health_export = health_export
+        # pipeline_depth ≥ 2: 고지연 링크용 파이프라인 TCP (스레드 경로)
+        self.endpoint_pool = EndpointPool(timeout=3, pipeline_depth=pipeline_depth or 0)
+        self._rtu_report_scheduled = False
+
+        # 자동 연결 시 "부팅 → 전체 값 표시" 시간 측정
+        self._boot_lock = threading.Lock()
+        self.boot_started = None
+        self.boot_pending = None
+        self.boot_unreachable = set()
+        self.boot_timing = {}
+        # save_ip_settings: auto_connect_all 의 연결 스레드들이 동시에 저장한다
+        self._settings_lock = threading.Lock()
+
+        self.async_engine = None
+        if use_async_engine:
+            self.async_engine = AsyncModbusEngine(self)
+            self.async_engine.start()
         self.schedule_ui_update()
+        if self.health_export:
+            self.parent.after(self.HEALTH_EXPORT_INTERVAL_MS, self.export_health_periodically)
 
     def _ui_call(self, fn, *args, **kwargs):
         try:
@@ -174,15 +299,66 @@ class ModbusUI:
     def _run_bg(self, target, *args):
         threading.Thread(target=target, args=args, daemon=True).start()
 
-    def _try_acquire_lock(self, lock: threading.Lock, title_if_busy: str, msg_if_busy: str) -> bool:
+    def _run_command(self, ip: str, method: str, *args, priority=PRIORITY_COMMAND, timeout=None, **kwargs):
+        # 폴링 루프가 다음 요청 전에 실행하고 결과를 돌려준다 (락 경쟁 없음)
+        commands = self.command_queues.get(ip)
+        if commands is None:
+            raise ConnectionException("Socket is closed")
+        fut = commands.submit(method, *args, priority=priority, **kwargs)
         try:
-            acquired = lock.acquire(timeout=self._cmd_lock_timeout_sec)
+            return fut.result(timeout=timeout or self._cmd_timeout_sec)
+        except FutureTimeoutError:
+            if fut.cancel():
+                raise TimeoutError("장비 명령 대기 시간 초과 (재연결 중일 수 있습니다)")
+            return fut.result()
+
+    def read_registers_cached(self, box_index: int, start: int, count: int, priority=PRIORITY_READ) -> list:
+        """
+        수시 읽기: TTL 안의 캐시 값이 있으면 바로 돌려주고, 없으면 명령 큐로 읽어 캐시에 채운다.
+        같은 구간을 이미 읽는 중이면 요청을 더 보내지 않고 그 결과를 기다린다.
+        오류 응답은 RegisterReadError, 무응답/연결 문제는 명령 큐의 예외 그대로.
+        """
+        ip = (self.ip_vars[box_index].get() or "").strip()
+
+        def _fetch():
+            rr = self._run_command(ip, "read_holding_registers", self.reg_addr(start), count, priority=priority)
+            if isinstance(rr, ExceptionResponse) or rr.isError():
+                raise RegisterReadError(rr)
+            return rr.registers
+
+        return self.register_cache.read(box_index, start, count, _fetch)
+
+    def run_write_transaction(self, box_index: int, tx, timeout=None, stop_on_error=True):
+        """
+        WriteTransaction 을 명령 큐로 보낸다. 빈 곳 채우기에는 캐시의 현재 값을 쓰고,
+        쓴 값/확인 값은 캐시에 반영한다. FC23 지원 여부를 새로 알게 되면 능력 캐시에 기록한다.
+        """
+        ip = (self.ip_vars[box_index].get() or "").strip()
+        span = tx.span()
+        known = self.register_cache.known(box_index, *span) if span is not None else None
+        try:
+            result = tx.execute(
+                lambda method, *args: self._run_command(ip, method, *args, timeout=timeout),
+                self.fc23_supported[box_index],
+                known,
+                stop_on_error,
+            )
         except Exception:
-            acquired = False
-        if not acquired:
-            self._show_warn(title_if_busy, msg_if_busy)
-            return False
-        return True
+            # 무응답: 어디까지 쓰였는지 모르므로 쓰기 구간의 캐시를 버린다 (FC23 지원 여부도 그대로)
+            if span is not None:
+                self.register_cache.invalidate(box_index, span[0], span[1] - span[0])
+            raise
+        if result.fc23 is not None and result.fc23 != self.fc23_supported[box_index]:
+            self.fc23_supported[box_index] = result.fc23
+            self.capability_cache.set(ip, "fc23", result.fc23)
+            self.console.print(
+                f"[TX] box {box_index} ({ip}) : FC23 {'지원' if result.fc23 else '미지원 → FC16 + FC03 으로 확인'}"
+            )
+        for start, values in result.written:
+            self.register_cache.update(box_index, start, values)
+        if result.confirmed is not None:
+            self.register_cache.update(box_index, tx.confirm_range[0], result.confirmed)
+        return result
 
     def _cancel_after(self, box_index: int, key: str):
         st = self.box_states[box_index]
@@ -220,6 +396,24 @@ class ModbusUI:
         box_canvas.coords(bg_id, x1 - pad_x, y1 - pad_y, x2 + pad_x, y2 + pad_y)
         box_canvas.itemconfig(bg_id, state="normal")
 
+    def submit_proxy_request(self, box_index: int, request):
+        """외부 도구 요청(modbus_proxy) → 그 박스의 명령 큐. 폴링 사이에 같은 연결로 실행되고 Future 를 돌려준다."""
+        ip = (self.ip_vars[box_index].get() or "").strip()
+        commands = self.command_queues.get(ip)
+        if commands is None:
+            raise ConnectionException("Socket is closed")
+        if request.function_code not in (3, 4):
+            # 도구가 쓴 값은 캐시에 반영되지 않으므로 다음 수시 읽기는 장비에서
+            self.register_cache.invalidate(box_index)
+        if request.function_code in (6, 16, 22, 23):
+            start = BASE_ADDR + getattr(request, "write_address", getattr(request, "address", 0))
+            count = getattr(request, "write_count", None) or getattr(request, "count", None) or 1
+            if start <= self.MODEL_SELECT_REG < start + count:
+                # 모델이 바뀌면 레지스터 맵도 바뀌므로 다음 연결 때 다시 확인 (UI 의 모델 변경과 같게)
+                self.console.print(f"[PROXY] box {box_index} ({ip}) : 모델 변경 쓰기 → 능력 재확인")
+                self.capability_cache.forget(ip)
+        return commands.submit("execute", request, priority=PRIORITY_READ)
+
     def start_firmware_upgrade_all(self, only_connected=True, delay_sec=0.5):
         targets = []
         for i in range(len(self.ip_vars)):
@@ -228,7 +422,7 @@ class ModbusUI:
                 continue
             if only_connected and (ip not in self.connected_clients):
                 continue
-            if not self.tftp_supported[i]:
+            if not self.device_table.tftp_supported[i]:
                 continue
             if self.box_states[i].get("fw_cmd_inflight") or self.box_states[i].get("fw_upgrading"):
                 continue
@@ -257,6 +451,266 @@ class ModbusUI:
                 pass
             time.sleep(delay_sec)
 
+    def bulk_targets(self, action: str, boxes):
+        """일괄 명령 대상 → ([(box_index, ip)], 건너뛴 박스의 BulkResult 목록)."""
+        jobs, skipped = [], []
+        for i in boxes:
+            ip = (self.ip_vars[i].get() or "").strip()
+            reason = None
+            if ip not in self.command_queues:
+                reason = "연결 안 됨"
+            elif action != "model" and not self.device_table.tftp_supported[i]:
+                reason = "미지원 장비"
+            elif self.box_states[i].get("fw_upgrading") or self.box_states[i].get("fw_cmd_inflight"):
+                reason = "FW 업그레이드 중"
+            if reason is None:
+                jobs.append((i, ip))
+            else:
+                skipped.append(BulkResult(i, ip, STATUS_SKIPPED, message=reason))
+        return jobs, skipped
+
+    def bulk_command(self, action: str, boxes, arg=None, on_result=None, on_done=None):
+        """
+        선택한 박스들에 ZERO/RST/모델 변경/TFTP IP 쓰기를 동시에 보낸다 (백그라운드).
+        on_result(BulkResult) 는 박스마다, on_done(결과 목록) 은 끝난 뒤 작업 스레드에서 호출된다.
+        """
+        label, reg, reboots = self.BULK_ACTIONS[action]
+        addr = self.reg_addr(reg)
+        if action == "tftp_ip":
+            method, value = "write_registers", list(encode_ip_to_words(arg))
+        elif action == "model":
+            method, value = "write_register", int(arg)
+            label = f"{label} ({self.MODEL_VALUE_TO_NAME.get(value, value)})"
+        else:
+            method, value = "write_register", 1
+
+        jobs, skipped = self.bulk_targets(action, boxes)
+        if on_result is not None:
+            for result in skipped:
+                on_result(result)
+
+        def _send(box_index, ip):
+            if action == "model":
+                # 모델이 바뀌면 레지스터 맵도 바뀌므로 다음 연결 때 다시 확인
+                self.capability_cache.forget(ip)
+            if action == "tftp_ip":
+                # 쓰고 같은 왕복(FC23)에서 읽어 확인 (미지원 장비는 쓰기만)
+                tx = WriteTransaction().write(reg, value).confirm(reg, len(value), fallback_read=False)
+                result = self.run_write_transaction(box_index, tx, timeout=self.bulk_timeout)
+                response = result.last
+                if result.ok and result.confirmed is not None and result.confirmed != value:
+                    raise ModbusIOException(f"TFTP IP 확인 불일치: {decode_ip(*result.confirmed)}")
+                if result.ok:
+                    self._ui_call(self.tftp_ip_vars[box_index].set, arg)
+                return response
+            return self._run_command(ip, method, addr, value, timeout=self.bulk_timeout)
+
+        def _worker():
+            started = time.monotonic()
+            self.console.print(f"[BULK] {label} → {len(jobs)}대 전송 (동시 {self.bulk_concurrency}, 건너뜀 {len(skipped)})")
+            results = run_bulk(
+                jobs,
+                _send,
+                concurrency=self.bulk_concurrency,
+                retries=self.bulk_retries,
+                reboots=reboots,
+                on_result=on_result,
+            )
+            for r in results:
+                if not r.ok:
+                    self.console.print(f"[BULK] box {r.box_index} ({r.ip}) {label} 실패 (시도 {r.attempts}회): {r.message}")
+            ok = sum(1 for r in results if r.ok)
+            self.console.print(f"[BULK] {label} 완료: {ok}/{len(results)} 성공, {time.monotonic() - started:.1f}s")
+            if on_done is not None:
+                on_done(sorted(results + skipped))
+
+        self._run_bg(_worker)
+
+    def open_bulk_commands(self):
+        """선택한 박스들에 한 번에 명령을 보내고 결과를 표 하나로 보여주는 창."""
+        existing = self.bulk_window
+        if existing is not None and existing.winfo_exists():
+            existing.lift()
+            existing.focus_set()
+            return
+
+        win = Toplevel(self.parent)
+        win.title("일괄 명령")
+        win.configure(bg="#1e1e1e")
+        self.bulk_window = win
+
+        def on_close():
+            self.bulk_window = None
+            win.destroy()
+
+        win.protocol("WM_DELETE_WINDOW", on_close)
+
+        # --- 대상 박스 ---
+        box_frame = Frame(win, bg="#1e1e1e")
+        box_frame.pack(padx=10, pady=(10, 5), anchor="w")
+        selected = []
+        for i in range(len(self.ip_vars)):
+            ip = (self.ip_vars[i].get() or "").strip()
+            var = BooleanVar(value=ip in self.connected_clients)
+            selected.append(var)
+            Checkbutton(
+                box_frame,
+                text=f"{i + 1}: {ip or '-'}",
+                variable=var,
+                fg="white",
+                bg="#1e1e1e",
+                selectcolor="#333333",
+                activebackground="#1e1e1e",
+                activeforeground="white",
+            ).grid(row=i // 4, column=i % 4, sticky="w", padx=4)
+
+        def _select_all(value):
+            for var in selected:
+                var.set(value)
+
+        sel_frame = Frame(win, bg="#1e1e1e")
+        sel_frame.pack(padx=10, pady=(0, 5), anchor="w")
+        for col, (text, value) in enumerate((("전체 선택", True), ("선택 해제", False))):
+            Button(
+                sel_frame,
+                text=text,
+                command=lambda v=value: _select_all(v),
+                width=10,
+                bg="#333333",
+                fg="white",
+                relief="raised",
+                bd=1,
+            ).grid(row=0, column=col, padx=(0, 5))
+
+        # --- 명령 ---
+        action_var = StringVar(value="zero")
+        cmd_frame = Frame(win, bg="#1e1e1e")
+        cmd_frame.pack(padx=10, pady=5, anchor="w")
+        choices = (
+            ("ZERO", "zero"),
+            ("RST", "reset"),
+            ("ASGD3200", "model:0"),
+            ("ASGD3210", "model:1"),
+            ("TFTP IP", "tftp_ip"),
+        )
+        for col, (text, value) in enumerate(choices):
+            Radiobutton(
+                cmd_frame,
+                text=text,
+                variable=action_var,
+                value=value,
+                fg="white",
+                bg="#1e1e1e",
+                selectcolor="#333333",
+                activebackground="#1e1e1e",
+                activeforeground="white",
+            ).grid(row=0, column=col, padx=(0, 8))
+
+        tftp_var = StringVar(value=DEFAULT_TFTP_IP)
+        tftp_entry = Entry(cmd_frame, textvariable=tftp_var, width=16)
+        tftp_entry.grid(row=0, column=len(choices), padx=(0, 8))
+        tftp_entry.bind("<Button-1>", lambda event: self.show_virtual_keyboard(tftp_entry))
+
+        # --- 결과 표 ---
+        columns = ("box", "ip", "result", "attempts", "time", "message")
+        headings = ("Box", "IP", "결과", "시도", "시간(s)", "메시지")
+        widths = (50, 150, 90, 50, 70, 320)
+        table = ttk.Treeview(win, columns=columns, show="headings", height=12)
+        for col, text, width in zip(columns, headings, widths):
+            table.heading(col, text=text)
+            table.column(col, width=width, anchor="w")
+        table.pack(padx=10, pady=5, fill="both", expand=True)
+
+        summary_var = StringVar(value="")
+        Label(win, textvariable=summary_var, fg="#ffd966", bg="#1e1e1e", font=("Helvetica", 10, "bold")).pack(
+            padx=10, pady=(0, 5), anchor="w"
+        )
+
+        def _show_result(result):
+            if not win.winfo_exists():
+                return
+            values = (
+                result.box_index + 1,
+                result.ip,
+                self.BULK_STATUS_TEXT.get(result.status, result.status),
+                result.attempts or "",
+                f"{result.elapsed:.2f}" if result.attempts else "",
+                result.message,
+            )
+            row = str(result.box_index)
+            if table.exists(row):
+                table.item(row, values=values)
+            else:
+                table.insert("", "end", iid=row, values=values)
+
+        def _show_done(results, started):
+            if not win.winfo_exists():
+                return
+            ok = sum(1 for r in results if r.ok)
+            failed = sum(1 for r in results if r.status == STATUS_FAILED)
+            skipped = sum(1 for r in results if r.status == STATUS_SKIPPED)
+            summary_var.set(
+                f"완료: 성공 {ok} / 실패 {failed} / 건너뜀 {skipped} ({time.monotonic() - started:.1f}s)"
+            )
+            run_btn.config(state="normal")
+
+        def _run():
+            boxes = [i for i, var in enumerate(selected) if var.get()]
+            if not boxes:
+                messagebox.showinfo("일괄 명령", "대상 박스를 선택해주세요.", parent=win)
+                return
+            action, _, arg = action_var.get().partition(":")
+            if action == "tftp_ip":
+                arg = tftp_var.get().strip()
+                try:
+                    encode_ip_to_words(arg)
+                except ValueError as e:
+                    messagebox.showwarning("일괄 명령", f"TFTP IP 형식 오류.\n{e}", parent=win)
+                    return
+            label = self.BULK_ACTIONS[action][0]
+            if not messagebox.askyesno("일괄 명령", f"{len(boxes)}개 박스에 {label} 명령을 보냅니다.\n진행할까요?", parent=win):
+                return
+
+            table.delete(*table.get_children())
+            for i in boxes:
+                table.insert("", "end", iid=str(i), values=(i + 1, self.ip_vars[i].get(), "대기", "", "", ""))
+            summary_var.set("전송 중…")
+            run_btn.config(state="disabled")
+            started = time.monotonic()
+            self.bulk_command(
+                action,
+                boxes,
+                arg or None,
+                on_result=lambda r: self._ui_call(_show_result, r),
+                on_done=lambda results: self._ui_call(_show_done, results, started),
+            )
+
+        btn_frame = Frame(win, bg="#1e1e1e")
+        btn_frame.pack(pady=(0, 10))
+        run_btn = Button(
+            btn_frame,
+            text="실행",
+            command=_run,
+            width=10,
+            bg="#4444aa",
+            fg="white",
+            relief="raised",
+            bd=1,
+        )
+        run_btn.grid(row=0, column=0, padx=5)
+        Button(
+            btn_frame,
+            text="닫기",
+            command=on_close,
+            width=10,
+            bg="#333333",
+            fg="white",
+            relief="raised",
+            bd=1,
+        ).grid(row=0, column=1, padx=5)
+
+        win.transient(self.parent)
+
     def select_fw_file_all(self):
         file_path = filedialog.askopenfilename(
             title="FW 파일 선택(전체 적용)",
@@ -277,9 +731,12 @@ class ModbusUI:
                     self.ip_vars[i].set(ip_settings[i])
 
     def save_ip_settings(self):
-        ip_settings = [ip_var.get() for ip_var in self.ip_vars]
-        with open(self.SETTINGS_FILE, "w") as file:
-            json.dump(ip_settings, file)
+        with self._settings_lock:
+            ip_settings = [ip_var.get() for ip_var in self.ip_vars]
+            tmp_path = self.SETTINGS_FILE + ".tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(ip_settings, file)
+            os.replace(tmp_path, self.SETTINGS_FILE)
 
     def load_image(self, path, size):
         img = Image.open(path).convert("RGBA")
@@ -288,12 +745,7 @@ class ModbusUI:
 
     def regs_to_ascii(self, regs):
         try:
-            b = bytearray()
-            for w in regs:
-                b.append((w >> 8) & 0xFF)
-                b.append(w & 0xFF)
-            s = b.decode("ascii", errors="ignore")
-            return s.replace("\x00", "").strip()
+            return regs_to_ascii(regs)
         except Exception:
             return ""
 
@@ -319,6 +771,15 @@ class ModbusUI:
 
         box_canvas.itemconfig(tid, text=txt)
 
+    @staticmethod
+    def placeholder_text(index: int) -> str:
+        return f"{index + 1}. IP를 입력해주세요."
+
+    def configured_ip(self, index: int) -> str:
+        """입력칸의 주소. 비어 있거나 안내 문구만 있으면 ""."""
+        ip = self.ip_vars[index].get().strip()
+        return "" if ip == self.placeholder_text(index) else ip
+
     def add_ip_row(self, frame, ip_var, index):
         entry_border = Frame(frame, bg="#4a4a4a", bd=1, relief="solid")
         entry_border.grid(row=0, column=0, padx=(0, 0), pady=5)
@@ -336,7 +797,7 @@ class ModbusUI:
             justify="center",
         )
         entry.pack(padx=2, pady=3)
-        placeholder_text = f"{index + 1}. IP를 입력해주세요."
+        placeholder_text = self.placeholder_text(index)
         if not ip_var.get():
             entry.insert(0, placeholder_text)
             entry.config(fg="#a9a9a9")
@@ -442,8 +903,6 @@ class ModbusUI:
                 "gas_type_var": gas_type_var,
                 "gas_type_text_id": None,
                 "full_scale": self.GAS_FULL_SCALE[gas_key],
-                "alarm1_on": False,
-                "alarm2_on": False,
                 "alarm1_blinking": False,
                 "alarm2_blinking": False,
                 "alarm_border_blink": False,
@@ -453,14 +912,12 @@ class ModbusUI:
                 "fw_upgrading": False,
                 "alarm_blink_running": False,
                 "segment_click_area": (seg_x1, seg_y1, seg_x2, seg_y2),
-                "last_log_value": None,
-                "last_log_alarm1": None,
-                "last_log_alarm2": None,
-                "last_log_error_reg": None,
+                "last_log_key": None,
+                "health_shown": None,
+                "breaker_shown": CLOSED,
                 "version_text_id": None,
                 "last_version_value": None,
                 "last_sensor_model_str": "",
-                "last_sensor_model_poll": 0.0,
                 "alarm_mode": "none",
                 "error_blink_running": False,
                 "error_blink_state": False,
@@ -490,7 +947,7 @@ class ModbusUI:
 
         disconnection_label = Label(
             control_frame,
-            text=f"DC: {self.disconnection_counts[index]}",
+            text=f"DC: {self.device_table.disconnects[index]}",
             fg="white",
             bg="black",
             font=("Helvetica", int(10 * SCALE_FACTOR)),
@@ -708,6 +1165,26 @@ class ModbusUI:
         self.box_states[box_index]["fw_file_name_var"].set(basename)
         self.console.print(f"[FW] box {box_index} using file: {file_path}")
 
+    def save_traffic_capture(self, box_index=None):
+        """최근 Modbus TCP 송수신 기록(링 버퍼)을 pcap 으로 저장. box_index 가 없으면 전체."""
+        name = "modbus_all.pcap" if box_index is None else f"modbus_box{box_index + 1}.pcap"
+        path = filedialog.asksaveasfilename(
+            title="통신 기록 저장",
+            initialfile=time.strftime("%Y%m%d_%H%M%S_") + name,
+            defaultextension=".pcap",
+            filetypes=[("pcap", "*.pcap"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            count = RECORDER.dump_pcap(path, box_index=box_index)
+        except Exception as e:
+            self.console.print(f"[CAPTURE] 저장 실패: {e}")
+            messagebox.showerror("통신 기록", f"저장에 실패했습니다.\n{e}")
+            return
+        self.console.print(f"[CAPTURE] {count} 프레임 → {path}")
+        messagebox.showinfo("통신 기록", f"{count}개 프레임을 저장했습니다.\n{path}")
+
     def update_full_scale(self, gas_type_var, box_index):
         gas_type = gas_type_var.get()
         full_scale = self.GAS_FULL_SCALE[gas_type]
@@ -782,41 +1259,220 @@ class ModbusUI:
         else:
             threading.Thread(target=self.connect, args=(i,), daemon=True).start()
 
-    def connect(self, i):
+    def auto_connect_all(self, probe_timeout: float = 1.0):
+        """
+        저장된 IP 를 모두 동시에 연결한다. 응답하는 장비부터 바로 표시되고,
+        응답 없는 장비는 백그라운드 재연결(ReconnectSupervisor)로 넘긴다.
+        """
+        boxes = [
+            i for i in range(len(self.ip_vars))
+            if self.configured_ip(i) and self.configured_ip(i) not in self.connected_clients
+        ]
+        if not boxes:
+            return
+        with self._boot_lock:
+            self.boot_started = time.monotonic()
+            self.boot_pending = set(boxes)
+            self.boot_unreachable = set()
+            self.boot_timing = {}
+        self.console.print(f"[AUTO] {len(boxes)}대 자동 연결 시작")
+        for i in boxes:
+            threading.Thread(
+                target=self.connect,
+                args=(i,),
+                kwargs={"probe_timeout": probe_timeout, "background_on_fail": True},
+                daemon=True,
+            ).start()
+
+    def discovery_subnets(self):
+        """검색 대상 기본값: 이미 입력된 박스 IP 들과 패널 자신의 /24."""
+        subnets = []
+        hosts = [get_local_ip()]
+        for i in range(len(self.ip_vars)):
+            try:
+                addr = parse_box_address(self.configured_ip(i))
+            except ValueError:
+                continue
+            if not addr.is_serial:
+                hosts.append(addr.host)
+        for host in hosts:
+            try:
+                net = str(ipaddress.ip_network(f"{host}/24", strict=False))
+            except ValueError:
+                continue
+            if net not in subnets and not net.startswith("127."):
+                subnets.append(net)
+        return subnets
+
+    def discover_and_fill(self, subnets=None, concurrency=DEFAULT_CONCURRENCY, connect=True, on_done=None):
+        """
+        서브넷을 검색해 찾은 검지기를 빈 박스에 차례로 넣는다 (이미 입력된 IP 는 검색하지 않음).
+        검색은 작업 스레드, 박스 채우기는 UI 스레드. on_done(found, filled) 도 UI 스레드에서 호출.
+        """
+        subnets = list(subnets or self.discovery_subnets())
+        configured = set()
+        for i in range(len(self.ip_vars)):
+            try:
+                configured.add(parse_box_address(self.configured_ip(i)).host)
+            except ValueError:
+                pass
+
+        def _worker():
+            t0 = time.monotonic()
+            try:
+                found = discover(subnets, concurrency=concurrency, exclude=configured)
+            except Exception as e:
+                self.console.print(f"[DISCOVER] 검색 실패 {subnets}: {e}")
+                found = []
+            self.console.print(f"[DISCOVER] {', '.join(subnets)}: {len(found)}대 발견 ({time.monotonic() - t0:.1f}s)")
+            self.parent.after(0, lambda: self._fill_discovered(found, connect, on_done))
+
+        threading.Thread(target=_worker, daemon=True).start()
+
+    def _fill_discovered(self, found, connect, on_done):
+        empty = [i for i in range(len(self.ip_vars)) if not self.configured_ip(i)]
+        filled = []
+        for i, device in zip(empty, found):
+            ip = str(BoxAddress(device.host, device.port))
+            # 검색 때 확인한 능력을 캐시에 넣어 연결 즉시 폴링
+            self.capability_cache.put(ip, device.capabilities())
+            self.ip_vars[i].set(ip)
+            self.entries[i].config(fg="white")
+            filled.append(i)
+            version = "-" if device.version is None else self.format_version(device.version)
+            self.console.print(f"[DISCOVER] box {i} ← {ip} ({device.model}, {version}, {device.sensor_model_name or '-'})")
+        for device in found[len(filled):]:
+            self.console.print(f"[DISCOVER] 빈 박스 없음: {device.host} ({device.model})")
+        if filled:
+            self.save_ip_settings()
+            if connect:
+                for i in filled:
+                    threading.Thread(target=self.connect, args=(i,), daemon=True).start()
+        if on_done is not None:
+            on_done(found, filled)
+
+    def schedule_rtu_report(self):
+        if self._rtu_report_scheduled:
+            return
+        self._rtu_report_scheduled = True
+        self.parent.after(self.RTU_REPORT_INTERVAL_MS, self.report_rtu_buses)
+
+    def report_rtu_buses(self):
+        """RS-485 버스별 처리량/지연을 주기적으로 콘솔에 출력."""
+        buses = self.endpoint_pool.serial_buses()
+        for bus in buses:
+            self.console.print(f"[RTU] {bus.stats.report()}")
+        if buses:
+            self.parent.after(self.RTU_REPORT_INTERVAL_MS, self.report_rtu_buses)
+        else:
+            self._rtu_report_scheduled = False
+
+    def probe_tcp(self, host: str, port: int, timeout: float) -> bool:
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+
+    def note_first_value(self, box_index: int):
+        if self.boot_pending is None:
+            return
+        with self._boot_lock:
+            if self.boot_pending is None or box_index not in self.boot_pending:
+                return
+            self.boot_pending.discard(box_index)
+            self._check_boot_progress()
+
+    def note_boot_unreachable(self, box_index: int):
+        with self._boot_lock:
+            if self.boot_pending is None:
+                return
+            self.boot_unreachable.add(box_index)
+            self._check_boot_progress()
+
+    def _check_boot_progress(self):
+        # _boot_lock 을 잡은 상태에서 호출
+        elapsed = time.monotonic() - self.boot_started
+        if "reachable" not in self.boot_timing and not (self.boot_pending - self.boot_unreachable):
+            self.boot_timing["reachable"] = elapsed
+            self.console.print(
+                f"[AUTO] 연결된 장비 값 표시 완료: {elapsed:.2f}s "
+                f"(백그라운드 재시도 {len(self.boot_pending)}대)"
+            )
+        if not self.boot_pending:
+            self.boot_timing["all"] = elapsed
+            self.boot_pending = None
+            self.console.print(f"[AUTO] 부팅 → 전체 값 표시: {elapsed:.2f}s")
+
+    def connect(self, i, probe_timeout=None, background_on_fail=False):
         ip = self.ip_vars[i].get()
         if self.auto_reconnect_failed[i]:
-            self.disconnection_counts[i] = 0
-            self.disconnection_labels[i].config(text="DC: 0")
+            self.device_table.reset_disconnects(i)
+            self.disconnection_labels[i].config(text=self.health_text(i))
             self.auto_reconnect_failed[i] = False
 
         if ip and ip not in self.connected_clients:
-            client = ModbusTcpClient(ip, port=502, timeout=3)
-            if self.connect_to_server(ip, client):
-                self.tftp_supported[i] = True
-                self.fw_status_supported[i] = True
-                self.last_fw_status[i] = None
+            try:
+                addr = parse_box_address(ip)
+            except ValueError as e:
+                self.console.print(f"[CONNECT] box {i} : 주소 형식 오류 '{ip}' ({e}) → ip[:port][/unit]")
+                return
+            if str(addr) != ip:
+                ip = str(addr)
+                self.ip_vars[i].set(ip)
+                if ip in self.connected_clients:
+                    return
+
+            # RTU(시리얼) 박스는 비동기 엔진을 켜도 스레드 경로로 폴링한다
+            engine = self.async_engine if not addr.is_serial else None
+            if not addr.is_serial:
+                # 통신 기록기에 이 (ip, port, unit) 의 프레임을 이 박스로 남기게 한다
+                RECORDER.bind(addr.host, addr.port, addr.unit, i)
+            client = None
+            if engine is None:
+                # 같은 (ip, port) 의 다른 유닛과 소켓 공유 / 같은 시리얼 포트의 유닛들과 버스 공유
+                client = self.endpoint_pool.unit_client(addr.host, addr.port, addr.unit)
+                if addr.is_serial:
+                    self.schedule_rtu_report()
+
+            # 자동 연결: 짧은 TCP 확인으로 응답 없는 장비는 5×2초 재시도 없이 바로 백그라운드로
+            reachable = (
+                probe_timeout is None
+                or (client is not None and client.is_socket_open())
+                or (os.path.exists(addr.host) if addr.is_serial else self.probe_tcp(addr.host, addr.port, probe_timeout))
+            )
+            connected = False
+            if reachable:
+                if engine is not None:
+                    connected = engine.connect_device(i, addr.host, addr.port, addr.unit).result()
+                else:
+                    connected = self.connect_to_server(ip, client)
+            if connected or background_on_fail:
+                self.reset_events(i)
                 self.box_states[i]["fw_upgrading"] = False
-                self.sensor_model_supported[i] = False
-                self.box_states[i]["last_sensor_model_str"] = ""
-                self.box_states[i]["last_sensor_model_poll"] = 0.0
-                self.update_topright_label(i)
+                self.load_device_capabilities(ip, i)
 
-                try:
-                    self.detect_device_capabilities(ip, i)
-                except Exception as e:
-                    self.console.print(f"[FW] box {i} ({ip}) capability probe failed (ignore): {e}")
-
-                stop_flag = threading.Event()
-                self.stop_flags[ip] = stop_flag
-                self.clients[ip] = client
-                self.modbus_locks[ip] = threading.Lock()
-                t = threading.Thread(
-                    target=self.read_modbus_data,
-                    args=(ip, client, stop_flag, i),
-                    daemon=True,
-                )
-                self.connected_clients[ip] = t
-                t.start()
+                if not connected:
+                    self.console.print(f"[AUTO] box {i} ({ip}) 응답 없음 → 백그라운드 재연결")
+                    self.note_boot_unreachable(i)
+                    if engine is not None:
+                        engine.add_device(i, addr.host, addr.port, addr.unit).result()
+
+                if engine is not None:
+                    self.command_queues[ip] = engine.command_queue(i)
+                    self.connected_clients[ip] = engine.start_polling(i)
+                else:
+                    self.command_queues[ip] = DeviceCommandQueue()
+                    stop_flag = threading.Event()
+                    self.stop_flags[ip] = stop_flag
+                    self.clients[ip] = client
+                    t = threading.Thread(
+                        target=self.read_modbus_data_pipelined if client.pipelined else self.read_modbus_data,
+                        args=(ip, client, stop_flag, i),
+                        daemon=True,
+                    )
+                    self.connected_clients[ip] = t
+                    t.start()
 
                 box_canvas = self.box_data[i][0]
                 gms1000_id = self.box_states[i]["gms1000_text_id"]
@@ -835,13 +1491,16 @@ class ModbusUI:
                 )
                 self.parent.after(0, lambda idx=i: self.entries[idx].config(state="disabled"))
 
-                self.update_circle_state([False, False, True, False], box_index=i)
-                self.show_bar(i, show=True)
+                if connected:
+                    self.update_circle_state([False, False, True, False], box_index=i)
+                    self.show_bar(i, show=True)
+                    self.blink_pwr(i)
                 self.virtual_keyboard.hide()
-                self.blink_pwr(i)
                 self.save_ip_settings()
                 self.entries[i].event_generate("<FocusOut>")
             else:
+                if client is not None:
+                    client.close()
                 self.console.print(f"Failed to connect to {ip}")
                 self.parent.after(0, lambda idx=i: self.update_circle_state([False, False, False, False], box_index=idx))
 
@@ -855,25 +1514,39 @@ class ModbusUI:
             ).start()
 
     def disconnect_client(self, ip, i, manual=False):
-        stop_flag = self.stop_flags.get(ip)
-        if stop_flag is not None:
-            stop_flag.set()
-
-        t = self.connected_clients.get(ip)
-        current = threading.current_thread()
-        if t is not None and t is not current:
-            t.join(timeout=5)
-        client = self.clients.get(ip)
-        if client is not None:
-            client.close()
+        if self.async_engine is not None and ip not in self.stop_flags:
+            try:
+                self.async_engine.remove_device(i).result(timeout=5)
+            except Exception as e:
+                self.console.print(f"[ASYNC] box {i} ({ip}) remove failed (ignore): {e}")
+        else:
+            stop_flag = self.stop_flags.get(ip)
+            if stop_flag is not None:
+                stop_flag.set()
+
+            t = self.connected_clients.get(ip)
+            current = threading.current_thread()
+            if t is not None and t is not current:
+                t.join(timeout=5)
+            client = self.clients.get(ip)
+            if client is not None:
+                client.close()
 
         self.cleanup_client(ip)
+        self.device_table.clear(i, CONN_OFFLINE)
+        self.poll_scheduler.forget(i)
+        self.poll_deadlines.forget(i)
+        self.register_cache.invalidate(i)
+        self.reconnect_supervisor.cancel(i)
+        self.device_health.forget(i)
+        self.box_states[i]["health_shown"] = None
+        self.box_states[i]["breaker_shown"] = CLOSED
         self.parent.after(0, lambda idx=i, m=manual: self._after_disconnect(idx, m))
         self.save_ip_settings()
 
     def _after_disconnect(self, i, manual):
         self.box_states[i]["fw_upgrading"] = False
-        self.last_fw_status[i] = None
+        self.reset_events(i)
         self.reset_ui_elements(i)
         self.action_buttons[i].config(image=self.connect_image, relief="flat", borderwidth=0)
         self.entries[i].config(state="normal")
@@ -892,8 +1565,6 @@ class ModbusUI:
 
         state = self.box_states[box_index]
 
-        state["alarm1_on"] = False
-        state["alarm2_on"] = False
         state["alarm1_blinking"] = False
         state["alarm2_blinking"] = False
         state["alarm_border_blink"] = False
@@ -919,7 +1590,6 @@ class ModbusUI:
 
         state["last_version_value"] = None
         state["last_sensor_model_str"] = ""
-        state["last_sensor_model_poll"] = 0.0
         self.update_topright_label(box_index)
 
         box_canvas, circle_items, *_ = self.box_data[box_index]
@@ -932,7 +1602,9 @@ class ModbusUI:
         self.connected_clients.pop(ip, None)
         self.clients.pop(ip, None)
         self.stop_flags.pop(ip, None)
-        self.modbus_locks.pop(ip, None)
+        commands = self.command_queues.pop(ip, None)
+        if commands is not None:
+            commands.close()
 
     def connect_to_server(self, ip, client):
         retries = 5
@@ -942,177 +1614,363 @@ class ModbusUI:
             time.sleep(2)
         return False
 
-    def detect_device_capabilities(self, ip: str, box_index: int):
-        tmp_client = ModbusTcpClient(ip, port=502, timeout=2)
+    def load_device_capabilities(self, ip: str, box_index: int):
+        """
+        별도 probe 없이 캐시된 능력으로 바로 폴링을 시작한다.
+        캐시가 없으면 전체 맵(ASGD3210)으로 시작하고, 거부되는 그룹은 첫 폴링에서 내린다.
+        """
+        caps = self.capability_cache.get(ip)
+        state = self.box_states[box_index]
+        if caps is None:
+            self.device_table.set_capabilities(box_index, fw_status=True, tftp=True, sensor_model=True)
+            self.fc23_supported[box_index] = None
+            state["last_sensor_model_str"] = ""
+        else:
+            fw_status = bool(caps.get("fw_status"))
+            # 예전 캐시에 남은 "fw_status 없음 + sensor_model 있음" 조합은 있을 수 없으므로 센서 모델도 내린다
+            self.device_table.set_capabilities(
+                box_index,
+                fw_status=fw_status,
+                tftp=bool(caps.get("tftp")),
+                sensor_model=fw_status and bool(caps.get("sensor_model")),
+            )
+            self.fc23_supported[box_index] = caps.get("fc23")
+            state["last_version_value"] = caps.get("version")
+            state["last_sensor_model_str"] = caps.get("sensor_model_name") or ""
+            self.console.print(f"[CAPS] box {box_index} ({ip}) : 캐시 사용 → {caps.get('model')}")
+        self.caps_pending_verify[box_index] = caps or {}
+        self.read_plans[box_index] = None
         try:
-            self.sensor_model_supported[box_index] = False
+            self.update_topright_label(box_index)
+        except Exception:
+            pass
 
-            if not tmp_client.connect():
-                self.fw_status_supported[box_index] = False
-                self.tftp_supported[box_index] = False
-                return
+    def verify_capabilities(self, box_index: int):
+        """첫 정상 폴링 후 실제 응답으로 능력을 확정하고 캐시에 기록한다."""
+        cached = self.caps_pending_verify[box_index]
+        if cached is None:
+            return
+        self.caps_pending_verify[box_index] = None
 
-            start_address = self.reg_addr(40001)
-            BASE_REG_COUNT = 22
+        ip = self.ip_vars[box_index].get()
+        plan = self.read_plans[box_index]
+        values = plan.values
+        if cached and cached.get("version") != values.get("version"):
+            # FW 가 바뀐 장비 → 캐시를 버리고 전체 맵으로 다시 확인
+            self.console.print(f"[CAPS] box {box_index} ({ip}) : 버전 변경 감지 → 능력 재확인")
+            self.capability_cache.forget(ip)
+            self.device_table.set_capabilities(box_index, fw_status=True, tftp=True, sensor_model=True)
+            self.caps_pending_verify[box_index] = {}
+            return
 
-            rr_base = tmp_client.read_holding_registers(start_address, BASE_REG_COUNT)
-            if isinstance(rr_base, ExceptionResponse) or rr_base.isError():
-                raise ModbusIOException(f"Error reading base regs: {rr_base}")
-            regs_base = getattr(rr_base, "registers", []) or []
-            if len(regs_base) < BASE_REG_COUNT:
-                raise ModbusIOException("Base regs too short")
+        caps = self.device_table.capabilities(box_index)
+        self.capability_cache.put(
+            ip,
+            {
+                **caps,
+                "model": schema_for_capabilities(caps["fw_status"], caps["sensor_model"]).name,
+                "version": values.get("version"),
+                "sensor_model_name": values.get("sensor_model") if caps["sensor_model"] else None,
+                "fc23": self.fc23_supported[box_index],
+            },
+        )
 
-            rr_ext = tmp_client.read_holding_registers(start_address, 24)
-            if isinstance(rr_ext, ExceptionResponse) or rr_ext.isError():
-                self.fw_status_supported[box_index] = False
-                self.tftp_supported[box_index] = False
+    def read_plan(self, box_index: int) -> ReadPlan:
+        schema = schema_for_capabilities(self.device_table.fw_status_supported[box_index], self.device_table.sensor_model_supported[box_index])
+        plan = self.read_plans[box_index]
+        if plan is None or plan.schema is not schema:
+            plan = ReadPlan(schema)
+            self.read_plans[box_index] = plan
+        return plan
+
+    def poll_requests(self, box_index: int):
+        upgrading = self.box_states[box_index].get("fw_upgrading", False)
+        return self.read_plan(box_index).due_requests(upgrading=upgrading)
+
+    def read_poll_cycle(self, box_index: int, read):
+        """
+        이번 사이클의 폴링 요청을 read(request) → 응답 으로 읽고 (새 필드, 보낸 요청 수)를 돌려준다.
+        장비가 선택 그룹을 거부하면 그 그룹을 내린 계획으로 같은 사이클 안에서 다시 읽는다.
+        """
+        fresh = {}
+        sent = 0
+        requests = self.poll_requests(box_index)
+        while True:
+            for request in requests:
+                sent += 1
+                applied = self.apply_poll_response(box_index, request, read(request))
+                if applied is None:
+                    requests = self.poll_requests(box_index)
+                    break
+                fresh.update(applied)
             else:
-                regs_ext = getattr(rr_ext, "registers", []) or []
-                if len(regs_ext) >= 24:
-                    self.fw_status_supported[box_index] = True
-                    self.tftp_supported[box_index] = True
-                else:
-                    self.fw_status_supported[box_index] = False
-                    self.tftp_supported[box_index] = False
+                return fresh, sent
+
+    def apply_poll_response(self, box_index: int, request, response) -> Optional[dict]:
+        """
+        폴링 응답 1건을 반영하고 이번에 갱신된 필드를 돌려준다.
+        장비가 선택 그룹(FW 상태/센서 모델)을 거부하면 그 그룹을 내리고 None - 폴링 실패가 아니라
+        줄어든 계획으로 이번 사이클을 다시 읽으라는 뜻이다 (read_poll_cycle).
+        """
+        if isinstance(response, ExceptionResponse) and response.exception_code in (
+            ModbusExceptions.IllegalFunction,
+            ModbusExceptions.IllegalAddress,
+        ):
+            # 장비가 거부한 선택 그룹은 지원 안 함으로 내린다
+            # (게이트웨이 무응답 0x0A/0x0B 는 유닛 통신 오류일 뿐이므로 제외)
+            if "fw_status" in request.group_names and self.device_table.fw_status_supported[box_index]:
+                # FW 상태가 없는 장비(ASGD3000)는 센서 모델(40030~)도 없다 - 같이 내려야 캐시에 남지 않는다
+                self.console.print(f"[POLL] box {box_index} : 40023/40024 읽기 거부 → FW 상태/TFTP/센서 모델 기능 비활성화")
+                self.device_table.set_capabilities(box_index, fw_status=False, tftp=False, sensor_model=False)
+            elif "sensor_model" in request.group_names and self.device_table.sensor_model_supported[box_index]:
+                self.device_table.set_capabilities(box_index, sensor_model=False)
+            if "fw_status" in request.group_names or "sensor_model" in request.group_names:
+                # 이미 내린 그룹이면 바뀌기 전 계획으로 보낸 요청(파이프라인에서 먼저 나간 폴링)
+                return None
+        if isinstance(response, ModbusIOException):
+            raise ModbusIOException(f"No response received for {request}")
+        if isinstance(response, ExceptionResponse) or response.isError():
+            raise ModbusIOException(f"Error reading {request}")
+        regs = getattr(response, "registers", []) or []
+        fresh = self.read_plans[box_index].apply(request, regs)
+        self.register_mirror.update(box_index, request.start, regs)
+        self.register_cache.update(box_index, request.start, regs)
+        if POLL_RECORDER.enabled:
+            caps = (CAP_FW_STATUS if self.device_table.fw_status_supported[box_index] else 0) | (
+                CAP_SENSOR_MODEL if self.device_table.sensor_model_supported[box_index] else 0
+            )
+            POLL_RECORDER.block(box_index, request.start, regs, caps)
+        return fresh
+
+    def process_poll_fields(self, box_index: int, fresh: dict):
+        if "status" not in fresh:
+            raise ModbusIOException("Live registers missing")
+        if POLL_RECORDER.enabled:
+            POLL_RECORDER.poll(box_index)
+
+        values = self.read_plans[box_index].values
+        waited = self.device_table.waited(box_index)
+        late = self.device_table.record(box_index, values) == CONN_STALE
+        # 통신 이상 판정 뒤에 온 응답은 값은 쓰되 건강도에는 응답 기한 초과로 센다 (끊김이 아님)
+        self.note_health(box_index, self.device_health.record_poll(box_index, not late, waited, timeout=late))
+        if late:
+            self.console.print(f"[LIVE] box {box_index} 통신 복구")
+            self.reset_events(box_index)
+        snapshot = DeviceSnapshot.from_values(values, self.device_table.fw_status_supported[box_index])
+        events = self.snapshots.update(box_index, snapshot)
+        if events:
+            self.device_events.publish(events, on_error=self._on_event_subscriber_error)
+
+        self.verify_capabilities(box_index)
+        self.note_first_value(box_index)
+
+    def _on_event_subscriber_error(self, callback, event, error):
+        self.console.print(f"[EVENT] box {event.box_index} {type(event).__name__} 처리 오류 ({callback.__name__}): {error}")
+
+    def reset_events(self, box_index: int):
+        """다음 폴링에서 모든 항목을 변경 이벤트로 다시 보내게 한다 (화면을 지운 뒤 등)."""
+        self.snapshots.reset(box_index)
 
-            try:
-                addr = self.reg_addr(self.SENSOR_MODEL_REG)
-                rr_model = tmp_client.read_holding_registers(addr, self.SENSOR_MODEL_REG_COUNT)
-                if not isinstance(rr_model, ExceptionResponse) and not rr_model.isError():
-                    regs = getattr(rr_model, "registers", []) or []
-                    if len(regs) == self.SENSOR_MODEL_REG_COUNT:
-                        self.sensor_model_supported[box_index] = True
-            except Exception:
-                self.sensor_model_supported[box_index] = False
+    @staticmethod
+    def error_bits(snapshot) -> int:
+        return snapshot.error & 0x0F
 
-        finally:
-            try:
-                tmp_client.close()
-            except Exception:
-                pass
+    @staticmethod
+    def segment_for(snapshot):
+        """세그먼트에 띄울 (문자열, 깜빡임). 에러 비트가 있으면 값 대신 에러 코드."""
+        for bit_index in range(4):
+            if snapshot.error & (1 << bit_index):
+                error_display = BIT_TO_SEGMENT[bit_index].ljust(4)
+                return error_display, "E" in error_display
+        return f"{snapshot.value}", False
+
+    def on_device_event(self, event):
+        """변경 이벤트 → UI 메시지 (폴링 스레드에서 호출)."""
+        box_index = event.box_index
+        snap = event.snapshot
+
+        if isinstance(event, VersionChanged):
+            self.ui_mailbox.put("version", box_index, snap.version)
+
+        elif isinstance(event, SensorModelChanged):
+            self.ui_mailbox.put("sensor_model", box_index, snap.sensor_model)
+
+        elif isinstance(event, ErrorChanged):
+            text, blinking = self.segment_for(snap)
+            if blinking != self.box_states[box_index]["blinking_error"]:
+                self.box_states[box_index]["blinking_error"] = blinking
+                self.ui_mailbox.put("error_on" if blinking else "error_off", box_index)
+            if self.error_bits(snap) or event.previous is not None:
+                self.show_value(box_index, text, blinking)
+            # 에러 표시 중에는 check_alarms 가 멈춰 있으므로 에러가 바뀌면 알람을 다시 판정
+            self.ui_mailbox.put("alarm_check", box_index)
+
+        elif isinstance(event, AlarmChanged):
+            # 알람 상태는 device_table 에 있다 (check_alarms 가 읽는다)
+            self.ui_mailbox.put("alarm_check", box_index)
+
+        elif isinstance(event, ValueChanged):
+            if not self.error_bits(snap) and (event.previous is None or snap.value != event.previous.value):
+                self.show_value(box_index, f"{snap.value}", False)
+            if not self.box_states[box_index].get("fw_upgrading", False):
+                self.ui_mailbox.put("bar", box_index, snap.bar)
+
+        elif isinstance(event, FwProgressChanged):
+            self.ui_mailbox.put("fw_status", box_index, snap.version, snap.fw_status, snap.fw_progress)
+
+    def begin_poll(self, box_index: int, now=None):
+        now = time.monotonic() if now is None else now
+        self.device_table.begin_poll(box_index, now)
+        self.poll_deadlines.started(box_index, now)
+
+    def next_poll_delay(self, box_index: int, request_count: int) -> float:
+        plan = self.read_plans[box_index]
+        values = plan.values if plan is not None else {}
+        state = self.box_states[box_index]
+        delay = self.poll_scheduler.update(
+            box_index,
+            values,
+            upgrading=state.get("fw_upgrading", False),
+            request_count=request_count,
+            full_scale=state.get("full_scale"),
+        )
+        now = time.monotonic()
+        delay = self.poll_deadlines.next_delay(box_index, delay, now)
+        # 점검 대기 중인 박스는 다음 점검 시각까지 폴링하지 않는다
+        wait = self.device_health.probe_delay(box_index, delay)
+        if wait > delay:
+            self.poll_deadlines.defer(box_index, wait, now)
+        return wait
+
+    def poll_failed(self, box_index: int, timeout: bool = False) -> float:
+        """폴링 실패(예외 응답/무응답) 기록. 다음 폴링까지 기다릴 시간을 돌려준다."""
+        if POLL_RECORDER.enabled:
+            POLL_RECORDER.failed(box_index, timeout)
+        self.poll_deadlines.reset(box_index)
+        self.note_health(box_index, self.device_health.record_poll(box_index, False, timeout=timeout))
+        return self.device_health.probe_delay(box_index, self.communication_interval * 2)
+
+    def note_health(self, box_index: int, changed=None, force=False):
+        """차단기 상태 변화 → 콘솔, 점수/상태가 바뀌었을 때만 화면 갱신 메시지."""
+        health = self.device_health
+        if changed == OPEN:
+            self.console.print(
+                f"[HEALTH] box {box_index} 불안정 (점수 {health.score(box_index)}) "
+                f"→ 점검 대기, {health.interval(box_index):.0f}s 마다 확인"
+            )
+        elif changed == HALF_OPEN:
+            self.console.print(f"[HEALTH] box {box_index} 점검 응답 정상 → 시험 폴링")
+        elif changed == CLOSED:
+            self.console.print(f"[HEALTH] box {box_index} 정상 복귀")
+
+        score = health.score(box_index)
+        # 점수는 5 단위로만 표시 (응답 시간이 조금씩 흔들릴 때마다 라벨을 다시 그리지 않도록)
+        shown = (None if score is None else score // 5 * 5, health.state(box_index))
+        state = self.box_states[box_index]
+        if force or state.get("health_shown") != shown:
+            state["health_shown"] = shown
+            self.ui_mailbox.put("health", box_index)
+
+    def health_text(self, box_index: int) -> str:
+        text = f"DC: {self.device_table.disconnects[box_index]}"
+        shown = self.box_states[box_index].get("health_shown")
+        if shown and shown[0] is not None:
+            text += f"  H: {shown[0]}"
+        return text
+
+    def show_health(self, box_index: int):
+        self.disconnection_labels[box_index].config(text=self.health_text(box_index))
+        breaker = self.device_health.state(box_index)
+        state = self.box_states[box_index]
+        if state.get("breaker_shown", CLOSED) == breaker:
+            return
+        state["breaker_shown"] = breaker
+        if breaker == OPEN:
+            text = f"Parked: {self.device_health.interval(box_index):.0f}s"
+        elif breaker == HALF_OPEN:
+            text = "Probe: OK"
+        else:
+            text = "Reconnect: OK"
+        self.reconnect_attempt_labels[box_index].config(text=text)
+
+    def health_stats(self) -> dict:
+        """박스별 건강도 + 재연결 복구 통계 (IP 포함) + 상태 표 요약("summary")."""
+        recoveries = self.reconnect_supervisor.stats()
+        deadlines = self.poll_deadlines.stats()
+        snap = self.device_table.snapshot()
+        age = snap.age()
+        out = {"summary": snap.summary()}
+        for box_index, stats in self.device_health.stats().items():
+            stats["ip"] = self.ip_vars[box_index].get()
+            stats["reconnect"] = recoveries.get(box_index)
+            stats["deadline"] = deadlines.get(box_index)
+            stats["connection"] = int(snap.connection[box_index])
+            # 마지막 폴링 응답 후 지난 시간(초), 응답을 받은 적 없으면 None
+            stats["age"] = round(float(age[box_index]), 1) if age[box_index] != float("inf") else None
+            out[str(box_index)] = stats
+        return out
+
+    def export_health_stats(self, path=None):
+        path = path or self.health_export
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.health_stats(), file, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def export_health_periodically(self):
         try:
-            self.update_topright_label(box_index)
-        except Exception:
-            pass
+            self.export_health_stats()
+        except Exception as e:
+            self.console.print(f"[HEALTH] 통계 저장 실패: {e}")
+        self.parent.after(self.HEALTH_EXPORT_INTERVAL_MS, self.export_health_periodically)
+
+    def handle_connection_lost(self, box_index: int):
+        self.device_table.clear(box_index, CONN_LOST)
+        if self.box_states[box_index].get("fw_upgrading", False):
+            self.box_states[box_index]["fw_upgrading"] = False
+            self.reset_events(box_index)
+            self.ui_mailbox.put("bar", box_index, 0)
+            self.ui_mailbox.put("segment_display", box_index, "    ", False)
+        else:
+            self.handle_disconnection(box_index)
 
     def read_modbus_data(self, ip, client, stop_flag, box_index):
-        start_address = self.reg_addr(40001)
-        BASE_REG_COUNT = 22
+        if not client.is_socket_open():
+            # 자동 연결 때 응답 없던 장비: 처음부터 재연결 경로로
+            client = self.reconnect(ip, client, stop_flag, box_index)
+            if client is None:
+                return
 
         while not stop_flag.is_set():
             try:
                 if client is None or not client.is_socket_open():
                     raise ConnectionException("Socket is closed")
 
-                lock = self.modbus_locks.get(ip)
-                if lock is None:
+                commands = self.command_queues.get(ip)
+                if commands is None:
                     break
-                num_registers = 24 if self.fw_status_supported[box_index] else BASE_REG_COUNT
-
-                with lock:
-                    response = client.read_holding_registers(start_address, num_registers)
-
-                if isinstance(response, ExceptionResponse) or response.isError():
-                    raise ModbusIOException(f"Error reading from {ip}")
 
-                raw_regs = getattr(response, "registers", []) or []
-                if len(raw_regs) < BASE_REG_COUNT:
-                    raise ModbusIOException("Too few regs")
+                def read(request):
+                    commands.run_pending(client)
+                    self.begin_poll(box_index)
+                    return client.read_holding_registers(request.address, request.count)
 
-                value_40023 = None
-                value_40024 = None
+                fresh, sent = self.read_poll_cycle(box_index, read)
+                self.process_poll_fields(box_index, fresh)
 
-                if self.fw_status_supported[box_index] and len(raw_regs) < 24:
-                    self.fw_status_supported[box_index] = False
-                    self.tftp_supported[box_index] = False
-                elif self.fw_status_supported[box_index] and len(raw_regs) >= 24:
-                    value_40023 = raw_regs[22]
-                    value_40024 = raw_regs[23]
-
-                value_40001 = raw_regs[0]
-                value_40005 = raw_regs[4]
-                value_40007 = raw_regs[7]
-                value_40011 = raw_regs[10]
-                value_40022 = raw_regs[21]
-
-                self.ui_update_queue.put(("version", box_index, value_40022))
-
-                now = time.time()
-                st = self.box_states[box_index]
-                if self.sensor_model_supported[box_index] and (now - st.get("last_sensor_model_poll", 0.0) >= self.SENSOR_MODEL_POLL_SEC):
-                    st["last_sensor_model_poll"] = now
-                    addr = self.reg_addr(self.SENSOR_MODEL_REG)
-                    try:
-                        with lock:
-                            rr = client.read_holding_registers(addr, self.SENSOR_MODEL_REG_COUNT)
-                        if not isinstance(rr, ExceptionResponse) and not rr.isError():
-                            regs = getattr(rr, "registers", []) or []
-                            model_str = self.regs_to_ascii(regs)
-                            if model_str:
-                                self.ui_update_queue.put(("sensor_model", box_index, model_str))
-                    except Exception:
-                        pass
-
-                bit_6_on = bool(value_40001 & (1 << 6))
-                bit_7_on = bool(value_40001 & (1 << 7))
-                self.box_states[box_index]["alarm1_on"] = bit_6_on
-                self.box_states[box_index]["alarm2_on"] = bit_7_on
-                self.ui_update_queue.put(("alarm_check", box_index))
-
-                self.maybe_log_event(box_index, value_40005, bit_6_on, bit_7_on, value_40007)
-
-                bits = [bool(value_40007 & (1 << n)) for n in range(4)]
-                if not any(bits):
-                    if self.box_states[box_index]["blinking_error"]:
-                        self.box_states[box_index]["blinking_error"] = False
-                        self.ui_update_queue.put(("error_off", box_index))
-                    formatted_value = f"{value_40005}"
-                    self.data_queue.put((box_index, formatted_value, False))
-                else:
-                    error_display = ""
-                    for bit_index, bit_flag in enumerate(bits):
-                        if bit_flag:
-                            error_display = BIT_TO_SEGMENT[bit_index]
-                            break
-                    error_display = error_display.ljust(4)
-                    if "E" in error_display:
-                        if not self.box_states[box_index]["blinking_error"]:
-                            self.box_states[box_index]["blinking_error"] = True
-                            self.ui_update_queue.put(("error_on", box_index))
-                        self.data_queue.put((box_index, error_display, True))
-                    else:
-                        if self.box_states[box_index]["blinking_error"]:
-                            self.box_states[box_index]["blinking_error"] = False
-                            self.ui_update_queue.put(("error_off", box_index))
-                        self.data_queue.put((box_index, error_display, False))
-
-                if not self.box_states[box_index].get("fw_upgrading", False):
-                    self.ui_update_queue.put(("bar", box_index, value_40011))
-
-                if self.fw_status_supported[box_index] and value_40023 is not None and value_40024 is not None:
-                    self.ui_update_queue.put(("fw_status", box_index, value_40022, value_40023, value_40024))
-
-                time.sleep(self.communication_interval)
+                commands.idle(client, self.next_poll_delay(box_index, sent), stop_flag)
 
             except ConnectionException:
-                if self.box_states[box_index].get("fw_upgrading", False):
-                    self.box_states[box_index]["fw_upgrading"] = False
-                    self.last_fw_status[box_index] = None
-                    self.ui_update_queue.put(("bar", box_index, 0))
-                    self.ui_update_queue.put(("segment_display", box_index, "    ", False))
-                else:
-                    self.handle_disconnection(box_index)
-                self.reconnect(ip, client, stop_flag, box_index)
-                break
+                self.handle_connection_lost(box_index)
+                client = self.reconnect(ip, client, stop_flag, box_index)
+                if client is None:
+                    break
 
             except ModbusIOException as e:
-                msg = str(e)
-                if self.fw_status_supported[box_index] and "40001~40024" in msg:
-                    self.fw_status_supported[box_index] = False
-                    self.tftp_supported[box_index] = False
-                    time.sleep(self.communication_interval * 2)
-                    continue
-                time.sleep(self.communication_interval * 2)
+                delay = self.poll_failed(box_index, "No response received" in str(e))
+                if client is not None and not client.is_socket_open():
+                    continue   # 송수신 오류로 연결이 닫힘 → 바로 끊김 처리 (유닛 무응답으로는 닫히지 않는다)
+                stop_flag.wait(delay)
                 continue
 
             except Exception as e:
@@ -1123,105 +1981,202 @@ class ModbusUI:
                     "No response received",
                 ]
                 if any(k in msg for k in decode_keywords):
-                    if self.box_states[box_index].get("fw_upgrading", False):
-                        self.box_states[box_index]["fw_upgrading"] = False
-                        self.last_fw_status[box_index] = None
-                        self.ui_update_queue.put(("bar", box_index, 0))
-                        self.ui_update_queue.put(("segment_display", box_index, "    ", False))
-                    else:
-                        self.handle_disconnection(box_index)
-                    self.reconnect(ip, client, stop_flag, box_index)
+                    self.handle_connection_lost(box_index)
+                else:
+                    self.handle_disconnection(box_index)
+                client = self.reconnect(ip, client, stop_flag, box_index)
+                if client is None:
+                    break
+
+    def read_modbus_data_pipelined(self, ip, client, stop_flag, box_index):
+        """
+        read_modbus_data 의 파이프라인 버전.
+        응답을 기다리지 않고 주기마다 다음 폴링을 보내 최대 pipeline_depth 개 폴링을 겹쳐 띄운다.
+        응답은 트랜잭션 ID 로 짝지어지고, 폴링 결과는 보낸 순서대로 반영한다.
+        """
+        if not client.is_socket_open():
+            client = self.reconnect(ip, client, stop_flag, box_index)
+            if client is None:
+                return
+
+        depth = client.pipeline_depth
+        inflight = deque()
+        while not stop_flag.is_set():
+            try:
+                if client is None or not client.is_socket_open():
+                    raise ConnectionException("Socket is closed")
+
+                commands = self.command_queues.get(ip)
+                if commands is None:
+                    break
+
+                commands.run_pending(client)
+                requests = self.poll_requests(box_index)
+                sent_at = time.monotonic()
+                futures = [client.submit_read(r.address, r.count) for r in requests]
+                for future in futures:
+                    future.add_done_callback(lambda f, q=commands: q.interrupt())
+                inflight.append((requests, futures, sent_at))
+                self.begin_poll(box_index, sent_at)
+
+                # 창이 차면 가장 오래된 폴링의 응답을 기다린다
+                while len(inflight) >= depth:
+                    self.apply_oldest_poll(box_index, client, inflight)
+
+                # 주기 대기 중에도 응답이 오는 대로 보낸 순서대로 반영
+                deadline = time.monotonic() + self.next_poll_delay(box_index, len(requests))
+                while not stop_flag.is_set():
+                    while inflight and all(f.done() for f in inflight[0][1]):
+                        self.apply_oldest_poll(box_index, client, inflight)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    commands.idle(client, remaining, stop_flag)
+
+            except ConnectionException:
+                inflight.clear()
+                self.handle_connection_lost(box_index)
+                client = self.reconnect(ip, client, stop_flag, box_index)
+                if client is None:
                     break
 
+            except ModbusIOException as e:
+                delay = self.poll_failed(box_index, "No response received" in str(e))
+                if client is not None and not client.is_socket_open():
+                    continue   # 송수신 오류로 연결이 닫힘 → 바로 끊김 처리 (유닛 무응답으로는 닫히지 않는다)
+                stop_flag.wait(delay)
+                continue
+
+            except Exception as e:
+                inflight.clear()
+                self.console.print(f"[PIPE] box {box_index} ({ip}) 오류: {e}")
                 self.handle_disconnection(box_index)
-                self.reconnect(ip, client, stop_flag, box_index)
-                break
+                client = self.reconnect(ip, client, stop_flag, box_index)
+                if client is None:
+                    break
 
-    def maybe_log_event(self, box_index, value_40005, alarm1, alarm2, error_reg):
-        state = self.box_states[box_index]
-        last_val = state.get("last_log_value")
-        last_a1 = state.get("last_log_alarm1")
-        last_a2 = state.get("last_log_alarm2")
-        last_err = state.get("last_log_error_reg")
+    def apply_oldest_poll(self, box_index, client, inflight):
+        self.apply_pipelined_poll(box_index, client, inflight.popleft())
+        if inflight:
+            # 아직 응답을 기다리는 폴링이 있으면 그중 가장 오래된 것부터 대기 시간을 잰다
+            self.begin_poll(box_index, inflight[0][2])
+
+    def apply_pipelined_poll(self, box_index, client, entry):
+        sent, futures, _ = entry
+        fresh = {}
+        for request, future in zip(sent, futures):
+            applied = self.apply_poll_response(box_index, request, self.pipelined_response(client, request, future))
+            if applied is None:
+                # 선택 그룹 거부 → 줄어든 계획으로 이번 폴링을 바로 다시 읽는다 (남은 응답은 이전 계획의 것)
+                def read(retry):
+                    return self.pipelined_response(client, retry, client.submit_read(retry.address, retry.count))
+
+                fresh = self.read_poll_cycle(box_index, read)[0]
+                break
+            fresh.update(applied)
+        self.process_poll_fields(box_index, fresh)
 
-        if value_40005 == last_val and alarm1 == last_a1 and alarm2 == last_a2 and error_reg == last_err:
+    @staticmethod
+    def pipelined_response(client, request, future):
+        try:
+            return future.result(timeout=client.endpoint.timeout + 1.0)
+        except FutureTimeoutError:
+            raise ModbusIOException(f"No response received for {request}")
+
+    def log_device_event(self, event):
+        """값/알람/에러 변경 → 박스 로그 (같은 폴링의 여러 이벤트는 한 줄로)."""
+        snap = event.snapshot
+        state = self.box_states[event.box_index]
+        key = (snap.value, snap.alarm1, snap.alarm2, snap.error)
+        if state.get("last_log_key") == key:
             return
-
-        state["last_log_value"] = value_40005
-        state["last_log_alarm1"] = alarm1
-        state["last_log_alarm2"] = alarm2
-        state["last_log_error_reg"] = error_reg
+        state["last_log_key"] = key
 
         ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        entry = (ts, value_40005, alarm1, alarm2, error_reg)
-        logs = self.box_logs[box_index]
+        entry = (ts,) + key
+        logs = self.box_logs[event.box_index]
         logs.append(entry)
         if len(logs) > self.LOG_MAX_ENTRIES:
             del logs[0]
 
-        self.ui_update_queue.put(("log_badge", box_index))
-
-    def start_data_processing_thread(self):
-        threading.Thread(target=self.process_data, daemon=True).start()
+        self.ui_mailbox.put("log_badge", event.box_index)
 
-    def process_data(self):
-        while True:
-            try:
-                box_index, value, blink = self.data_queue.get(timeout=1)
-                if self.box_states[box_index].get("fw_upgrading"):
-                    continue
-                self.ui_update_queue.put(("segment_display", box_index, value, blink))
-            except queue.Empty:
-                continue
+    def show_value(self, box_index: int, text: str, blink: bool = False):
+        """측정값/에러 코드 표시. FW 업그레이드 중에는 세그먼트가 진행률을 보여주므로 건너뛴다."""
+        if self.box_states[box_index].get("fw_upgrading"):
+            return
+        self.ui_mailbox.put("segment_display", box_index, text, blink)
 
     def schedule_ui_update(self):
-        self.parent.after(100, self.update_ui_from_queue)
+        self.parent.after(100, self.update_ui_from_mailbox)
 
-    def update_ui_from_queue(self):
-        while not self.ui_update_queue.empty():
-            item = self.ui_update_queue.get_nowait()
-            typ = item[0]
+    def update_ui_from_mailbox(self):
+        for typ, box_index, args in self.ui_mailbox.drain():
             if typ == "circle_state":
-                _, box_index, states = item
-                self.update_circle_state(states, box_index=box_index)
+                self.update_circle_state(args[0], box_index=box_index)
             elif typ == "bar":
-                _, box_index, value = item
-                self.update_bar(value, box_index)
+                self.update_bar(args[0], box_index)
             elif typ == "segment_display":
-                _, box_index, value, blink = item
+                value, blink = args
                 self.update_segment_display(value, box_index=box_index, blink=blink)
             elif typ == "alarm_check":
-                _, box_index = item
                 self.check_alarms(box_index)
             elif typ == "version":
-                _, box_index, version = item
-                self.set_version_label(box_index, version)
+                self.set_version_label(box_index, args[0])
             elif typ == "sensor_model":
-                _, box_index, model_str = item
-                self.set_sensor_model_label(box_index, model_str)
+                self.set_sensor_model_label(box_index, args[0])
             elif typ == "fw_status":
-                _, box_index, v_40022, v_40023, v_40024 = item
-                if self.fw_status_supported[box_index]:
-                    self.update_fw_status(box_index, v_40022, v_40023, v_40024)
+                if self.device_table.fw_status_supported[box_index]:
+                    self.update_fw_status(box_index, *args)
             elif typ == "error_on":
-                _, box_index = item
                 self.start_error_blink(box_index)
             elif typ == "error_off":
-                _, box_index = item
                 self.stop_error_blink(box_index)
             elif typ == "log_badge":
-                _, box_index = item
                 self.update_log_badge(box_index)
+            elif typ == "health":
+                self.show_health(box_index)
 
+        self.check_stale()
         self.schedule_ui_update()
 
+    def stale_bound(self, box_index: int) -> float:
+        """통신 이상 판정 기한: stale_after 와 그 연결에서 관측한 RTT 기한 중 긴 쪽 (원래 느린 장비는 통신 이상이 아님)."""
+        if self.async_engine is not None:
+            deadline = self.async_engine.response_deadline(box_index)
+        else:
+            client = self.clients.get(self.ip_vars[box_index].get())
+            deadline = client.response_deadline() if client is not None else None
+        return self.stale_after if deadline is None else max(self.stale_after, deadline)
+
+    def check_stale(self):
+        """보낸 폴링의 응답을 기한 넘게 기다리는 박스 → 통신 이상 표시 (연결 끊김 판정보다 먼저, 화면 갱신 주기마다)."""
+        bounds = [self.stale_bound(i) for i in range(len(self.device_table))]
+        for box_index in self.device_table.mark_stale(bounds):
+            self.console.print(f"[LIVE] box {box_index} 응답 없음 {bounds[box_index]:.1f}s 초과 → 통신 이상")
+            if self.box_states[box_index].get("fw_upgrading"):
+                continue
+            self.update_segment_display("----", box_index=box_index)
+            self.update_bar(0, box_index)
+
     def handle_disconnection(self, box_index):
-        self.disconnection_counts[box_index] += 1
-        count = self.disconnection_counts[box_index]
-        self.parent.after(0, lambda idx=box_index, c=count: self.disconnection_labels[idx].config(text=f"DC: {c}"))
+        self.device_table.note_disconnect(box_index)
+        # 이미 점검 대기/시험 폴링 중인 박스는 끊김 때마다 화면 전체를 다시 초기화하지 않는다
+        parked = self.device_health.state(box_index) != CLOSED
+        self.note_health(box_index, self.device_health.record_disconnect(box_index), force=True)
 
-        self.box_states[box_index]["fw_upgrading"] = False
-        self.last_fw_status[box_index] = None
+        state = self.box_states[box_index]
+        shown = self.snapshots.last(box_index) is not None or state.get("pwr_blinking", False)
+        state["fw_upgrading"] = False
+        self.reset_events(box_index)
+
+        if parked:
+            state["pwr_blink_state"] = False
+            state["pwr_blinking"] = False
+            if shown:
+                # 시험 폴링 중 표시된 값/알람만 지운다
+                self.parent.after(0, lambda idx=box_index: self.reset_ui_elements(idx))
+            return
 
         self.parent.after(0, lambda idx=box_index: self.reset_ui_elements(idx))
         self.parent.after(0, lambda idx=box_index: self.action_buttons[idx].config(image=self.connect_image, relief="flat", borderwidth=0))
@@ -1238,64 +2193,85 @@ class ModbusUI:
 
         self.parent.after(0, _set_pwr_default)
 
-    def reconnect(self, ip, client, stop_flag, box_index):
-        retries = 0
-        max_retries = 5
-
-        while not stop_flag.is_set() and retries < max_retries:
-            time.sleep(2)
-            self.parent.after(0, lambda idx=box_index, r=retries: self.reconnect_attempt_labels[idx].config(text=f"Reconnect: {r + 1}/{max_retries}"))
-            try:
-                new_client = ModbusTcpClient(ip, port=502, timeout=3)
-                if new_client.connect():
-                    try:
-                        if client is not None:
-                            client.close()
-                    except Exception:
-                        pass
-
-                    self.clients[ip] = new_client
-                    client = new_client
-
-                    if ip not in self.modbus_locks:
-                        self.modbus_locks[ip] = threading.Lock()
-
-                    self.last_fw_status[box_index] = None
-                    self.box_states[box_index]["fw_upgrading"] = False
-                    self.sensor_model_supported[box_index] = False
-                    self.box_states[box_index]["last_sensor_model_str"] = ""
-                    self.box_states[box_index]["last_sensor_model_poll"] = 0.0
-                    self.update_topright_label(box_index)
-
-                    try:
-                        self.detect_device_capabilities(ip, box_index)
-                    except Exception:
-                        pass
+    def next_reconnect_delay(self, box_index: int) -> float:
+        sup = self.reconnect_supervisor
+        delay = sup.next_delay(box_index)
+        if sup.attempts(box_index) == sup.fast_attempts + 1:
+            self.enter_background_reconnect(box_index)
+        # 점검 대기 중이면 재연결 시도도 점검 주기로
+        return self.device_health.probe_delay(box_index, delay)
+
+    def report_reconnect_attempt(self, box_index: int):
+        sup = self.reconnect_supervisor
+        attempt = sup.attempts(box_index)
+        if self.device_health.state(box_index) == OPEN:
+            text = f"Parked: {self.device_health.interval(box_index):.0f}s"
+        elif sup.in_background(box_index):
+            text = f"Reconnect: BG {attempt}"
+        else:
+            text = f"Reconnect: {attempt}/{sup.fast_attempts}"
+        self.parent.after(0, lambda idx=box_index, t=text: self.reconnect_attempt_labels[idx].config(text=t))
 
-                    stop_flag.clear()
-                    t = threading.Thread(target=self.read_modbus_data, args=(ip, new_client, stop_flag, box_index), daemon=True)
-                    self.connected_clients[ip] = t
-                    t.start()
+    def reset_capabilities_for_reconnect(self, box_index: int):
+        self.reset_events(box_index)
+        self.box_states[box_index]["fw_upgrading"] = False
+        self.read_plans[box_index] = None
+        self.poll_scheduler.forget(box_index)
+        self.poll_deadlines.reset(box_index)
+        self.register_cache.invalidate(box_index)
+
+    def restore_after_reconnect(self, ip: str, box_index: int):
+        self.reset_capabilities_for_reconnect(box_index)
+        self.load_device_capabilities(ip, box_index)
+
+    def show_reconnected(self, box_index: int):
+        self.parent.after(0, lambda idx=box_index: self.action_buttons[idx].config(image=self.disconnect_image, relief="flat", borderwidth=0))
+        self.parent.after(0, lambda idx=box_index: self.entries[idx].config(state="disabled"))
+        self.parent.after(0, lambda idx=box_index: self.box_frames[idx].config(highlightbackground="#000000"))
 
-                    self.parent.after(0, lambda idx=box_index: self.action_buttons[idx].config(image=self.disconnect_image, relief="flat", borderwidth=0))
-                    self.parent.after(0, lambda idx=box_index: self.entries[idx].config(state="disabled"))
-                    self.parent.after(0, lambda idx=box_index: self.box_frames[idx].config(highlightbackground="#000000"))
+        self.ui_mailbox.put("circle_state", box_index, [False, False, True, False])
+        self.blink_pwr(box_index)
+        self.show_bar(box_index, show=True)
+
+        text = "Reconnect: OK"
+        recovery = self.reconnect_supervisor.recovered(box_index)
+        if recovery is not None:
+            elapsed, attempts = recovery
+            text = f"Reconnect: OK ({elapsed:.0f}s)"
+            self.console.print(f"[RECONNECT] box {box_index} 복구: {elapsed:.1f}s, 시도 {attempts}회")
+        self.parent.after(0, lambda idx=box_index, t=text: self.reconnect_attempt_labels[idx].config(text=t))
+
+    def enter_background_reconnect(self, box_index: int):
+        # 빠른 재시도로 복구되지 않음 → 낮은 빈도로 계속 시도. 대기 중인 명령은 실패 처리
+        self.auto_reconnect_failed[box_index] = True
+        self.console.print(f"[RECONNECT] box {box_index} : 빠른 재시도 실패 → 백그라운드 재시도 전환")
+        commands = self.command_queues.get(self.ip_vars[box_index].get())
+        if commands is not None:
+            commands.fail_pending("Device unreachable")
 
-                    self.ui_update_queue.put(("circle_state", box_index, [False, False, True, False]))
-                    self.blink_pwr(box_index)
-                    self.show_bar(box_index, show=True)
-                    self.parent.after(0, lambda idx=box_index: self.reconnect_attempt_labels[idx].config(text="Reconnect: OK"))
-                    break
+    def reconnect(self, ip, client, stop_flag, box_index):
+        """
+        같은 폴링 스레드 안에서 재연결될 때까지 재시도한다 (백오프 + 지터, 포기하지 않음).
+        다시 연결된 클라이언트를 돌려주고, 수동 해제(stop_flag)되면 None.
+        """
+        self.reconnect_supervisor.begin(box_index)
+        # 공유 소켓이면 먼저 복구한 유닛의 연결을 그대로 쓴다
+        client.invalidate()
 
-                new_client.close()
-                retries += 1
+        while not stop_flag.is_set():
+            if stop_flag.wait(self.next_reconnect_delay(box_index)):
+                break
+            self.report_reconnect_attempt(box_index)
+            try:
+                if client.connect():
+                    self.clients[ip] = client
+                    self.restore_after_reconnect(ip, box_index)
+                    self.show_reconnected(box_index)
+                    return client
             except Exception:
-                retries += 1
+                pass
 
-        if retries >= max_retries:
-            self.auto_reconnect_failed[box_index] = True
-            self.parent.after(0, lambda idx=box_index: self.reconnect_attempt_labels[idx].config(text="Reconnect: Failed"))
-            self.disconnect_client(ip, box_index, manual=False)
+        return None
 
     def blink_pwr(self, box_index):
         if self.box_states[box_index].get("pwr_blinking", False):
@@ -1334,8 +2310,7 @@ class ModbusUI:
         if state.get("blinking_error"):
             return
 
-        alarm1_raw = state["alarm1_on"]
-        alarm2_raw = state["alarm2_on"]
+        alarm1_raw, alarm2_raw = self.device_table.alarm_state(box_index)
 
         if alarm2_raw:
             new_mode = "al2"
@@ -1370,7 +2345,6 @@ class ModbusUI:
             return
 
         if new_mode == "al2":
-            state["alarm1_on"] = True
             state["alarm1_blinking"] = False
             state["alarm2_blinking"] = True
             state["alarm_border_blink"] = True
@@ -1512,6 +2486,11 @@ class ModbusUI:
             else:
                 box_canvas2.itemconfig(circle_items2[3], fill=self.LAMP_COLORS_OFF[3], outline=self.LAMP_COLORS_OFF[3])
 
+            # 세그먼트의 에러 코드도 같은 주기로 깜빡임 (폴링은 값이 바뀔 때만 세그먼트를 다시 그린다)
+            text = st.get("previous_segment_display")
+            if text and "E" in text and not st.get("fw_upgrading", False):
+                self.update_segment_display(text, box_index=box_index, blink=True)
+
             st["error_after_id"] = self.parent.after(self.alarm_blink_interval, _blink)
 
         _blink()
@@ -1526,7 +2505,7 @@ class ModbusUI:
         box_canvas.itemconfig(circle_items[3], fill=self.LAMP_COLORS_OFF[3], outline=self.LAMP_COLORS_OFF[3])
 
     def update_fw_status(self, box_index, v_40022, v_40023, v_40024):
-        if not self.fw_status_supported[box_index]:
+        if not self.device_table.fw_status_supported[box_index]:
             return
 
         version = v_40022
@@ -1534,12 +2513,6 @@ class ModbusUI:
         progress = v_40024 & 0xFF
         remain = (v_40024 >> 8) & 0xFF
 
-        current = (version, error_code, progress, remain, v_40023)
-        prev = self.last_fw_status[box_index]
-        if prev == current:
-            return
-        self.last_fw_status[box_index] = current
-
         upgrading = bool(v_40023 & (1 << 2))
         upgrade_ok = bool(v_40023 & (1 << 0))
         upgrade_fail = bool(v_40023 & (1 << 1))
@@ -1565,29 +2538,34 @@ class ModbusUI:
             msg += " [" + ", ".join(states) + "]"
         self.console.print(msg)
 
+        was_upgrading = self.box_states[box_index].get("fw_upgrading", False)
         self.box_states[box_index]["fw_upgrading"] = upgrading
+        if was_upgrading and not upgrading:
+            # 업그레이드 동안 멈춰 있던 값/바를 다음 폴링에서 다시 그리도록
+            self.reset_events(box_index)
 
         if upgrading:
             disp = f"{progress:4d}"
-            self.ui_update_queue.put(("segment_display", box_index, disp, False))
-            self.ui_update_queue.put(("bar", box_index, progress))
+            self.ui_mailbox.put("segment_display", box_index, disp, False)
+            self.ui_mailbox.put("bar", box_index, progress)
             self._set_fw_ui(box_index, True, f"업그레이드 진행중… {progress}% (남은 {remain}s)")
         else:
             if upgrade_ok or rollback_ok:
-                self.ui_update_queue.put(("segment_display", box_index, " End", False))
+                self.ui_mailbox.put("segment_display", box_index, " End", False)
                 self._set_fw_ui(box_index, False, "업그레이드 완료")
                 self.parent.after(3000, lambda i=box_index: self.box_states[i]["fw_status_var"].set(""))
             elif upgrade_fail or rollback_fail:
-                self.ui_update_queue.put(("segment_display", box_index, "Err ", True))
+                self.ui_mailbox.put("segment_display", box_index, "Err ", True)
                 self._set_fw_ui(box_index, False, f"업그레이드 실패 (err={error_code})")
             else:
                 self._set_fw_ui(box_index, False, "")
 
     def delayed_load_tftp_ip_from_device(self, box_index: int, delay: float = 1.0):
-        if not self.tftp_supported[box_index]:
+        if not self.device_table.tftp_supported[box_index]:
             return
-        time.sleep(delay)
-        if not self.tftp_supported[box_index]:
+        if self.register_cache.get(box_index, GROUP_TFTP_IP.start, GROUP_TFTP_IP.count) is None:
+            time.sleep(delay)
+        if not self.device_table.tftp_supported[box_index]:
             return
         try:
             self.load_tftp_ip_from_device(box_index)
@@ -1595,37 +2573,27 @@ class ModbusUI:
             self.console.print(f"[FW] (ignore) delayed TFTP IP read fail box {box_index}: {e}")
 
     def load_tftp_ip_from_device(self, box_index: int):
-        if not self.tftp_supported[box_index]:
+        if not self.device_table.tftp_supported[box_index]:
             return
 
         ip = self.ip_vars[box_index].get()
-        client = self.clients.get(ip)
-        lock = self.modbus_locks.get(ip)
-        if client is None or lock is None:
+        if ip not in self.command_queues:
             return
 
-        addr_ip1 = self.reg_addr(40088)
+        request = ReadRequest(GROUP_TFTP_IP.start, GROUP_TFTP_IP.count, [GROUP_TFTP_IP])
         try:
-            with lock:
-                rr = client.read_holding_registers(addr_ip1, 2)
-
-            if isinstance(rr, ExceptionResponse) or rr.isError():
-                self.console.print(f"[FW] read 40088/40089 error: {rr}")
-                self.console.print(
-                    f"[FW] box {box_index} ({ip}) : TFTP IP 레지스터 접근 오류 발생 → "
-                    f"이후 이 박스에 대해서는 자동 TFTP 기능 비활성화."
-                )
-                self.tftp_supported[box_index] = False
-                return
-
-            w1, w2 = rr.registers
-            a = (w1 >> 8) & 0xFF
-            b = w1 & 0xFF
-            c = (w2 >> 8) & 0xFF
-            d = w2 & 0xFF
-            tftp_ip = f"{a}.{b}.{c}.{d}"
-            self.tftp_ip_vars[box_index].set(tftp_ip)
-            self.console.print(f"[FW] box {box_index} TFTP IP from device: {tftp_ip}")
+            words = request.decode(self.read_registers_cached(box_index, request.start, request.count))
+            tftp_ip = decode_ip(words["tftp_ip_hi"], words["tftp_ip_lo"])
+            if self.tftp_ip_vars[box_index].get() != tftp_ip:
+                self._ui_call(self.tftp_ip_vars[box_index].set, tftp_ip)
+                self.console.print(f"[FW] box {box_index} TFTP IP from device: {tftp_ip}")
+        except RegisterReadError as e:
+            self.console.print(f"[FW] read 40088/40089 error: {e.response}")
+            self.console.print(
+                f"[FW] box {box_index} ({ip}) : TFTP IP 레지스터 접근 오류 발생 → "
+                f"이후 이 박스에 대해서는 자동 TFTP 기능 비활성화."
+            )
+            self.device_table.set_capabilities(box_index, tftp=False)
         except Exception as e:
             msg = str(e)
             if "No response received" in msg:
@@ -1633,14 +2601,14 @@ class ModbusUI:
                     f"[FW] box {box_index} ({ip}) TFTP IP read: device not ready (No response). "
                     f"해당 장비에 대해서는 자동 TFTP 기능을 비활성화합니다."
                 )
-                self.tftp_supported[box_index] = False
+                self.device_table.set_capabilities(box_index, tftp=False)
             else:
                 self.console.print(f"[FW] Error reading TFTP IP for box {box_index} ({ip}): {e}")
                 if "Failed to connect" in msg or "Socket is closed" in msg:
                     self.console.print(
                         f"[FW] box {box_index} ({ip}) : TFTP 접근 시 연결 문제 발생 → 이후 자동 TFTP IP 읽기 비활성화."
                     )
-                    self.tftp_supported[box_index] = False
+                    self.device_table.set_capabilities(box_index, tftp=False)
 
     def _set_fw_ui(self, box_index: int, inflight: bool, msg: str = ""):
         st = self.box_states[box_index]
@@ -1654,7 +2622,7 @@ class ModbusUI:
                 btn.config(state="normal", text="FW 업그레이드 시작")
 
     def start_firmware_upgrade(self, box_index: int):
-        if not self.tftp_supported[box_index]:
+        if not self.device_table.tftp_supported[box_index]:
             self.console.print(f"[FW] box {box_index} : TFTP/FW 기능 미지원으로 FW 업그레이드 요청을 무시합니다.")
             self._show_warn(
                 "FW",
@@ -1679,10 +2647,8 @@ class ModbusUI:
 
         try:
             ip = self.ip_vars[box_index].get().strip()
-            client = self.clients.get(ip)
-            lock = self.modbus_locks.get(ip)
 
-            if client is None or lock is None:
+            if ip not in self.command_queues:
                 final_msg = "실패: 먼저 Modbus 연결을 해주세요."
                 self._show_warn("FW", "먼저 Modbus 연결을 해주세요.")
                 return
@@ -1710,30 +2676,30 @@ class ModbusUI:
                 return
 
             tftp_ip_str = self.tftp_ip_vars[box_index].get().strip()
-            addr_ip1 = self.reg_addr(40088)
-            addr_ctrl = self.reg_addr(40091)
-
-            if not self._try_acquire_lock(lock, "FW", "통신이 바쁩니다. 잠시 후 다시 시도해주세요."):
-                final_msg = "실패: 통신이 바쁩니다. 잠시 후 재시도."
-                return
 
+            # TFTP IP(40088/40089) + FW 시작(40091) 을 한 트랜잭션으로. 장비의 TFTP IP 가 이미 같으면(캐시)
+            # 다시 쓰지 않고, FC23 지원 장비는 FW 시작 쓰기와 같은 왕복에서 TFTP IP 를 읽어 확인한다.
+            tx = WriteTransaction()
+            words = None
             try:
-                try:
-                    w1, w2 = encode_ip_to_words(tftp_ip_str)
-                    client.write_registers(addr_ip1, [w1, w2])
-                except Exception as e:
-                    self.console.print(f"[FW] write 40088/40089 failed (non-fatal): {e}")
-
-                r2 = client.write_register(addr_ctrl, 1)
-                if isinstance(r2, ExceptionResponse) or getattr(r2, "isError", lambda: False)():
-                    final_msg = f"실패: FW 시작 명령 쓰기 실패 ({r2})"
-                    self._show_error("FW", f"장비에 FW 시작 명령을 쓰는 데 실패했습니다.\n{r2}")
-                    return
-            finally:
-                try:
-                    lock.release()
-                except Exception:
-                    pass
+                words = list(encode_ip_to_words(tftp_ip_str))
+                cached = self.register_cache.get(box_index, GROUP_TFTP_IP.start, GROUP_TFTP_IP.count)
+                if cached != words:
+                    tx.write(GROUP_TFTP_IP.start, words)
+                tx.confirm(GROUP_TFTP_IP.start, GROUP_TFTP_IP.count, fallback_read=False)
+            except Exception as e:
+                self.console.print(f"[FW] write 40088/40089 failed (non-fatal): {e}")
+            tx.write(REG_FW_CTRL, 1)
+
+            result = self.run_write_transaction(box_index, tx, stop_on_error=False)
+            if not result.wrote(REG_FW_CTRL):
+                r2 = result.error
+                final_msg = f"실패: FW 시작 명령 쓰기 실패 ({r2})"
+                self._show_error("FW", f"장비에 FW 시작 명령을 쓰는 데 실패했습니다.\n{r2}")
+                return
+            if words is not None and result.confirmed is not None and result.confirmed != words:
+                self.console.print(f"[FW] box {box_index} TFTP IP 확인 불일치 (non-fatal): {decode_ip(*result.confirmed)}")
+            self.console.print(f"[FW] box {box_index} FW 시작: 왕복 {result.round_trips}회")
 
             self.box_states[box_index]["fw_upgrading"] = True
             keep_disabled = True
@@ -1775,7 +2741,7 @@ class ModbusUI:
     def _zero_calibration_worker(self, box_index: int):
         self.console.print(f"[ZERO] button clicked (box_index={box_index})")
 
-        if not self.tftp_supported[box_index]:
+        if not self.device_table.tftp_supported[box_index]:
             self.console.print(f"[ZERO] box {box_index} : ZERO 기능(40092) 미지원으로 판단, 명령 전송을 무시합니다.")
             self._show_warn(
                 "ZERO",
@@ -1784,25 +2750,15 @@ class ModbusUI:
             return
 
         ip = self.ip_vars[box_index].get()
-        client = self.clients.get(ip)
-        lock = self.modbus_locks.get(ip)
 
-        if client is None or lock is None:
+        if ip not in self.command_queues:
             self.console.print(f"[ZERO] Box {box_index} ({ip}) not connected.")
             self._show_warn("ZERO", "먼저 Modbus 연결을 해주세요.")
             return
 
-        addr = self.reg_addr(40092)
+        addr = self.reg_addr(REG_ZERO)
         try:
-            if not self._try_acquire_lock(lock, "ZERO", "통신이 바쁩니다. 잠시 후 다시 시도해주세요."):
-                return
-            try:
-                r = client.write_register(addr, 1)
-            finally:
-                try:
-                    lock.release()
-                except Exception:
-                    pass
+            r = self._run_command(ip, "write_register", addr, 1)
 
             if isinstance(r, ExceptionResponse) or r.isError():
                 self.console.print(f"[ZERO] write 40092=1 error: {r}")
@@ -1820,7 +2776,7 @@ class ModbusUI:
     def _reboot_device_worker(self, box_index: int):
         self.console.print(f"[RST] button clicked (box_index={box_index})")
 
-        if not self.tftp_supported[box_index]:
+        if not self.device_table.tftp_supported[box_index]:
             self.console.print(f"[RST] box {box_index} : 재부팅 기능(40093) 미지원으로 판단, 명령 전송을 무시합니다.")
             self._show_warn(
                 "RST",
@@ -1829,15 +2785,13 @@ class ModbusUI:
             return
 
         ip = self.ip_vars[box_index].get()
-        client = self.clients.get(ip)
-        lock = self.modbus_locks.get(ip)
 
-        if client is None or lock is None:
+        if ip not in self.command_queues:
             self.console.print(f"[RST] Box {box_index} ({ip}) not connected.")
             self._show_warn("RST", "먼저 Modbus 연결을 해주세요.")
             return
 
-        addr = self.reg_addr(40093)
+        addr = self.reg_addr(REG_RESET)
 
         def _treat_as_ok(msg: str):
             self.console.print(f"[RST] no/invalid response after write (device is rebooting): {msg}")
@@ -1847,15 +2801,7 @@ class ModbusUI:
             )
 
         try:
-            if not self._try_acquire_lock(lock, "RST", "통신이 바쁩니다. 잠시 후 다시 시도해주세요."):
-                return
-            try:
-                r = client.write_register(addr, 1)
-            finally:
-                try:
-                    lock.release()
-                except Exception:
-                    pass
+            r = self._run_command(ip, "write_register", addr, 1)
 
             if isinstance(r, ExceptionResponse) or getattr(r, "isError", lambda: False)():
                 msg = str(r)
@@ -1876,9 +2822,7 @@ class ModbusUI:
 
     def change_device_model(self, box_index: int, model_value: int):
         ip = self.ip_vars[box_index].get()
-        client = self.clients.get(ip)
-        lock = self.modbus_locks.get(ip)
-        if client is None or lock is None:
+        if ip not in self.command_queues:
             messagebox.showwarning("MODEL", "먼저 Modbus 연결을 해주세요.")
             return
 
@@ -1891,10 +2835,8 @@ class ModbusUI:
 
     def _change_device_model_worker(self, box_index: int, model_value: int, model_name: str):
         ip = self.ip_vars[box_index].get()
-        client = self.clients.get(ip)
-        lock = self.modbus_locks.get(ip)
 
-        if client is None or lock is None:
+        if ip not in self.command_queues:
             self._show_warn("MODEL", "먼저 Modbus 연결을 해주세요.")
             return
 
@@ -1904,16 +2846,10 @@ class ModbusUI:
             self.console.print(f"[MODEL] no response (maybe rebooting): {msg}")
             self._show_info("MODEL", f"모델 변경 명령을 전송했습니다.\n({model_name})\n장비가 재부팅될 수 있습니다.")
 
+        # 모델이 바뀌면 레지스터 맵도 바뀌므로 다음 연결 때 다시 확인
+        self.capability_cache.forget(ip)
         try:
-            if not self._try_acquire_lock(lock, "MODEL", "통신이 바쁩니다. 잠시 후 다시 시도해주세요."):
-                return
-            try:
-                r = client.write_register(addr, int(model_value))
-            finally:
-                try:
-                    lock.release()
-                except Exception:
-                    pass
+            r = self._run_command(ip, "write_register", addr, int(model_value))
 
             if isinstance(r, ExceptionResponse) or getattr(r, "isError", lambda: False)():
                 msg = str(r)
@@ -1983,6 +2919,20 @@ class ModbusUI:
             font=("Helvetica", 10, "bold"),
         ).pack(padx=10, pady=(0, 8))
 
+        if self.device_table.tftp_supported[box_index]:
+            tftp_frame = Frame(win, bg="#1e1e1e")
+            tftp_frame.pack(padx=10, pady=(0, 5))
+            Label(tftp_frame, text="장비 TFTP IP:", fg="white", bg="#1e1e1e", font=("Helvetica", 10)).pack(side="left")
+            Label(
+                tftp_frame,
+                textvariable=self.tftp_ip_vars[box_index],
+                fg="#cccccc",
+                bg="#1e1e1e",
+                font=("Helvetica", 10),
+            ).pack(side="left", padx=(5, 0))
+            # 창은 바로 띄우고 값은 캐시(없으면 폴링 사이에 한 번 읽기)에서 채운다
+            self._run_bg(self.load_tftp_ip_from_device, box_index)
+
         btn_frame = Frame(win, bg="#1e1e1e")
         btn_frame.pack(padx=10, pady=10)
 
@@ -2065,6 +3015,17 @@ class ModbusUI:
             bd=1,
         ).grid(row=0, column=1, padx=5, pady=5)
 
+        Button(
+            win,
+            text="통신 기록 저장 (pcap)",
+            command=lambda idx=box_index: self.save_traffic_capture(idx),
+            width=18,
+            bg="#333333",
+            fg="white",
+            relief="raised",
+            bd=1,
+        ).pack(pady=(0, 10))
+
         Button(
             win,
             text="닫기",
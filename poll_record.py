@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# coding: utf-8
+#
+# poll_record.py
+#
+# 현장 상황 재현/벤치마크용 폴링 기록기와 재생기.
+#  - PollRecorder: 박스별 폴링 응답 레지스터 블록(FC03 응답 원본 값)과 폴링 완료/실패, 아날로그 mA 샘플을
+#    시각과 함께 작은 바이너리 파일에 남긴다 (경로가 .gz 로 끝나면 gzip).
+#  - PollReplayer: 기록을 ModbusUI/AnalogUI 의 같은 경로로 다시 넣는다
+#    (apply_poll_response → process_poll_fields → 변경 이벤트/로그/알람 판정/UI 메시지, AnalogUI.feed_sample).
+#    1배속, N배속, 또는 최대 속도(speed=0)로 재생하고 폴링 수/이벤트 수/처리 속도를 돌려준다.
+#
+#   POLL_RECORDER.start("field.rec.gz")
+#   stats = PollReplayer("field.rec.gz").replay(modbus_ui, analog_ui, speed=0)
+#
+#   python poll_record.py info field.rec.gz
+#   python poll_record.py replay field.rec.gz --speed 10
+#
+# 연결/끊김(재연결 스레드)은 기록하지 않는다. 끊김 중에는 폴링 기록이 비어 있을 뿐이다.
+
+import argparse
+import atexit
+import gzip
+import struct
+import threading
+import time
+from collections import Counter
+
+from pymodbus.register_read_message import ReadHoldingRegistersResponse
+
+from register_schema import ReadRequest
+
+MAGIC = b"GMSPOLL1"
+
+KIND_BLOCK = 1      # 레지스터 블록 1개 (start, regs, 능력 플래그)
+KIND_POLL = 2       # 폴링 1회 완료 → process_poll_fields
+KIND_FAIL = 3       # 폴링 실패 (예외 응답/무응답)
+KIND_ANALOG = 4     # 아날로그 mA 샘플 (필터 전)
+
+CAP_FW_STATUS = 0x01
+CAP_SENSOR_MODEL = 0x02
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+_HEADER = struct.Struct("<d")          # 기록 시작 시각 (time.time())
+_RECORD = struct.Struct("<dBH")        # 시작 후 경과(초), 종류, 박스 번호
+_BLOCK = struct.Struct("<HBB")         # 시작 주소(4xxxx), 레지스터 수, 능력 플래그
+_FAIL = struct.Struct("<B")
+_ANALOG = struct.Struct("<f")
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6)
+    return open(path, mode)
+
+
+class PollRecorder:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._started = 0.0
+        self._written = 0
+        self._max_bytes = DEFAULT_MAX_BYTES
+        self.counts = Counter()
+
+    def start(self, path, max_bytes=DEFAULT_MAX_BYTES) -> bool:
+        with self._lock:
+            self._close_locked()
+            try:
+                self._file = _open(path, "wb")
+                self._file.write(MAGIC + _HEADER.pack(time.time()))
+            except OSError as e:
+                print(f"[RECORD] 폴링 기록 파일을 열 수 없습니다: {path} ({e})")
+                self._file = None
+                return False
+            self.path = path
+            self._started = time.monotonic()
+            self._written = 0
+            self._max_bytes = max_bytes or DEFAULT_MAX_BYTES
+            self.counts = Counter()
+            self.enabled = True
+        print(f"[RECORD] 폴링 기록 시작: {path}")
+        return True
+
+    def stop(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._close_locked()
+        print(f"[RECORD] 폴링 기록 종료: {self.path} ({dict(self.counts)})")
+
+    def _close_locked(self):
+        self.enabled = False
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _write(self, kind, box_index, payload=b""):
+        now = time.monotonic()
+        with self._lock:
+            if self._file is None:
+                return
+            data = _RECORD.pack(now - self._started, kind, box_index) + payload
+            try:
+                self._file.write(data)
+            except (OSError, ValueError) as e:
+                print(f"[RECORD] 기록 실패 → 중지: {e}")
+                self._close_locked()
+                return
+            self._written += len(data)
+            self.counts[kind] += 1
+            if self._written >= self._max_bytes:
+                print(f"[RECORD] 기록 크기 {self._written // (1024 * 1024)}MB 도달 → 중지")
+                self._close_locked()
+
+    # 폴링 경로 ----------------------------------------------------------------
+    def block(self, box_index, start, regs, caps=0):
+        regs = regs[:255]
+        self._write(KIND_BLOCK, box_index, _BLOCK.pack(start, len(regs), caps) + struct.pack(f"<{len(regs)}H", *regs))
+
+    def poll(self, box_index):
+        self._write(KIND_POLL, box_index)
+
+    def failed(self, box_index, timeout=False):
+        self._write(KIND_FAIL, box_index, _FAIL.pack(1 if timeout else 0))
+
+    def analog(self, box_index, milliamp):
+        self._write(KIND_ANALOG, box_index, _ANALOG.pack(milliamp))
+
+
+POLL_RECORDER = PollRecorder()
+# gzip 파일은 닫아야 끝까지 읽힌다
+atexit.register(POLL_RECORDER.stop)
+
+
+def read_records(path):
+    """(경과 초, 종류, 박스, 내용) 를 기록 순서대로. 내용: BLOCK (start, caps, regs), FAIL timeout, ANALOG mA."""
+    with _open(path, "rb") as file:
+        head = file.read(len(MAGIC) + _HEADER.size)
+        if head[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"폴링 기록 파일이 아닙니다: {path}")
+        while True:
+            raw = file.read(_RECORD.size)
+            if len(raw) < _RECORD.size:
+                return
+            ts, kind, box_index = _RECORD.unpack(raw)
+            if kind == KIND_BLOCK:
+                raw = file.read(_BLOCK.size)
+                if len(raw) < _BLOCK.size:
+                    return
+                start, count, caps = _BLOCK.unpack(raw)
+                raw = file.read(2 * count)
+                if len(raw) < 2 * count:
+                    return
+                yield ts, kind, box_index, (start, caps, struct.unpack(f"<{count}H", raw))
+            elif kind == KIND_POLL:
+                yield ts, kind, box_index, None
+            elif kind == KIND_FAIL:
+                raw = file.read(_FAIL.size)
+                if len(raw) < _FAIL.size:
+                    return
+                yield ts, kind, box_index, bool(raw[0])
+            elif kind == KIND_ANALOG:
+                raw = file.read(_ANALOG.size)
+                if len(raw) < _ANALOG.size:
+                    return
+                yield ts, kind, box_index, _ANALOG.unpack(raw)[0]
+            else:
+                # 알 수 없는 종류: 이후는 해석할 수 없다 (잘린/손상된 파일)
+                return
+
+
+def recording_started(path) -> float:
+    """기록 시작 시각 (time.time())."""
+    with _open(path, "rb") as file:
+        head = file.read(len(MAGIC) + _HEADER.size)
+    if head[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"폴링 기록 파일이 아닙니다: {path}")
+    return _HEADER.unpack(head[len(MAGIC):])[0]
+
+
+class PollReplayer:
+    def __init__(self, path):
+        self.path = path
+        self._requests = {}
+
+    def _request_for(self, schema, start, count):
+        # 기록된 블록 → 같은 범위의 ReadRequest (스키마의 그룹 중 범위 안에 있는 것들로 디코딩)
+        key = (schema.name, id(schema), start, count)
+        request = self._requests.get(key)
+        if request is None:
+            groups = [g for g in schema.polled_groups() if g.start >= start and g.end <= start + count]
+            request = self._requests[key] = ReadRequest(start, count, groups)
+        return request
+
+    def replay(self, modbus_ui=None, analog_ui=None, speed=1.0, stop_flag=None) -> dict:
+        """
+        speed: 1 = 기록 속도, N = N배속, 0/None = 최대 속도.
+        박스 번호가 UI 박스 수를 넘는 기록은 건너뛴다.
+        """
+        stop_flag = stop_flag or threading.Event()
+        events = Counter()
+        stats = Counter()
+
+        def _count_event(event):
+            events[type(event).__name__] += 1
+
+        if modbus_ui is not None:
+            modbus_ui.device_events.subscribe(_count_event)
+        modbus_boxes = len(modbus_ui.box_states) if modbus_ui is not None else 0
+        analog_boxes = analog_ui.num_boxes if analog_ui is not None else 0
+        fresh = {}
+
+        started = time.monotonic()
+        try:
+            for ts, kind, box_index, payload in read_records(self.path):
+                if stop_flag.is_set():
+                    break
+                if speed:
+                    wait = started + ts / speed - time.monotonic()
+                    if wait > 0 and stop_flag.wait(wait):
+                        break
+                stats["records"] += 1
+
+                if kind == KIND_ANALOG:
+                    if box_index < analog_boxes:
+                        analog_ui.feed_sample(box_index, payload)
+                        stats["samples"] += 1
+                    continue
+                if box_index >= modbus_boxes:
+                    continue
+
+                if kind == KIND_BLOCK:
+                    start, caps, regs = payload
+                    fw_status = bool(caps & CAP_FW_STATUS)
+                    modbus_ui.device_table.set_capabilities(
+                        box_index, fw_status=fw_status, tftp=fw_status, sensor_model=bool(caps & CAP_SENSOR_MODEL)
+                    )
+                    plan = modbus_ui.read_plan(box_index)
+                    request = self._request_for(plan.schema, start, len(regs))
+                    response = ReadHoldingRegistersResponse(list(regs))
+                    fresh.setdefault(box_index, {}).update(modbus_ui.apply_poll_response(box_index, request, response))
+                    stats["blocks"] += 1
+                elif kind == KIND_POLL:
+                    modbus_ui.process_poll_fields(box_index, fresh.pop(box_index, {}))
+                    stats["polls"] += 1
+                elif kind == KIND_FAIL:
+                    fresh.pop(box_index, None)
+                    modbus_ui.poll_failed(box_index, payload)
+                    stats["failures"] += 1
+        finally:
+            if modbus_ui is not None:
+                modbus_ui.device_events.unsubscribe(_count_event)
+
+        elapsed = time.monotonic() - started
+        result = dict(stats)
+        result["events"] = dict(events)
+        result["elapsed"] = round(elapsed, 3)
+        result["polls_per_sec"] = round(stats["polls"] / elapsed, 1) if elapsed > 0 else None
+        return result
+
+
+def _info(path):
+    kinds = Counter()
+    boxes = Counter()
+    last = 0.0
+    for ts, kind, box_index, _ in read_records(path):
+        kinds[kind] += 1
+        if kind == KIND_POLL:
+            boxes[box_index] += 1
+        last = ts
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(recording_started(path)))
+    print(f"{path}: 시작 {started}, 길이 {last:.1f}s")
+    print(
+        f"  폴링 {kinds[KIND_POLL]} (블록 {kinds[KIND_BLOCK]}), 실패 {kinds[KIND_FAIL]}, "
+        f"아날로그 샘플 {kinds[KIND_ANALOG]}"
+    )
+    for box_index, polls in sorted(boxes.items()):
+        print(f"  box {box_index}: 폴링 {polls}")
+
+
+def _replay_with_ui(path, speed):
+    from tkinter import Tk
+
+    from analog_ui import AnalogUI
+    from modbus_ui import ModbusUI
+
+    modbus_boxes = 0
+    analog_boxes = 0
+    for _, kind, box_index, _ in read_records(path):
+        if kind == KIND_ANALOG:
+            analog_boxes = max(analog_boxes, box_index + 1)
+        else:
+            modbus_boxes = max(modbus_boxes, box_index + 1)
+
+    root = Tk()
+    root.withdraw()
+    modbus_ui = ModbusUI(root, modbus_boxes, {}, lambda active, idx: None) if modbus_boxes else None
+    analog_ui = AnalogUI(root, analog_boxes, {}, lambda active, idx: None) if analog_boxes else None
+    result = {}
+
+    def _worker():
+        result.update(PollReplayer(path).replay(modbus_ui, analog_ui, speed=speed))
+        root.after(0, root.quit)
+
+    threading.Thread(target=_worker, daemon=True).start()
+    root.mainloop()
+    print(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="폴링 기록 확인/재생")
+    parser.add_argument("command", choices=["info", "replay"])
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=0.0, help="재생 배속 (0 = 최대 속도, 1 = 기록 속도)")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        _info(args.path)
+    else:
+        _replay_with_ui(args.path, args.speed)
+
+
+if __name__ == "__main__":
+    main()
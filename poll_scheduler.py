@@ -0,0 +1,249 @@
+# poll_scheduler.py
+#
+# 박스별 폴링 주기를 상태에 따라 조절한다.
+#  - 경보/오류/상승 중/FW 업그레이드 중 → fast_interval
+#  - 값이 변하면 base_interval
+#  - stable_after 초 동안 변화가 없으면 max_interval 까지 점진적으로 늘림
+# 모든 박스의 초당 요청 수 합이 budget_rps 를 넘으면 급하지 않은 박스부터 늦춘다.
+#
+# DeadlineScheduler 는 그 주기로 다음 폴링 시각을 정한다. 폴링이 끝난 뒤 주기만큼 자면 실제 주기가
+# RTT/처리 시간만큼 늘어나고, 같은 순간 연결된 박스들은 계속 한꺼번에 폴링한다. 그래서 박스마다 주기 안의
+# 고정 위치(phase)를 주고 절대 시각 격자(epoch + (k + phase) × 주기)에 맞춰 폴링하며,
+# 놓친 마감과 시작 지연(jitter)을 박스별로 센다.
+
+import math
+import threading
+import time
+from collections import deque
+
+# 박스 번호 × 황금비의 소수 부분: 앞쪽 몇 개 박스만 연결돼도 주기 안에 고르게 흩어진다
+_GOLDEN = (math.sqrt(5.0) - 1.0) / 2.0
+JITTER_WINDOW = 256
+
+
+class _BoxRate:
+    __slots__ = ("desired", "urgent", "requests", "last_value", "last_status", "last_error",
+                 "last_change", "urgent_until")
+
+    def __init__(self, base_interval, now):
+        self.desired = base_interval
+        self.urgent = False
+        self.requests = 1
+        self.last_value = None
+        self.last_status = None
+        self.last_error = None
+        self.last_change = now
+        self.urgent_until = 0.0
+
+
+class AdaptivePollScheduler:
+    def __init__(self, base_interval=0.2, fast_interval=0.1, max_interval=2.0, stable_after=10.0,
+                 backoff=1.5, fast_hold=5.0, rise_ratio=0.005, budget_rps=None):
+        self.base_interval = base_interval
+        self.fast_interval = fast_interval
+        self.max_interval = max_interval
+        self.stable_after = stable_after
+        self.backoff = backoff
+        self.fast_hold = fast_hold
+        self.rise_ratio = rise_ratio
+        self.budget_rps = budget_rps
+
+        self._lock = threading.Lock()
+        self._boxes = {}
+        self._scale_urgent = 1.0
+        self._scale_rest = 1.0
+
+    def forget(self, box_index):
+        with self._lock:
+            self._boxes.pop(box_index, None)
+            self._rebalance()
+
+    def update(self, box_index, values, upgrading=False, request_count=1, full_scale=None, now=None):
+        """이번 폴링 결과를 반영하고 다음 폴링까지 기다릴 시간(초)을 돌려준다."""
+        if now is None:
+            now = time.monotonic()
+        value = values.get("value")
+        status = values.get("status")
+        error = values.get("error")
+
+        with self._lock:
+            st = self._boxes.get(box_index)
+            if st is None:
+                st = self._boxes[box_index] = _BoxRate(self.base_interval, now)
+
+            changed = value != st.last_value or status != st.last_status or error != st.last_error
+            rising = False
+            if st.last_value is not None and value is not None and value > st.last_value:
+                threshold = max(1, (full_scale or 0) * self.rise_ratio)
+                rising = value - st.last_value >= threshold
+
+            alarm = bool(values.get("alarm1")) or bool(values.get("alarm2")) or bool(error)
+            if alarm or rising or upgrading:
+                st.urgent_until = now + self.fast_hold
+
+            if changed:
+                st.last_change = now
+            st.last_value = value
+            st.last_status = status
+            st.last_error = error
+            st.requests = max(1, request_count)
+
+            st.urgent = now < st.urgent_until
+            if st.urgent:
+                st.desired = self.fast_interval
+            elif changed or now - st.last_change < self.stable_after:
+                st.desired = self.base_interval
+            else:
+                st.desired = min(self.max_interval, max(st.desired, self.base_interval) * self.backoff)
+
+            self._rebalance()
+            scale = self._scale_urgent if st.urgent else self._scale_rest
+            return st.desired * scale
+
+    def interval(self, box_index):
+        with self._lock:
+            st = self._boxes.get(box_index)
+            if st is None:
+                return self.base_interval
+            return st.desired * (self._scale_urgent if st.urgent else self._scale_rest)
+
+    def _rebalance(self):
+        self._scale_urgent = 1.0
+        self._scale_rest = 1.0
+        if not self.budget_rps:
+            return
+        urgent_rate = sum(b.requests / b.desired for b in self._boxes.values() if b.urgent)
+        rest_rate = sum(b.requests / b.desired for b in self._boxes.values() if not b.urgent)
+        if urgent_rate + rest_rate <= self.budget_rps:
+            return
+        # 급하지 않은 박스에 최소 10% 는 남겨 두고, 나머지는 급한 박스 먼저
+        rest_share = max(self.budget_rps - urgent_rate, self.budget_rps * 0.1)
+        if rest_rate > rest_share:
+            self._scale_rest = rest_rate / rest_share
+        urgent_share = self.budget_rps - rest_rate / self._scale_rest
+        if urgent_rate > urgent_share > 0:
+            self._scale_urgent = urgent_rate / urgent_share
+
+    def stats(self):
+        with self._lock:
+            total = sum(b.requests / (b.desired * (self._scale_urgent if b.urgent else self._scale_rest))
+                        for b in self._boxes.values())
+            return {
+                "requests_per_sec": total,
+                "urgent_boxes": sum(1 for b in self._boxes.values() if b.urgent),
+                "scale_urgent": self._scale_urgent,
+                "scale_rest": self._scale_rest,
+            }
+
+
+class _BoxDeadline:
+    __slots__ = ("due", "interval", "pending", "polls", "missed", "jitter")
+
+    def __init__(self):
+        self.due = None         # 다음 폴링 예정 시각 (monotonic)
+        self.interval = None
+        self.pending = False    # 예정 시각을 정했고 아직 폴링을 시작하지 않음
+        self.polls = 0
+        self.missed = 0
+        self.jitter = deque(maxlen=JITTER_WINDOW)   # 폴링 시작 - 예정 시각 (초)
+
+
+class DeadlineScheduler:
+    def __init__(self, epoch=None):
+        self.epoch = time.monotonic() if epoch is None else epoch
+        self._lock = threading.Lock()
+        self._boxes = {}
+
+    @staticmethod
+    def phase(box_index) -> float:
+        """주기 안에서 이 박스의 위치 (0 ~ 1)."""
+        return (box_index * _GOLDEN) % 1.0
+
+    def _slot_after(self, box_index, interval, t):
+        # t 보다 뒤의 첫 격자 시각
+        phase = self.phase(box_index)
+        k = math.floor((t - self.epoch) / interval - phase) + 1
+        return self.epoch + (k + phase) * interval
+
+    def next_delay(self, box_index, interval, now=None) -> float:
+        """주기 interval 로 다음 폴링 예정 시각을 정하고 그때까지 기다릴 시간(초)을 돌려준다."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            st = self._boxes.get(box_index)
+            if st is None:
+                st = self._boxes[box_index] = _BoxDeadline()
+            if st.due is None:
+                # 첫 폴링(연결 직후)은 바로 했으므로 반 주기 이상 지난 격자 시각부터
+                due = self._slot_after(box_index, interval, now + interval * 0.5)
+            else:
+                # 주기가 바뀌어도 격자에 맞추느라 간격이 반 주기보다 짧아지지 않게
+                due = self._slot_after(box_index, interval, st.due + interval * 0.5)
+                if due <= now:
+                    # 폴링이 주기보다 오래 걸려 마감을 놓침 → 밀린 폴링을 몰아서 하지 않고 다음 격자 시각으로
+                    late = self._slot_after(box_index, interval, now)
+                    st.missed += round((late - due) / interval)
+                    due = late
+            st.due = due
+            st.interval = interval
+            st.pending = True
+            return due - now
+
+    def defer(self, box_index, delay, now=None):
+        """점검 대기 등으로 예정보다 늦게 폴링할 때 (놓친 마감으로 세지 않는다)."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            st = self._boxes.get(box_index)
+            if st is not None and st.due is not None:
+                st.due = now + delay
+
+    def started(self, box_index, now=None):
+        """폴링 시작. 예정 시각을 정한 뒤 처음 시작한 폴링만 지연을 잰다."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            st = self._boxes.get(box_index)
+            # 파이프라인 경로는 이전에 보낸 폴링의 시각으로도 부르므로 예정보다 한참 이른 시각은 무시
+            if st is None or not st.pending or now < st.due - st.interval * 0.5:
+                return
+            st.pending = False
+            st.polls += 1
+            st.jitter.append(now - st.due)
+
+    def reset(self, box_index):
+        """폴링 실패/재연결: 다음 폴링부터 격자를 다시 잡는다 (통계는 유지)."""
+        with self._lock:
+            st = self._boxes.get(box_index)
+            if st is not None:
+                st.due = None
+                st.pending = False
+
+    def forget(self, box_index):
+        with self._lock:
+            self._boxes.pop(box_index, None)
+
+    def stats(self, box_index=None) -> dict:
+        """box_index 를 주면 그 박스의 dict, 아니면 {box_index: dict}."""
+        with self._lock:
+            if box_index is not None:
+                st = self._boxes.get(box_index)
+                return self._stats(box_index, st) if st is not None else {}
+            return {i: self._stats(i, st) for i, st in sorted(self._boxes.items())}
+
+    def _stats(self, box_index, st):
+        ordered = sorted(st.jitter)
+
+        def _ms(value):
+            return None if value is None else round(value * 1000.0, 1)
+
+        p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)] if ordered else None
+        return {
+            "phase": round(self.phase(box_index), 3),
+            "interval": st.interval,
+            "polls": st.polls,
+            "missed": st.missed,
+            "jitter_mean_ms": _ms(sum(ordered) / len(ordered) if ordered else None),
+            "jitter_p95_ms": _ms(p95),
+            "jitter_max_ms": _ms(ordered[-1] if ordered else None),
+        }
@@ -0,0 +1,103 @@
+# reconnect_supervisor.py
+#
+# 모든 박스의 재연결 간격을 한 곳에서 관리한다.
+#  - 지수 백오프 + 지터: 스위치 재부팅 후 모든 박스가 동시에 재시도하지 않도록
+#  - 상한(cap) 도달 후에도 포기하지 않고 낮은 빈도로 계속 시도 (background)
+#  - 박스별 끊김 → 복구까지 걸린 시간(time-to-recover) 통계 (누적 횟수/합/최대만 보관 - 오래 켜 두어도 늘지 않음)
+
+import random
+import threading
+import time
+
+
+class _Outage:
+    __slots__ = ("started", "attempts")
+
+    def __init__(self, now):
+        self.started = now
+        self.attempts = 0
+
+
+class _Recoveries:
+    __slots__ = ("count", "total", "last", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.last = elapsed
+        self.max = max(self.max, elapsed)
+
+
+class ReconnectSupervisor:
+    def __init__(self, initial_delay=1.0, factor=2.0, max_delay=30.0, jitter=0.5, fast_attempts=5, rng=None):
+        self.initial_delay = initial_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        # 이 횟수를 넘으면 UI 상 "백그라운드 재시도" 상태로 표시
+        self.fast_attempts = fast_attempts
+        self._rng = rng or random.Random()
+
+        self._lock = threading.Lock()
+        self._outages = {}
+        self._recoveries = {}
+
+    def begin(self, box_index, now=None):
+        with self._lock:
+            if box_index not in self._outages:
+                self._outages[box_index] = _Outage(time.monotonic() if now is None else now)
+
+    def next_delay(self, box_index):
+        """다음 재연결 시도까지 기다릴 시간(초). 시도 횟수를 1 올린다."""
+        with self._lock:
+            outage = self._outages.get(box_index)
+            if outage is None:
+                outage = self._outages[box_index] = _Outage(time.monotonic())
+            base = min(self.max_delay, self.initial_delay * (self.factor ** outage.attempts))
+            outage.attempts += 1
+        # base 의 (1 - jitter) ~ 100% 사이에서 무작위
+        return base * (1.0 - self.jitter * self._rng.random())
+
+    def attempts(self, box_index):
+        with self._lock:
+            outage = self._outages.get(box_index)
+            return outage.attempts if outage is not None else 0
+
+    def in_background(self, box_index):
+        return self.attempts(box_index) > self.fast_attempts
+
+    def recovered(self, box_index, now=None):
+        """복구 처리. (걸린 시간, 시도 횟수) 를 돌려주고 통계에 넣는다."""
+        with self._lock:
+            outage = self._outages.pop(box_index, None)
+            if outage is None:
+                return None
+            elapsed = (time.monotonic() if now is None else now) - outage.started
+            self._recoveries.setdefault(box_index, _Recoveries()).add(elapsed)
+            return elapsed, outage.attempts
+
+    def cancel(self, box_index):
+        with self._lock:
+            self._outages.pop(box_index, None)
+
+    def stats(self):
+        with self._lock:
+            out = {}
+            for box_index, rec in self._recoveries.items():
+                out[box_index] = {
+                    "recoveries": rec.count,
+                    "last": rec.last,
+                    "mean": rec.total / rec.count,
+                    "max": rec.max,
+                }
+            for box_index, outage in self._outages.items():
+                out.setdefault(box_index, {"recoveries": 0})
+                out[box_index]["down_for"] = time.monotonic() - outage.started
+                out[box_index]["attempts"] = outage.attempts
+            return out
@@ -0,0 +1,149 @@
+# register_cache.py
+#
+# 박스별 레지스터 캐시 (read-through, 구간별 TTL).
+# 폴링 루프가 읽은 블록을 그대로 넣어 두고, 설정 창/FW 업그레이드 같은 수시 읽기는 먼저 캐시를 본다.
+# TTL 안의 값이면 장비에 묻지 않고(폴링 슬롯을 쓰지 않음), 없거나 오래됐으면 fetch() 로 읽어 채운다.
+# 같은 박스/구간을 읽는 중이면 새로 보내지 않고 그 결과를 같이 기다린다 (in-flight 합치기).
+#
+#   regs = cache.read(box_index, 40088, 2, fetch)   # fetch() → 레지스터 목록 (실패하면 예외)
+#
+# TTL 이 정해지지 않은 레지스터는 캐시하지 않는다 (제어 레지스터 40091~40094 등 - 매번 장비에서 읽는다).
+
+import threading
+import time
+from concurrent.futures import Future
+
+from register_schema import (
+    BASE_ADDR,
+    GROUP_FW_STATUS,
+    GROUP_LIVE,
+    GROUP_SENSOR_MODEL,
+    GROUP_TFTP_IP,
+    GROUP_VERSION,
+    SENSOR_MODEL_PERIOD,
+    VERSION_PERIOD,
+)
+
+CACHE_REGS = 100            # 40001 ~ 40100
+
+LIVE_TTL = 1.0
+FW_STATUS_TTL = 1.0         # 업그레이드 중에는 매 사이클 바뀐다
+TFTP_IP_TTL = 300.0         # 이 패널이 쓸 때는 바로 갱신(store)하므로 길게
+
+# (레지스터 그룹, TTL 초)
+DEFAULT_TTLS = (
+    (GROUP_LIVE, LIVE_TTL),
+    (GROUP_VERSION, VERSION_PERIOD),
+    (GROUP_FW_STATUS, FW_STATUS_TTL),
+    (GROUP_SENSOR_MODEL, SENSOR_MODEL_PERIOD),
+    (GROUP_TFTP_IP, TFTP_IP_TTL),
+)
+
+READ_TIMEOUT = 10.0
+
+
+class RegisterReadError(Exception):
+    """장비가 예외/오류 응답을 보냄 (response 에 원래 응답)."""
+
+    def __init__(self, response):
+        super().__init__(str(response))
+        self.response = response
+
+
+class RegisterCache:
+    def __init__(self, num_boxes: int, ttls=DEFAULT_TTLS):
+        self._lock = threading.Lock()
+        # 레지스터별 TTL (None = 캐시 안 함)
+        self.ttl = [None] * CACHE_REGS
+        for group, ttl in ttls:
+            for reg in range(group.start, group.end):
+                self.ttl[reg - BASE_ADDR] = ttl
+        self._regs = [[0] * CACHE_REGS for _ in range(num_boxes)]
+        self._updated = [[None] * CACHE_REGS for _ in range(num_boxes)]
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _span(self, start, count):
+        offset = start - BASE_ADDR
+        return offset, min(offset + count, CACHE_REGS)
+
+    def update(self, box_index: int, start: int, regs, now=None):
+        """start(4xxxx) 부터 읽은(또는 쓴) 레지스터 블록 반영."""
+        now = time.monotonic() if now is None else now
+        offset, end = self._span(start, len(regs))
+        if offset < 0 or end <= offset:
+            return
+        with self._lock:
+            self._regs[box_index][offset:end] = regs[:end - offset]
+            self._updated[box_index][offset:end] = [now] * (end - offset)
+
+    def get(self, box_index: int, start: int, count: int, now=None):
+        """구간 전체가 TTL 안이면 레지스터 목록, 아니면 None."""
+        now = time.monotonic() if now is None else now
+        offset, end = self._span(start, count)
+        if offset < 0 or end - offset != count:
+            return None
+        with self._lock:
+            updated = self._updated[box_index]
+            for k in range(offset, end):
+                ttl = self.ttl[k]
+                if ttl is None or updated[k] is None or now - updated[k] > ttl:
+                    return None
+            return self._regs[box_index][offset:end]
+
+    def known(self, box_index: int, start: int, end: int, now=None) -> dict:
+        """[start, end) 중 TTL 안의 레지스터 {4xxxx: 값} (쓰기 합칠 때 빈 곳 채우기용)."""
+        now = time.monotonic() if now is None else now
+        offset, stop = self._span(start, end - start)
+        out = {}
+        with self._lock:
+            regs = self._regs[box_index]
+            updated = self._updated[box_index]
+            for k in range(max(0, offset), stop):
+                ttl = self.ttl[k]
+                if ttl is not None and updated[k] is not None and now - updated[k] <= ttl:
+                    out[BASE_ADDR + k] = regs[k]
+        return out
+
+    def invalidate(self, box_index: int, start=None, count=None):
+        """start 를 안 주면 박스 전체 (연결 해제/재연결, 외부 도구의 쓰기)."""
+        offset, end = (0, CACHE_REGS) if start is None else self._span(start, count)
+        with self._lock:
+            self._updated[box_index][max(0, offset):end] = [None] * max(0, end - max(0, offset))
+
+    def read(self, box_index: int, start: int, count: int, fetch, timeout=READ_TIMEOUT) -> list:
+        """캐시에 있으면 바로, 없으면 fetch() 로 읽어 채운다. 같은 구간을 읽는 중이면 그 결과를 기다린다."""
+        regs = self.get(box_index, start, count)
+        key = (box_index, start, count)
+        with self._lock:
+            if regs is not None:
+                self.hits += 1
+                return regs
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result(timeout=timeout)
+
+        try:
+            regs = list(fetch())
+            self.update(box_index, start, regs)
+            future.set_result(regs)
+            return regs
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+                    "inflight": len(self._inflight)}
@@ -0,0 +1,291 @@
+# register_schema.py
+#
+# ASGD3000/3200/3210 레지스터 맵을 데이터로 기술하고, 주기(refresh)별로 묶인 그룹을
+# 최소 개수의 FC03 요청으로 합쳐(coalesce) 읽는 read-plan 으로 컴파일한다.
+# 디코딩은 그룹/요청 단위로 미리 만들어 둔 itemgetter + 비트필드 테이블로 수행한다.
+
+import struct
+import time
+from operator import itemgetter
+
+from pymodbus.exceptions import ModbusIOException
+
+BASE_ADDR = 40001
+
+REG_STATUS = 40001
+REG_VALUE = 40005
+REG_ERROR = 40008         # 오류 비트: 기존 코드와 동일하게 raw_regs[7]
+REG_BAR = 40011
+REG_VERSION = 40022
+REG_FW_STATUS = 40023
+REG_FW_PROGRESS = 40024
+REG_SENSOR_MODEL = 40030
+REG_TFTP_IP = 40088
+REG_FW_CTRL = 40091
+REG_ZERO = 40092
+REG_RESET = 40093
+REG_MODEL_SELECT = 40094
+
+# 요청 1건의 고정 비용(MBAP+PDU 헤더, TCP/IP 헤더, ACK)이 레지스터 수십 개 분량이므로
+# 이 정도 간격까지는 사이를 같이 읽는 편이 왕복 1회 추가보다 싸다.
+DEFAULT_MAX_GAP = 16
+
+EVERY_CYCLE = 0.0
+
+
+def reg_addr(addr_4xxxx: int) -> int:
+    return addr_4xxxx - BASE_ADDR
+
+
+class Field:
+    __slots__ = ("name", "reg", "kind", "bit", "width", "count")
+
+    def __init__(self, name, reg, kind="u16", bit=0, width=16, count=1):
+        self.name = name
+        self.reg = reg
+        self.kind = kind    # "u16" | "bits" | "ascii"
+        self.bit = bit
+        self.width = width
+        self.count = count
+
+
+def u16(name, reg):
+    return Field(name, reg)
+
+
+def bits(name, reg, bit, width=1):
+    return Field(name, reg, kind="bits", bit=bit, width=width)
+
+
+def ascii_block(name, reg, count):
+    return Field(name, reg, kind="ascii", count=count)
+
+
+class RegisterGroup:
+    """
+    한 번에 읽는 연속 레지스터 묶음.
+    period: 초 단위 갱신 주기 (0 = 매 사이클, None = 폴링하지 않음/요청 시에만)
+    fast_when_upgrading: FW 업그레이드 중에는 매 사이클 읽는다.
+    """
+
+    def __init__(self, name, start, count, fields, period=EVERY_CYCLE, fast_when_upgrading=False):
+        self.name = name
+        self.start = start
+        self.count = count
+        self.fields = fields
+        self.period = period
+        self.fast_when_upgrading = fast_when_upgrading
+
+    @property
+    def end(self):
+        return self.start + self.count
+
+
+class DeviceSchema:
+    def __init__(self, name, groups, unreadable=(), max_gap=DEFAULT_MAX_GAP):
+        self.name = name
+        self.groups = list(groups)
+        self.group_by_name = {g.name: g for g in self.groups}
+        # 읽으면 IllegalAddress 가 날 수 있는 구간 [start, end) (4xxxx) - 합칠 때 건너뛰지 않는다
+        self.unreadable = list(unreadable)
+        self.max_gap = max_gap
+
+    def polled_groups(self):
+        return [g for g in self.groups if g.period is not None]
+
+    def has_group(self, name):
+        return name in self.group_by_name
+
+    def _gap_readable(self, start, end):
+        return all(end <= u_start or start >= u_end for u_start, u_end in self.unreadable)
+
+    def coalesce(self, groups):
+        """시작 주소 순으로 정렬 후 간격이 max_gap 이하이고 읽기 가능한 구간이면 합친다."""
+        runs = []
+        for g in sorted(groups, key=lambda x: x.start):
+            if runs:
+                last = runs[-1]
+                gap_start = last[0] + last[1]
+                if g.start - gap_start <= self.max_gap and self._gap_readable(gap_start, g.start):
+                    new_end = max(gap_start, g.end)
+                    runs[-1] = (last[0], new_end - last[0], last[2] + [g])
+                    continue
+            runs.append((g.start, g.count, [g]))
+        return [ReadRequest(start, count, members) for start, count, members in runs]
+
+
+class ReadRequest:
+    """FC03 요청 1건 + 미리 컴파일된 디코더."""
+
+    __slots__ = ("start", "count", "address", "groups", "group_names", "_getter", "_word_fields", "_ascii_fields")
+
+    def __init__(self, start, count, groups):
+        self.start = start
+        self.count = count
+        self.address = reg_addr(start)
+        self.groups = groups
+        self.group_names = tuple(g.name for g in groups)
+
+        words = []
+        ascii_fields = []
+        for g in groups:
+            for f in g.fields:
+                idx = f.reg - start
+                if f.kind == "ascii":
+                    ascii_fields.append((f.name, idx, f.count, struct.Struct(f">{f.count}H")))
+                elif f.kind == "bits":
+                    words.append((f.name, idx, f.bit, (1 << f.width) - 1))
+                else:
+                    words.append((f.name, idx, 0, 0xFFFF))
+
+        self._word_fields = tuple((name, shift, mask) for name, _, shift, mask in words)
+        indices = [idx for _, idx, _, _ in words]
+        if len(indices) == 1:
+            only = indices[0]
+            self._getter = lambda regs: (regs[only],)
+        elif indices:
+            self._getter = itemgetter(*indices)
+        else:
+            self._getter = lambda regs: ()
+        self._ascii_fields = tuple(ascii_fields)
+
+    def decode(self, regs):
+        if len(regs) < self.count:
+            raise ModbusIOException("Too few regs")
+        out = {}
+        for (name, shift, mask), word in zip(self._word_fields, self._getter(regs)):
+            out[name] = (word >> shift) & mask
+        for name, idx, count, packer in self._ascii_fields:
+            raw = packer.pack(*regs[idx:idx + count])
+            out[name] = raw.decode("ascii", errors="ignore").replace("\x00", "").strip()
+        return out
+
+    def __repr__(self):
+        return f"ReadRequest({self.start}+{self.count} {'/'.join(self.group_names)})"
+
+
+class ReadPlan:
+    """
+    박스 1개의 폴링 계획. 그룹별 마지막 읽은 시각을 기억하고, 이번 사이클에 필요한 그룹들의
+    조합마다 컴파일된 요청 목록을 캐시한다.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.groups = schema.polled_groups()
+        self.last_read = {g.name: None for g in self.groups}
+        self.values = {}
+        self._compiled = {}
+
+    def due_groups(self, now, upgrading=False):
+        due = []
+        for g in self.groups:
+            last = self.last_read[g.name]
+            if last is None or g.period == EVERY_CYCLE or (upgrading and g.fast_when_upgrading):
+                due.append(g)
+            elif now - last >= g.period:
+                due.append(g)
+        return due
+
+    def due_requests(self, now=None, upgrading=False):
+        if now is None:
+            now = time.monotonic()
+        due = self.due_groups(now, upgrading)
+        key = tuple(g.name for g in due)
+        requests = self._compiled.get(key)
+        if requests is None:
+            requests = self.schema.coalesce(due)
+            self._compiled[key] = requests
+        return requests
+
+    def apply(self, request, regs, now=None):
+        """요청 1건의 응답을 디코딩해 누적 값(values)에 반영하고, 이번에 갱신된 필드만 돌려준다."""
+        if now is None:
+            now = time.monotonic()
+        decoded = request.decode(regs)
+        self.values.update(decoded)
+        for name in request.group_names:
+            self.last_read[name] = now
+        return decoded
+
+    def mark_unsupported(self, group_name):
+        """그룹 읽기 실패 시 해당 그룹을 제외한 스키마로 다시 컴파일."""
+        if not self.schema.has_group(group_name):
+            return
+        groups = [g for g in self.schema.groups if g.name != group_name]
+        self.schema = DeviceSchema(self.schema.name, groups, self.schema.unreadable, self.schema.max_gap)
+        self.groups = self.schema.polled_groups()
+        self.last_read.pop(group_name, None)
+        self._compiled = {}
+
+
+# -----------------------------------------------------------------------------
+# 모델별 레지스터 맵
+# -----------------------------------------------------------------------------
+FW_IDLE_PERIOD = 30.0
+VERSION_PERIOD = 10.0
+SENSOR_MODEL_PERIOD = 30.0
+
+GROUP_LIVE = RegisterGroup(
+    "live",
+    REG_STATUS,
+    REG_BAR - REG_STATUS + 1,
+    [
+        u16("status", REG_STATUS),
+        bits("alarm1", REG_STATUS, 6),
+        bits("alarm2", REG_STATUS, 7),
+        u16("value", REG_VALUE),
+        u16("error", REG_ERROR),
+        u16("bar", REG_BAR),
+    ],
+)
+GROUP_VERSION = RegisterGroup("version", REG_VERSION, 1, [u16("version", REG_VERSION)], period=VERSION_PERIOD)
+GROUP_FW_STATUS = RegisterGroup(
+    "fw_status",
+    REG_FW_STATUS,
+    2,
+    [u16("fw_status", REG_FW_STATUS), u16("fw_progress", REG_FW_PROGRESS)],
+    period=FW_IDLE_PERIOD,
+    fast_when_upgrading=True,
+)
+GROUP_SENSOR_MODEL = RegisterGroup(
+    "sensor_model", REG_SENSOR_MODEL, 4, [ascii_block("sensor_model", REG_SENSOR_MODEL, 4)], period=SENSOR_MODEL_PERIOD
+)
+GROUP_TFTP_IP = RegisterGroup(
+    "tftp_ip", REG_TFTP_IP, 2, [u16("tftp_ip_hi", REG_TFTP_IP), u16("tftp_ip_lo", REG_TFTP_IP + 1)], period=None
+)
+
+# 40025~40029 는 장비에 따라 IllegalAddress → 40030 블록과 합쳐 읽지 않는다.
+_UNREADABLE_3200 = [(40025, 40030), (40034, REG_TFTP_IP)]
+
+SCHEMAS = {
+    "ASGD3000": DeviceSchema("ASGD3000", [GROUP_LIVE, GROUP_VERSION], unreadable=[(40023, REG_MODEL_SELECT + 1)]),
+    "ASGD3200": DeviceSchema(
+        "ASGD3200", [GROUP_LIVE, GROUP_VERSION, GROUP_FW_STATUS, GROUP_TFTP_IP], unreadable=_UNREADABLE_3200
+    ),
+    "ASGD3210": DeviceSchema(
+        "ASGD3210",
+        [GROUP_LIVE, GROUP_VERSION, GROUP_FW_STATUS, GROUP_SENSOR_MODEL, GROUP_TFTP_IP],
+        unreadable=_UNREADABLE_3200,
+    ),
+}
+
+
+def schema_for_capabilities(fw_status_supported: bool, sensor_model_supported: bool) -> DeviceSchema:
+    if not fw_status_supported:
+        return SCHEMAS["ASGD3000"]
+    if sensor_model_supported:
+        return SCHEMAS["ASGD3210"]
+    return SCHEMAS["ASGD3200"]
+
+
+def decode_ip(hi: int, lo: int) -> str:
+    return f"{(hi >> 8) & 0xFF}.{hi & 0xFF}.{(lo >> 8) & 0xFF}.{lo & 0xFF}"
+
+
+def regs_to_ascii(regs) -> str:
+    b = bytearray()
+    for w in regs:
+        b.append((w >> 8) & 0xFF)
+        b.append(w & 0xFF)
+    return b.decode("ascii", errors="ignore").replace("\x00", "").strip()
@@ -24,6 +24,9 @@ selected_audio_file = None
 
 on_fw_file_all = None
 on_fw_upgrade_all = None
+on_discover = None
+on_bulk_commands = None
+on_traffic_dump = None
 
 def initialize_globals(main_root, change_branch_func):
     global root, change_branch
@@ -247,6 +250,9 @@ def show_settings():
 
     Button(settings_window, text="FW 파일 전체 적용", command=lambda: _call(on_fw_file_all), **button_style).pack(pady=5)
     Button(settings_window, text="전체 FW 업데이트", command=lambda: _call(on_fw_upgrade_all), **button_style).pack(pady=5)
+    Button(settings_window, text="검지기 자동 검색", command=lambda: _call(on_discover), **button_style).pack(pady=5)
+    Button(settings_window, text="일괄 명령", command=lambda: _call(on_bulk_commands), **button_style).pack(pady=5)
+    Button(settings_window, text="통신 기록 저장", command=lambda: _call(on_traffic_dump), **button_style).pack(pady=5)
 
     frame1 = Frame(settings_window)
     frame1.pack(pady=5)
@@ -0,0 +1,91 @@
+# test_command_queue.py
+#
+# DeviceCommandQueue 의 우선순위/순서, 취소된 명령 건너뛰기, 연결 종료 시 실패 처리.
+#   python -m pytest -q test_command_queue.py
+
+import threading
+import time
+
+import pytest
+from pymodbus.exceptions import ConnectionException
+
+from command_queue import PRIORITY_COMMAND, PRIORITY_READ, DeviceCommandQueue
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def write_register(self, address, value):
+        self.calls.append(("write_register", address, value))
+        return value
+
+    def read_holding_registers(self, address, count):
+        self.calls.append(("read_holding_registers", address, count))
+        return [0] * count
+
+    def fail(self):
+        raise ConnectionException("boom")
+
+
+def test_commands_run_before_reads_in_submit_order():
+    queue = DeviceCommandQueue()
+    client = FakeClient()
+    read = queue.submit("read_holding_registers", 87, 2, priority=PRIORITY_READ)
+    zero = queue.submit("write_register", 91, 1)
+    reset = queue.submit("write_register", 92, 1, priority=PRIORITY_COMMAND)
+    assert queue.run_pending(client) == 3
+    assert client.calls == [
+        ("write_register", 91, 1),
+        ("write_register", 92, 1),
+        ("read_holding_registers", 87, 2),
+    ]
+    assert (zero.result(), reset.result(), read.result()) == (1, 1, [0, 0])
+
+
+def test_cancelled_command_is_skipped():
+    queue = DeviceCommandQueue()
+    client = FakeClient()
+    cancelled = queue.submit("write_register", 91, 1)
+    kept = queue.submit("write_register", 92, 1)
+    assert cancelled.cancel()
+    assert queue.run_pending(client) == 1
+    assert client.calls == [("write_register", 92, 1)]
+    assert kept.done() and cancelled.cancelled()
+
+
+def test_client_exception_goes_to_future():
+    queue = DeviceCommandQueue()
+    future = queue.submit("fail")
+    queue.run_pending(FakeClient())
+    with pytest.raises(ConnectionException):
+        future.result(timeout=0)
+
+
+def test_close_fails_pending_and_later_commands():
+    queue = DeviceCommandQueue()
+    pending = queue.submit("write_register", 91, 1)
+    queue.close("Socket is closed")
+    later = queue.submit("write_register", 92, 1)
+    for future in (pending, later):
+        with pytest.raises(ConnectionException):
+            future.result(timeout=0)
+    assert len(queue) == 0
+
+
+def test_idle_runs_command_submitted_while_waiting():
+    queue = DeviceCommandQueue()
+    client = FakeClient()
+    timer = threading.Timer(0.05, queue.submit, args=("write_register", 91, 1))
+    timer.start()
+    queue.idle(client, 0.3)
+    timer.join()
+    assert client.calls == [("write_register", 91, 1)]
+
+
+def test_interrupt_ends_idle_early():
+    queue = DeviceCommandQueue()
+    threading.Timer(0.05, queue.interrupt).start()
+    start = time.monotonic()
+    queue.idle(FakeClient(), 5.0)
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,96 @@
+# test_device_table.py
+#
+# DeviceStateTable: 폴링 기록(record), 응답 대기 기한 초과 → 통신 이상(mark_stale), 상태 비트 풀기.
+#   python -m pytest -q test_device_table.py
+
+import numpy as np
+
+from device_table import CONN_LOST, CONN_OFFLINE, CONN_ONLINE, CONN_STALE, NO_VERSION, DeviceStateTable
+
+
+def poll_values(status=0, value=0, error=0, bar=0, version=None):
+    values = {"status": status, "value": value, "error": error, "bar": bar}
+    if version is not None:
+        values["version"] = version
+    return values
+
+
+def test_record_returns_previous_connection():
+    table = DeviceStateTable(2)
+    assert table.record(0, poll_values(value=120, version=7), now=1.0) == CONN_OFFLINE
+    assert table.record(0, poll_values(value=121), now=2.0) == CONN_ONLINE
+    snap = table.snapshot()
+    assert snap.connection[0] == CONN_ONLINE and snap.value[0] == 121
+    assert snap.version[0] == NO_VERSION and snap.updated[0] == 2.0
+    assert snap.connection[1] == CONN_OFFLINE
+
+
+def test_begin_poll_keeps_oldest_outstanding_request():
+    table = DeviceStateTable(1)
+    table.begin_poll(0, now=10.0)
+    table.begin_poll(0, now=10.5)
+    assert table.waited(0, now=11.0) == 1.0
+    table.record(0, poll_values(), now=11.0)
+    assert table.waited(0, now=11.0) is None
+
+
+def test_mark_stale_only_online_boxes_waiting_past_bound():
+    table = DeviceStateTable(4)
+    for box in range(3):
+        table.record(box, poll_values(), now=0.0)
+    table.begin_poll(0, now=1.0)        # 1.0초 대기 → 통신 이상
+    table.begin_poll(1, now=1.5)        # 0.5초 대기 → 아직 정상
+    # 2 는 기다리는 폴링 없음, 3 은 연결 안 됨
+    table.begin_poll(3, now=0.0)
+    assert table.mark_stale(0.8, now=2.0).tolist() == [0]
+    assert table.mark_stale(0.8, now=2.0).tolist() == []       # 새로 바뀐 박스만 돌려준다
+    assert table.snapshot().connection.tolist() == [CONN_STALE, CONN_ONLINE, CONN_ONLINE, CONN_OFFLINE]
+
+
+def test_mark_stale_per_box_bounds():
+    table = DeviceStateTable(2)
+    for box in range(2):
+        table.record(box, poll_values(), now=0.0)
+        table.begin_poll(box, now=1.0)
+    # 박스 1 은 원래 느린 장비 (RTT 기한 2초)
+    assert table.mark_stale([0.8, 2.0], now=2.0).tolist() == [0]
+
+
+def test_late_reply_reports_stale_then_online():
+    table = DeviceStateTable(1)
+    table.record(0, poll_values(), now=0.0)
+    table.begin_poll(0, now=1.0)
+    table.mark_stale(0.8, now=2.0)
+    assert table.record(0, poll_values(), now=2.5) == CONN_STALE
+    assert table.snapshot().connection[0] == CONN_ONLINE
+
+
+def test_clear_drops_values_and_waiting_poll():
+    table = DeviceStateTable(1)
+    table.record(0, poll_values(status=1 << 7, value=500), now=0.0)
+    table.begin_poll(0, now=1.0)
+    table.clear(0, CONN_LOST)
+    snap = table.snapshot()
+    assert snap.value[0] == 0 and not snap.alarm2[0]
+    assert snap.connection[0] == CONN_LOST and np.isnan(snap.waiting_since[0])
+    assert table.mark_stale(0.0, now=5.0).tolist() == []
+
+
+def test_alarm_bits_decoded_for_all_boxes():
+    table = DeviceStateTable(3)
+    table.record(0, poll_values(status=1 << 6), now=0.0)
+    table.record(1, poll_values(status=(1 << 6) | (1 << 7)), now=0.0)
+    table.record(2, poll_values(status=0), now=0.0)
+    assert table.alarm_state(1) == (True, True)
+    snap = table.snapshot()
+    assert snap.alarm1.tolist() == [True, True, False]
+    assert snap.in_alarm().nonzero()[0].tolist() == [0, 1]
+
+
+def test_disconnect_count_and_capabilities():
+    table = DeviceStateTable(1)
+    assert [table.note_disconnect(0) for _ in range(3)] == [1, 2, 3]
+    table.reset_disconnects(0)
+    assert table.snapshot().disconnects[0] == 0
+    table.set_capabilities(0, fw_status=False, tftp=False)
+    assert table.capabilities(0) == {"fw_status": False, "tftp": False, "sensor_model": False}
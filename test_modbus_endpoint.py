@@ -0,0 +1,111 @@
+# test_modbus_endpoint.py
+#
+# 게이트웨이 하나(ModbusEndpoint)를 여러 유닛이 함께 쓸 때, 한 유닛의 늦은/없는 응답이 연결을 닫지 않는지.
+# 로컬 소켓에 유닛별 응답 지연을 흉내 내는 가짜 RS-485 게이트웨이를 띄운다.
+#   python -m pytest -q test_modbus_endpoint.py
+
+import socket
+import struct
+import threading
+import time
+
+import pytest
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+
+from modbus_endpoint import EndpointPool
+
+MBAP = struct.Struct(">HHHB")
+FAST, SLOW_EXCEPTION, SILENT, LATE, HANG_UP = 1, 2, 3, 4, 5
+
+
+class FakeGateway:
+    """유닛 1 즉시 응답, 2 는 0.6초 뒤 0x0B, 3 무응답, 4 는 0.8초 뒤 응답, 5 는 연결을 끊는다."""
+
+    def __init__(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+        self.connections = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                head = conn.recv(MBAP.size)
+                if len(head) < MBAP.size:
+                    return
+                tid, _, length, unit = MBAP.unpack(head)
+                pdu = conn.recv(length - 1)
+                if unit == HANG_UP:
+                    return
+                if unit == SILENT:
+                    continue
+                if unit == SLOW_EXCEPTION:
+                    time.sleep(0.6)
+                    reply = bytes((pdu[0] | 0x80, 0x0B))
+                else:
+                    if unit == LATE:
+                        time.sleep(0.8)
+                    count = struct.unpack(">H", pdu[3:5])[0]
+                    reply = bytes((3, count * 2)) + struct.pack(f">{count}H", *([unit] * count))
+                conn.sendall(MBAP.pack(tid, 0, len(reply) + 1, unit) + reply)
+
+    def close(self):
+        self.server.close()
+
+
+@pytest.fixture
+def gateway():
+    gw = FakeGateway()
+    yield gw
+    gw.close()
+
+
+def unit_clients(gateway, *units, timeout=3):
+    pool = EndpointPool(timeout=timeout)
+    clients = [pool.unit_client("127.0.0.1", gateway.port, unit) for unit in units]
+    assert clients[0].connect()
+    return clients
+
+
+def test_slow_unit_exception_keeps_shared_socket_open(gateway):
+    u1, u2 = unit_clients(gateway, FAST, SLOW_EXCEPTION)
+    assert u1.read_holding_registers(0, 2).registers == [FAST, FAST]
+    response = u2.read_holding_registers(0, 2)
+    assert isinstance(response, ExceptionResponse) and response.exception_code == 0x0B
+    assert u1.is_socket_open() and u2.is_socket_open()
+    assert u1.read_holding_registers(0, 2).registers == [FAST, FAST]
+    assert gateway.connections == 1
+
+
+def test_silent_unit_does_not_close_shared_socket(gateway):
+    u1, u3 = unit_clients(gateway, FAST, SILENT, timeout=0.3)
+    assert isinstance(u3.read_holding_registers(0, 2), ModbusIOException)
+    assert u1.is_socket_open()
+    assert u1.read_holding_registers(0, 2).registers == [FAST, FAST]
+    assert gateway.connections == 1
+
+
+def test_late_reply_is_discarded_before_next_request(gateway):
+    u1, u4 = unit_clients(gateway, FAST, LATE, timeout=0.3)
+    assert isinstance(u4.read_holding_registers(0, 2), ModbusIOException)
+    time.sleep(0.7)     # 유닛 4 의 늦은 응답이 소켓에 도착
+    assert u1.is_socket_open()
+    assert u1.read_holding_registers(0, 2).registers == [FAST, FAST]
+
+
+def test_connection_error_closes_endpoint(gateway):
+    u1, u5 = unit_clients(gateway, FAST, HANG_UP)
+    assert isinstance(u5.read_holding_registers(0, 2), ModbusIOException)
+    assert not u1.is_socket_open()
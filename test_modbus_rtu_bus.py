@@ -0,0 +1,80 @@
+# test_modbus_rtu_bus.py
+#
+# RS-485 직결 버스(RtuBus) 하나를 여러 유닛이 함께 쓸 때, 한 유닛의 무응답이 포트를 닫지 않고
+# 포트 오류(USB 어댑터 분리)만 버스 전체를 끊김으로 만드는지.
+# 시리얼 포트 자리에 유닛별 응답을 흉내 내는 가짜 포트를 넣는다.
+#   python -m pytest -q test_modbus_rtu_bus.py
+
+import struct
+
+import pytest
+import serial
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.message.rtu import MessageRTU
+
+from modbus_endpoint import EndpointPool
+
+FAST, SILENT = 1, 3
+
+
+class FakeSerialPort:
+    """유닛 1 은 바로 응답, 3 은 무응답. unplugged 면 쓰기에서 SerialException."""
+
+    def __init__(self):
+        self.is_open = True
+        self.unplugged = False
+        self._rx = b""
+
+    @property
+    def in_waiting(self):
+        return len(self._rx)
+
+    def write(self, frame):
+        if self.unplugged:
+            raise serial.SerialException("device reports readiness to read but returned no data")
+        unit = frame[0]
+        if unit == FAST:
+            count = struct.unpack(">H", frame[4:6])[0]
+            pdu = bytes((unit, 3, count * 2)) + struct.pack(f">{count}H", *([unit] * count))
+            self._rx += pdu + MessageRTU.compute_CRC(pdu).to_bytes(2, "big")
+        return len(frame)
+
+    def read(self, size):
+        data, self._rx = self._rx[:size], self._rx[size:]
+        return data
+
+    def reset_input_buffer(self):
+        self._rx = b""
+
+    def close(self):
+        self.is_open = False
+
+
+@pytest.fixture
+def port(monkeypatch):
+    fake = FakeSerialPort()
+    monkeypatch.setattr(serial, "serial_for_url", lambda *args, **kwargs: fake)
+    return fake
+
+
+def unit_clients(*units):
+    pool = EndpointPool()
+    clients = [pool.unit_client("/dev/ttyFAKE0", 19200, unit) for unit in units]
+    assert clients[0].connect()
+    return clients
+
+
+def test_silent_unit_keeps_bus_open(port):
+    u1, u3 = unit_clients(FAST, SILENT)
+    assert u1.read_holding_registers(0, 2).registers == [FAST, FAST]
+    assert isinstance(u3.read_holding_registers(0, 2), ModbusIOException)
+    assert u1.is_socket_open() and u3.is_socket_open()
+    assert port.is_open
+    assert u1.read_holding_registers(0, 2).registers == [FAST, FAST]
+
+
+def test_port_error_closes_bus(port):
+    u1, u3 = unit_clients(FAST, SILENT)
+    port.unplugged = True
+    assert isinstance(u1.read_holding_registers(0, 2), ModbusIOException)
+    assert not u1.is_socket_open() and not u3.is_socket_open()
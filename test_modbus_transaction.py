@@ -0,0 +1,85 @@
+# test_modbus_transaction.py
+#
+# WriteTransaction 의 FC23 시험 처리 (가짜 run 으로 장비 응답을 흉내 낸다).
+#   python -m pytest -q test_modbus_transaction.py
+
+import pytest
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse, ModbusExceptions
+from pymodbus.register_read_message import ReadHoldingRegistersResponse, ReadWriteMultipleRegistersResponse
+from pymodbus.register_write_message import WriteMultipleRegistersResponse, WriteSingleRegisterResponse
+
+from modbus_transaction import WriteTransaction
+
+TFTP_IP = [0xC0A8, 0x0164]      # 192.168.1.100
+
+
+class FakeDevice:
+    """run(method, *args) 자리에 넣는다. fc23 에 FC23 응답(또는 만드는 함수)을 준다."""
+
+    def __init__(self, fc23):
+        self.fc23 = fc23
+        self.calls = []
+
+    def __call__(self, method, *args):
+        self.calls.append((method,) + args)
+        if method == "readwrite_registers":
+            return self.fc23(*args) if callable(self.fc23) else self.fc23
+        if method == "write_registers":
+            return WriteMultipleRegistersResponse(args[0], len(args[1]))
+        if method == "write_register":
+            return WriteSingleRegisterResponse(args[0], args[1])
+        if method == "read_holding_registers":
+            return ReadHoldingRegistersResponse(TFTP_IP)
+        raise AssertionError(method)
+
+    def methods(self):
+        return [call[0] for call in self.calls]
+
+
+def fw_start_tx():
+    return WriteTransaction().write(40088, TFTP_IP).write(40091, 1).confirm(40088, 2, fallback_read=False)
+
+
+def test_fc23_confirms_in_same_round_trip():
+    device = FakeDevice(lambda *args: ReadWriteMultipleRegistersResponse(TFTP_IP))
+    result = fw_start_tx().execute(device)
+    assert result.ok and result.fc23 is True
+    assert result.confirmed == TFTP_IP
+    assert result.wrote(40091)
+    assert device.methods() == ["write_registers", "readwrite_registers"]
+
+
+def test_illegal_function_falls_back_to_fc06():
+    device = FakeDevice(ExceptionResponse(0x17, ModbusExceptions.IllegalFunction))
+    result = fw_start_tx().execute(device)
+    assert result.ok and result.fc23 is False
+    assert result.wrote(40091)
+    assert device.methods() == ["write_registers", "readwrite_registers", "write_register"]
+
+
+@pytest.mark.parametrize("response", [ModbusIOException("No Response received from the remote slave"), None])
+def test_no_response_probe_is_not_resent(response):
+    device = FakeDevice(response)
+    with pytest.raises(ModbusIOException):
+        fw_start_tx().execute(device)
+    # FW 시작(40091)은 FC23 으로 한 번만 나갔다 - FC06 으로 다시 보내지 않는다
+    assert device.methods() == ["write_registers", "readwrite_registers"]
+
+
+def test_no_response_probe_leaves_fc23_unknown():
+    device = FakeDevice(ModbusIOException("No Response received from the remote slave"))
+    tx = fw_start_tx()
+    with pytest.raises(ModbusIOException):
+        tx.execute(device, fc23=None)
+    # 다음 시도에서도 다시 FC23 을 시험한다
+    device.fc23 = lambda *args: ReadWriteMultipleRegistersResponse(TFTP_IP)
+    assert tx.execute(device, fc23=None).fc23 is True
+
+
+def test_other_exception_code_is_write_failure():
+    device = FakeDevice(ExceptionResponse(0x17, ModbusExceptions.SlaveBusy))
+    result = fw_start_tx().execute(device)
+    assert not result.ok and result.fc23 is None
+    assert not result.wrote(40091)
+    assert device.methods() == ["write_registers", "readwrite_registers"]
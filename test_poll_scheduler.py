@@ -0,0 +1,78 @@
+# test_poll_scheduler.py
+#
+# DeadlineScheduler: 박스별 위치(phase), 절대 시각 격자, 놓친 마감, 시작 지연(jitter) 통계.
+#   python -m pytest -q test_poll_scheduler.py
+
+import pytest
+
+from poll_scheduler import DeadlineScheduler
+
+
+def test_phases_spread_boxes_over_the_period():
+    phases = sorted(DeadlineScheduler.phase(i) for i in range(5))
+    assert phases[0] == 0.0
+    assert min(b - a for a, b in zip(phases, phases[1:])) > 0.1
+
+
+def test_first_poll_waits_for_grid_slot_at_least_half_a_period_away():
+    deadlines = DeadlineScheduler(epoch=0.0)
+    assert deadlines.next_delay(0, 1.0, now=0.0) == pytest.approx(1.0)
+    assert deadlines.next_delay(1, 1.0, now=0.0) == pytest.approx(DeadlineScheduler.phase(1))
+
+
+def test_fixed_rate_does_not_drift_with_poll_time():
+    deadlines = DeadlineScheduler(epoch=0.0)
+    deadlines.next_delay(0, 1.0, now=0.0)            # 예정 1.0
+    deadlines.started(0, now=1.0)
+    # 폴링에 0.3초 걸려도 다음 예정은 2.0
+    assert deadlines.next_delay(0, 1.0, now=1.3) == pytest.approx(0.7)
+    assert deadlines.stats(0)["missed"] == 0
+
+
+def test_missed_deadlines_are_counted_not_replayed():
+    deadlines = DeadlineScheduler(epoch=0.0)
+    deadlines.next_delay(0, 1.0, now=0.0)            # 예정 1.0
+    deadlines.started(0, now=1.0)
+    # 폴링이 4.3 까지 걸림 → 2.0/3.0/4.0 을 몰아서 하지 않고 5.0 으로
+    assert deadlines.next_delay(0, 1.0, now=4.3) == pytest.approx(0.7)
+    assert deadlines.stats(0)["missed"] == 3
+
+
+def test_jitter_stats():
+    deadlines = DeadlineScheduler(epoch=0.0)
+    now = 0.0
+    for late in (0.010, 0.020, 0.030, 0.040):
+        now += deadlines.next_delay(0, 1.0, now=now)
+        deadlines.started(0, now=now + late)
+        now += late
+    stats = deadlines.stats(0)
+    assert stats["polls"] == 4 and stats["missed"] == 0
+    assert stats["jitter_mean_ms"] == 25.0
+    assert stats["jitter_p95_ms"] == 40.0 and stats["jitter_max_ms"] == 40.0
+
+
+def test_started_counts_once_per_deadline_and_ignores_early_calls():
+    deadlines = DeadlineScheduler(epoch=0.0)
+    deadlines.next_delay(0, 1.0, now=0.0)            # 예정 1.0
+    deadlines.started(0, now=0.2)                    # 이전 폴링 시각 (파이프라인) → 무시
+    deadlines.started(0, now=1.01)
+    deadlines.started(0, now=1.02)
+    assert deadlines.stats(0)["polls"] == 1
+    assert deadlines.stats(0)["jitter_max_ms"] == 10.0
+
+
+def test_defer_is_not_a_missed_deadline():
+    deadlines = DeadlineScheduler(epoch=0.0)
+    deadlines.next_delay(0, 1.0, now=0.0)
+    deadlines.defer(0, 10.0, now=1.0)                # 점검 대기: 11.0 까지 미룸
+    assert deadlines.next_delay(0, 1.0, now=11.0) == pytest.approx(1.0)
+    assert deadlines.stats(0)["missed"] == 0
+
+
+def test_reset_restarts_grid_and_keeps_stats():
+    deadlines = DeadlineScheduler(epoch=0.0)
+    deadlines.next_delay(0, 1.0, now=0.0)
+    deadlines.started(0, now=1.0)
+    deadlines.reset(0)
+    assert deadlines.next_delay(0, 1.0, now=7.9) == pytest.approx(1.1)
+    assert deadlines.stats(0)["polls"] == 1 and deadlines.stats(0)["missed"] == 0
@@ -0,0 +1,106 @@
+# test_register_cache.py
+#
+# RegisterCache: 구간별 TTL, 캐시하지 않는 제어 레지스터, 같은 구간 읽기(in-flight) 합치기.
+#   python -m pytest -q test_register_cache.py
+
+import threading
+import time
+
+import pytest
+
+from register_cache import LIVE_TTL, RegisterCache, RegisterReadError
+
+
+def test_ttl_per_register_range():
+    cache = RegisterCache(1)
+    cache.update(0, 40001, list(range(11)), now=0.0)
+    cache.update(0, 40088, [0xC0A8, 0x0164], now=0.0)
+    assert cache.get(0, 40005, 1, now=LIVE_TTL) == [4]
+    assert cache.get(0, 40005, 1, now=LIVE_TTL + 0.1) is None
+    # TFTP IP 는 TTL 이 길다
+    assert cache.get(0, 40088, 2, now=60.0) == [0xC0A8, 0x0164]
+
+
+def test_control_registers_are_never_cached():
+    cache = RegisterCache(1)
+    cache.update(0, 40088, [1, 2, 3, 4], now=0.0)      # 40091 (FW 시작) 포함
+    assert cache.get(0, 40091, 1, now=0.0) is None
+    assert cache.get(0, 40088, 4, now=0.0) is None
+    assert cache.known(0, 40088, 40092, now=0.0) == {40088: 1, 40089: 2}
+
+
+def test_invalidate_box_and_range():
+    cache = RegisterCache(2)
+    for box in range(2):
+        cache.update(box, 40001, [7] * 11, now=0.0)
+    cache.invalidate(0, 40005, 1)
+    assert cache.get(0, 40005, 1, now=0.0) is None
+    assert cache.get(0, 40001, 1, now=0.0) == [7]
+    cache.invalidate(1)
+    assert cache.get(1, 40001, 1, now=0.0) is None
+
+
+def test_read_through_hit_and_miss():
+    cache = RegisterCache(1)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return [0xC0A8, 0x0164]
+
+    assert cache.read(0, 40088, 2, fetch) == [0xC0A8, 0x0164]
+    assert cache.read(0, 40088, 2, fetch) == [0xC0A8, 0x0164]
+    assert len(calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "coalesced": 0, "inflight": 0}
+
+
+def test_concurrent_reads_share_one_fetch():
+    cache = RegisterCache(1)
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5.0)
+        return [1, 2]
+
+    results = []
+    readers = [threading.Thread(target=lambda: results.append(cache.read(0, 40088, 2, fetch))) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    while cache.stats()["coalesced"] < 2:
+        time.sleep(0.01)
+    release.set()
+    for reader in readers:
+        reader.join()
+    assert results == [[1, 2]] * 3
+    assert len(calls) == 1
+    assert cache.stats()["inflight"] == 0
+
+
+def test_fetch_error_reaches_waiters_and_is_not_cached():
+    cache = RegisterCache(1)
+    release = threading.Event()
+    errors = []
+
+    def fetch():
+        release.wait(5.0)
+        raise RegisterReadError("IllegalAddress")
+
+    def reader():
+        try:
+            cache.read(0, 40030, 4, fetch)
+        except RegisterReadError as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(2)]
+    for thread in readers:
+        thread.start()
+    while cache.stats()["coalesced"] < 1:
+        time.sleep(0.01)
+    release.set()
+    for thread in readers:
+        thread.join()
+    assert len(errors) == 2
+    with pytest.raises(RegisterReadError):
+        cache.read(0, 40030, 4, fetch)
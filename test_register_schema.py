@@ -0,0 +1,73 @@
+# test_register_schema.py
+#
+# 레지스터 맵 → 읽기 계획 컴파일 (그룹 합치기, 읽을 수 없는 구간 건너뛰지 않기, 주기별 그룹 선택, 디코딩).
+#   python -m pytest -q test_register_schema.py
+
+from register_schema import (
+    SCHEMAS,
+    DeviceSchema,
+    ReadPlan,
+    RegisterGroup,
+    schema_for_capabilities,
+    u16,
+)
+
+
+def spans(requests):
+    return [(r.start, r.count, r.group_names) for r in requests]
+
+
+def test_asgd3210_coalesces_live_version_and_fw_status():
+    plan = ReadPlan(SCHEMAS["ASGD3210"])
+    assert spans(plan.due_requests(now=0.0)) == [
+        (40001, 24, ("live", "version", "fw_status")),
+        # 40025~40029 는 IllegalAddress 가 날 수 있어 40030 블록은 따로 읽는다
+        (40030, 4, ("sensor_model",)),
+    ]
+
+
+def test_asgd3000_reads_live_and_version_in_one_request():
+    plan = ReadPlan(SCHEMAS["ASGD3000"])
+    assert spans(plan.due_requests(now=0.0)) == [(40001, 22, ("live", "version"))]
+
+
+def test_gap_larger_than_max_gap_is_not_bridged():
+    a = RegisterGroup("a", 40001, 2, [u16("a", 40001)])
+    b = RegisterGroup("b", 40010, 1, [u16("b", 40010)])
+    assert spans(DeviceSchema("x", [a, b], max_gap=7).coalesce([a, b])) == [(40001, 10, ("a", "b"))]
+    assert spans(DeviceSchema("x", [a, b], max_gap=6).coalesce([a, b])) == [(40001, 2, ("a",)), (40010, 1, ("b",))]
+
+
+def test_periodic_groups_are_skipped_until_due():
+    plan = ReadPlan(SCHEMAS["ASGD3210"])
+    for request in plan.due_requests(now=0.0):
+        plan.apply(request, [0] * request.count, now=0.0)
+    assert spans(plan.due_requests(now=1.0)) == [(40001, 11, ("live",))]
+    # FW 업그레이드 중에는 진행률을 매 사이클 읽는다
+    assert spans(plan.due_requests(now=1.0, upgrading=True)) == [(40001, 24, ("live", "fw_status"))]
+    assert [r.group_names for r in plan.due_requests(now=10.0)] == [("live", "version")]
+
+
+def test_decode_bits_and_ascii():
+    plan = ReadPlan(SCHEMAS["ASGD3210"])
+    live, model = plan.due_requests(now=0.0)
+    regs = [0] * live.count
+    regs[0] = 0b1100_0000       # AL1 + AL2
+    regs[4] = 1234
+    fresh = plan.apply(live, regs, now=0.0)
+    assert (fresh["alarm1"], fresh["alarm2"], fresh["value"]) == (1, 1, 1234)
+    assert plan.apply(model, [0x4F52, 0x4700, 0, 0], now=0.0) == {"sensor_model": "ORG"}
+
+
+def test_mark_unsupported_recompiles_without_group():
+    plan = ReadPlan(SCHEMAS["ASGD3210"])
+    plan.due_requests(now=0.0)
+    plan.mark_unsupported("sensor_model")
+    assert spans(plan.due_requests(now=0.0)) == [(40001, 24, ("live", "version", "fw_status"))]
+
+
+def test_schema_for_capabilities():
+    assert schema_for_capabilities(False, True) is SCHEMAS["ASGD3000"]
+    assert schema_for_capabilities(True, False) is SCHEMAS["ASGD3200"]
+    assert schema_for_capabilities(True, True) is SCHEMAS["ASGD3210"]
+
@@ -0,0 +1,39 @@
+# test_ui_mailbox.py
+#
+# UiMailbox: (박스, 항목)마다 마지막 값만 남고, 다시 넣은 항목은 순서가 맨 뒤로 가는지.
+#   python -m pytest -q test_ui_mailbox.py
+
+from ui_mailbox import UiMailbox
+
+
+def test_latest_value_wins_per_box_and_kind():
+    mailbox = UiMailbox()
+    for value in range(100):
+        mailbox.put("bar", 0, value)
+    mailbox.put("bar", 1, 7)
+    assert mailbox.pending() == 2
+    assert mailbox.drain() == [("bar", 0, (99,)), ("bar", 1, (7,))]
+
+
+def test_drain_empties_mailbox():
+    mailbox = UiMailbox()
+    mailbox.put("segment_display", 0, "1234", False)
+    assert mailbox.drain() == [("segment_display", 0, ("1234", False))]
+    assert mailbox.pending() == 0
+    assert mailbox.drain() == []
+
+
+def test_error_on_and_off_share_a_slot():
+    mailbox = UiMailbox()
+    mailbox.put("error_on", 2, "E-01")
+    mailbox.put("error_off", 2)
+    assert mailbox.drain() == [("error_off", 2, ())]
+
+
+def test_put_again_moves_item_to_the_end():
+    mailbox = UiMailbox()
+    mailbox.put("error_on", 0, "E-01")
+    mailbox.put("segment_display", 0, "1234", False)
+    mailbox.put("error_off", 0)
+    # 마지막에 넣은 에러 해제가 값 표시 뒤에 그려진다
+    assert [kind for kind, _, _ in mailbox.drain()] == ["segment_display", "error_off"]
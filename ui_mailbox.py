@@ -0,0 +1,39 @@
+# ui_mailbox.py
+#
+# 작업 스레드 → Tk 화면 갱신 우편함.
+# (박스, 항목)마다 마지막 값 하나만 보관하고 바뀐 항목만 표시(dirty)해 두었다가
+# 화면 갱신 주기마다 한 번에 꺼내 간다. Tk 가 멈췄다 풀려도(모달 창, 그래프 다시 그리기)
+# 밀린 값을 차례로 재생하지 않고 최신 값만 한 번 그린다. 크기는 박스 수 × 항목 수로 고정.
+#
+#   mailbox.put("bar", box_index, 42)
+#   for kind, box_index, args in mailbox.drain(): ...
+
+import threading
+
+# 서로 덮어써야 하는 메시지는 같은 칸을 쓴다 (에러 깜빡임 시작/정지 → 마지막 것만)
+SLOT_OF = {
+    "error_on": "error_blink",
+    "error_off": "error_blink",
+}
+
+
+class UiMailbox:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = {}      # (slot, box_index) → (kind, args). 마지막으로 바뀐 순서 유지
+
+    def put(self, kind: str, box_index: int, *args):
+        key = (SLOT_OF.get(kind, kind), box_index)
+        with self._lock:
+            # 다시 넣으면 순서도 맨 뒤로 (에러 해제 → 값 표시처럼 순서가 의미 있는 경우)
+            self._slots.pop(key, None)
+            self._slots[key] = (kind, args)
+
+    def drain(self):
+        """바뀐 항목들을 (kind, box_index, args) 로 꺼내고 비운다."""
+        with self._lock:
+            slots, self._slots = self._slots, {}
+        return [(kind, key[1], args) for key, (kind, args) in slots.items()]
+
+    def pending(self) -> int:
+        return len(self._slots)
@@ -28,7 +28,7 @@ class VirtualKeyboard:
         entry_y = entry.winfo_rooty() - self.root.winfo_rooty()
 
         keyboard_width = 260  # 가상 키보드의 예상 너비
-        keyboard_height = 240  # 가상 키보드의 예상 높이
+        keyboard_height = 300  # 가상 키보드의 예상 높이
 
         # 상자의 개수에 따라 키보드 위치를 동적으로 조정
         if self.num_boxes == 1:
@@ -62,10 +62,11 @@ class VirtualKeyboard:
             '1', '2', '3',
             '4', '5', '6',
             '7', '8', '9',
-            '.', '0', 'DEL'
+            '.', '0', 'DEL',
+            ':', '/'            # ip[:port][/unit] 입력용
         ]
 
-        rows = 4
+        rows = 5
         cols = 3
         for i, button in enumerate(buttons):
             b = tk.Button(frame, text=button, width=5, height=2,